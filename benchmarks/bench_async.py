@@ -0,0 +1,70 @@
+"""
+Сравнение пропускной способности Api и AsyncApi на локальном сервере
+
+    python benchmarks/bench_async.py --calls 2000 --latency 0.02
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from unu_api import Api, AsyncApi
+from unu_api.stub import StubServer
+
+
+def bench_sync(url: str, calls: int) -> float:
+    api = Api(url=url, token="bench")
+    started = time.perf_counter()
+    for _ in range(calls):
+        api.get_balance()
+    return calls / (time.perf_counter() - started)
+
+
+def bench_threads(url: str, calls: int, workers: int) -> float:
+    api = Api(url=url, token="bench", pool_size=workers)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: api.get_balance(), range(calls)))
+    return calls / (time.perf_counter() - started)
+
+
+async def bench_async(url: str, calls: int, concurrency: int) -> float:
+    async with AsyncApi(url=url, token="bench", limit=concurrency) as api:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                await api.get_balance()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(calls)))
+        return calls / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+    with StubServer(latency=args.latency) as server:
+        sync_calls = min(args.calls, 200)
+        print(
+            "Api (последовательно):  %8.1f req/s" % bench_sync(server.url, sync_calls)
+        )
+        print(
+            "Api (%d потоков):       %8.1f req/s"
+            % (args.threads, bench_threads(server.url, args.calls, args.threads))
+        )
+        print(
+            "AsyncApi (%d задач):   %8.1f req/s"
+            % (
+                args.concurrency,
+                asyncio.run(bench_async(server.url, args.calls, args.concurrency)),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Скорость декодеров JSON на типичных ответах API
+
+    python benchmarks/bench_decode.py
+"""
+import json
+import timeit
+
+from unu_api import DECODERS, get_decoder
+from unu_api.client import parse_body
+
+
+def reports_body(count: int) -> bytes:
+    reports = [
+        {
+            "id": index,
+            "task_id": index % 500,
+            "worker_id": index % 7919,
+            "price_unu": 1.5,
+            "price_rub": 1.5,
+            "status": 2,
+            "folder_id": index % 20,
+        }
+        for index in range(count)
+    ]
+    return json.dumps({"success": "true", "reports": reports}).encode()
+
+
+PAYLOADS = {
+    "get_balance": b'{"success": "true", "balance": 1000.5, "blocked_money": 12.0}',
+    "get_reports x1k": reports_body(1000),
+    "get_reports x100k": reports_body(100000),
+}
+
+
+def main():
+    for payload, body in PAYLOADS.items():
+        number = max(1, 2000000 // len(body))
+        print("%s (%d КБ, %d повторов)" % (payload, len(body) // 1024, number))
+        for name in DECODERS:
+            try:
+                decode = get_decoder(name)
+            except ImportError:
+                print("  %-8s не установлен" % name)
+                continue
+            seconds = min(
+                timeit.repeat(
+                    lambda: parse_body(200, body, decode), number=number, repeat=3
+                )
+            )
+            print(
+                "  %-8s %10.1f МБ/с %10.3f мс/ответ"
+                % (name, len(body) * number / seconds / 2**20, seconds / number * 1000)
+            )
+
+
+if __name__ == "__main__":
+    main()
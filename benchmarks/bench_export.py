@@ -0,0 +1,107 @@
+"""
+Скорость выгрузки (строк/с) и пиковая память (RSS) по форматам
+
+    python benchmarks/bench_export.py --reports 2000000
+    python benchmarks/bench_export.py --reports 500000 --stub
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+TARGETS = ("reports.ndjson", "reports.csv", "reports.csv.gz", "reports.parquet")
+
+
+def synthetic(count: int):
+    """
+    Отчёты без сервера: измеряется только запись
+    """
+    for index in range(1, count + 1):
+        yield {
+            "id": index,
+            "task_id": index % 5000,
+            "worker_id": index * 7 % 50000,
+            "price_unu": 1.5 + index % 30,
+            "price_rub": 1.5 + index % 30,
+            "status": (1, 2, 3, 6)[index % 4],
+            "folder_id": index % 20,
+        }
+
+
+def peak_rss() -> int:
+    """
+    Пиковая память процесса в КБ. ru_maxrss после fork учитывает память
+    родителя (сервера-заглушки), поэтому в Linux берётся VmHWM
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(source: str, count: int, path: str) -> None:
+    from unu_api import Api, export  # pylint: disable=import-outside-toplevel
+
+    baseline = peak_rss()
+    started = time.perf_counter()
+    if source == "synthetic":
+        stats = export(synthetic(count), path, kind="reports")
+    else:
+        stats = Api(url=source, token="bench").export_reports(path)
+    elapsed = time.perf_counter() - started
+    peak = peak_rss()
+    print("%d %f %d %d %d" % (stats.rows, elapsed, baseline, peak, stats.size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=2000000)
+    parser.add_argument("--stub", action="store_true", help="читать отчёты с заглушки")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], int(args.child[1]), args.child[2])
+        return
+
+    def run(source: str, directory: str) -> None:
+        for target in TARGETS:
+            path = os.path.join(directory, target)
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", source, str(args.reports), path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.split()
+            rows, elapsed = int(output[0]), float(output[1])
+            baseline, peak, size = map(int, output[2:])
+            print(
+                "%-16s строк: %d, %.0f строк/с, RSS: %.1f МБ (+%.1f), файл: %.1f МБ"
+                % (
+                    target,
+                    rows,
+                    rows / elapsed,
+                    peak / 1024,
+                    (peak - baseline) / 1024,
+                    size / 1024 / 1024,
+                )
+            )
+
+    with tempfile.TemporaryDirectory() as directory:
+        if not args.stub:
+            run("synthetic", directory)
+            return
+        from unu_api.stub import StubServer  # pylint: disable=import-outside-toplevel
+
+        with StubServer(reports=args.reports) as server:
+            run(server.url, directory)
+
+
+if __name__ == "__main__":
+    main()
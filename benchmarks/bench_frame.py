@@ -0,0 +1,101 @@
+"""
+Группировки по отчётам: циклы по словарям против ReportFrame
+
+    python benchmarks/bench_frame.py --reports 1000000
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from unu_api import ReportFrame
+
+
+def make_reports(count: int):
+    rnd = random.Random(0)
+    return [
+        {
+            "id": index,
+            "task_id": rnd.randint(1, 5000),
+            "worker_id": rnd.randint(1, 50000),
+            "price_unu": price,
+            "price_rub": price,
+            "status": rnd.choice((1, 2, 2, 2, 3, 6)),
+            "folder_id": rnd.randint(1, 20),
+        }
+        for index, price in ((i, round(rnd.uniform(1, 30), 2)) for i in range(count))
+    ]
+
+
+def spend_loop(reports):
+    spend = defaultdict(float)
+    for report in reports:
+        if report["status"] == 6:
+            spend[report["worker_id"]] += report["price_rub"]
+    return spend
+
+
+def mean_loop(reports):
+    total, count = defaultdict(float), defaultdict(int)
+    for report in reports:
+        total[report["task_id"]] += report["price_rub"]
+        count[report["task_id"]] += 1
+    return {task_id: total[task_id] / count[task_id] for task_id in total}
+
+
+def shares_loop(reports):
+    statuses = defaultdict(lambda: defaultdict(int))
+    for report in reports:
+        statuses[report["folder_id"]][report["status"]] += 1
+    return {
+        folder: {status: n / sum(counts.values()) for status, n in counts.items()}
+        for folder, counts in statuses.items()
+    }
+
+
+def spend_frame(frame):
+    return frame[frame.mask(status=6)].groupby("worker_id").sum("price_rub")
+
+
+def mean_frame(frame):
+    return frame.groupby("task_id").mean("price_rub")
+
+
+def shares_frame(frame):
+    return frame.crosstab("folder_id", "status", normalize=True)
+
+
+QUESTIONS = (
+    ("расходы по worker_id", spend_loop, spend_frame),
+    ("средняя цена по задаче", mean_loop, mean_frame),
+    ("доли статусов по папке", shares_loop, shares_frame),
+)
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=1000000)
+    args = parser.parse_args()
+
+    reports = make_reports(args.reports)
+    started = time.perf_counter()
+    frame = ReportFrame.from_records(reports)
+    build = time.perf_counter() - started
+    print("отчётов: %d, построение ReportFrame: %.3f с" % (len(frame), build))
+    for name, loop, vectorized in QUESTIONS:
+        loop_time = timed(loop, reports)
+        frame_time = timed(vectorized, frame)
+        print(
+            "%-24s циклы: %.3f с, ReportFrame: %.4f с (в %.0f раз быстрее)"
+            % (name, loop_time, frame_time, loop_time / frame_time)
+        )
+
+
+if __name__ == "__main__":
+    main()
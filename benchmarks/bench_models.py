@@ -0,0 +1,69 @@
+"""
+Память, занимаемая отчётами в виде словарей и моделей Report
+
+    python benchmarks/bench_models.py --reports 500000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from unu_api import Report
+
+
+def synthetic_body(count: int) -> bytes:
+    reports = [
+        {
+            "id": index,
+            "task_id": index % 500,
+            "worker_id": index % 7919,
+            "price_unu": 1.5 + index % 10,
+            "price_rub": 1.5 + index % 10,
+            "status": 2,
+            "folder_id": index % 20,
+        }
+        for index in range(count)
+    ]
+    return json.dumps({"success": "true", "reports": reports}).encode()
+
+
+def measure(build):
+    """
+    Память под результатом build (tracemalloc) и время построения без трассировки
+    """
+    gc.collect()
+    started = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=500000)
+    args = parser.parse_args()
+    body = synthetic_body(args.reports)
+
+    dicts, dict_size, dict_time = measure(lambda: json.loads(body)["reports"])
+    print("dict:   %7.1f МБ, %.2f с" % (dict_size / 2**20, dict_time))
+    del dicts
+    records, record_size, record_time = measure(
+        lambda: Report.from_list(json.loads(body)["reports"])
+    )
+    print("Report: %7.1f МБ, %.2f с" % (record_size / 2**20, record_time))
+    started = time.perf_counter()
+    pending = sum(1 for report in records if report.status == 2)
+    print(
+        "фильтр по status: %d отчётов за %.2f с"
+        % (pending, time.perf_counter() - started)
+    )
+
+
+if __name__ == "__main__":
+    main()
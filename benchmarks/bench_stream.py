@@ -0,0 +1,54 @@
+"""
+Пиковая память (RSS) при get_reports и потоковом iter_reports
+
+    python benchmarks/bench_stream.py --reports 500000
+"""
+import argparse
+import resource
+import subprocess
+import sys
+
+
+def child(url: str, mode: str) -> None:
+    from unu_api import Api  # pylint: disable=import-outside-toplevel
+
+    api = Api(url=url, token="bench")
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    count = 0
+    if mode == "full":
+        count = len(api.get_reports()["reports"])
+    else:
+        for _ in api.iter_reports():
+            count += 1
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("%s %d %d %d" % (mode, count, baseline, peak))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=200000)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    from unu_api.stub import StubServer  # pylint: disable=import-outside-toplevel
+
+    with StubServer(reports=args.reports) as server:
+        for mode in ("full", "stream"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", server.url, mode],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.split()
+            count, baseline, peak = map(int, output[1:])
+            print(
+                "%-7s отчётов: %d, прирост RSS: %.1f МБ"
+                % (mode, count, (peak - baseline) / 1024)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Сравнение HTTP-транспортов на локальном сервере: мелкие вызовы
+(накладные расходы на запрос) и большой get_reports (объём на проводе)
+
+    python benchmarks/bench_transports.py --calls 2000 --reports 50000
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from unu_api import TRANSPORTS, Api
+from unu_api.stub import StubServer
+
+
+def bench_small(api: Api, calls: int, workers: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: api.get_balance(), range(calls)))
+    return calls / (time.perf_counter() - started)
+
+
+def bench_reports(api: Api, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        api.get_reports()
+    return (time.perf_counter() - started) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--report-calls", type=int, default=10)
+    args = parser.parse_args()
+    print(
+        "%-9s %-6s %12s %16s %14s"
+        % ("transport", "gzip", "balance rps", "reports мс/вызов", "reports КБ")
+    )
+    with StubServer(tasks=500, reports=args.reports) as server:
+        for name in TRANSPORTS:
+            for compress in (False, True):
+                try:
+                    api = Api(
+                        url=server.url,
+                        token="bench",
+                        transport=name,
+                        compress=compress,
+                        pool_size=args.threads,
+                        metrics=True,
+                    )
+                except ImportError:
+                    print("%-9s не установлен" % name)
+                    break
+                with api:
+                    rps = bench_small(api, args.calls, args.threads)
+                    seconds = bench_reports(api, args.report_calls)
+                    received = api.metrics.summary()["get_reports"]["response_bytes"]
+                print(
+                    "%-9s %-6s %12.1f %16.1f %14.1f"
+                    % (
+                        name,
+                        "да" if compress else "нет",
+                        rps,
+                        seconds * 1000,
+                        received / args.report_calls / 1024,
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Набор бенчмарков клиента на локальном сервере-заглушке
+
+Для каждого метода и режима выполнения измеряются пропускная способность,
+задержки p50/p99 и пиковая память. Результат можно сохранить и сравнить
+с базовым прогоном, при регрессии скрипт завершится с кодом 1:
+
+    python benchmarks/suite.py --output baseline.json
+    python benchmarks/suite.py --baseline baseline.json --max-regression 0.25
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from unu_api import Api, AsyncApi
+from unu_api.stub import StubServer
+
+TASKS = 200
+
+# Имя метода -> вызов с номером итерации
+METHODS: Dict[str, Callable[[Any, int], Any]] = {
+    "get_balance": lambda api, i: api.get_balance(),
+    "get_folders": lambda api, i: api.get_folders(),
+    "get_tasks": lambda api, i: api.get_tasks(folder_id=1 + i % 20),
+    "get_reports": lambda api, i: api.get_reports(task_id=1 + i % TASKS),
+    "get_tariffs": lambda api, i: api.get_tariffs(),
+    "get_expenses": lambda api, i: api.get_expenses(),
+    "get_minter_wallet": lambda api, i: api.get_minter_wallet(),
+    "create_folder": lambda api, i: api.create_folder(name="bench %d" % i),
+    "move_task": lambda api, i: api.move_task(task_id=1 + i % TASKS, folder_id=1),
+    "task_pause": lambda api, i: api.task_pause(task_id=1 + i % TASKS),
+}
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": p99 * 1000,
+    }
+
+
+def traced_peak(run: Callable[[], Any]) -> int:
+    """
+    Пиковая память Python-объектов во время run (отдельный короткий прогон,
+    так как tracemalloc заметно замедляет выполнение)
+    """
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def timed(call: Callable[[], Any], latencies: List[float]) -> None:
+    started = time.perf_counter()
+    call()
+    latencies.append(time.perf_counter() - started)
+
+
+def run_sync(url: str, method: str, calls: int, workers: int) -> Dict[str, float]:
+    api = Api(url=url, token="bench", pool_size=max(workers, 1))
+    func = METHODS[method]
+    latencies: List[float] = []
+    started = time.perf_counter()
+    if workers <= 1:
+        for index in range(calls):
+            timed(lambda: func(api, index), latencies)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(
+                pool.map(
+                    lambda index: timed(lambda: func(api, index), latencies),
+                    range(calls),
+                )
+            )
+    elapsed = time.perf_counter() - started
+    api.close()
+    return summarize(latencies, elapsed)
+
+
+def run_async(url: str, method: str, calls: int, workers: int) -> Dict[str, float]:
+    func = METHODS[method]
+    latencies: List[float] = []
+
+    async def main() -> float:
+        async with AsyncApi(url=url, token="bench", limit=workers) as api:
+            semaphore = asyncio.Semaphore(workers)
+
+            async def call(index: int) -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    await func(api, index)
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(call(index) for index in range(calls)))
+            return time.perf_counter() - started
+
+    return summarize(latencies, asyncio.run(main()))
+
+
+MODES = {
+    "sync": lambda url, method, args: run_sync(url, method, args.calls, 1),
+    "threads": lambda url, method, args: run_sync(
+        url, method, args.calls, args.concurrency
+    ),
+    "async": lambda url, method, args: run_async(
+        url, method, args.calls, args.concurrency
+    ),
+}
+
+
+def compare(results, baseline, max_regression: float) -> List[str]:
+    """
+    Возвращает описания регрессий относительно базового прогона
+    """
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if current["throughput"] < base["throughput"] * (1 - max_regression):
+            regressions.append(
+                "%s: throughput %.1f < %.1f"
+                % (key, current["throughput"], base["throughput"])
+            )
+        if current["p99_ms"] > base["p99_ms"] * (1 + max_regression):
+            regressions.append(
+                "%s: p99 %.2f ms > %.2f ms" % (key, current["p99_ms"], base["p99_ms"])
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--memory-calls", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--methods", nargs="*", default=list(METHODS))
+    parser.add_argument("--modes", nargs="*", default=list(MODES))
+    parser.add_argument("--output", help="сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON базового прогона для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    print(
+        "%-20s %-8s %12s %10s %10s %10s"
+        % ("method", "mode", "req/s", "p50 ms", "p99 ms", "peak KB")
+    )
+    with StubServer(
+        tasks=TASKS, reports=args.reports, latency=args.latency, jitter=args.jitter
+    ) as server:
+        for method in args.methods:
+            for mode in args.modes:
+                result = MODES[mode](server.url, method, args)
+                short = argparse.Namespace(**dict(vars(args), calls=args.memory_calls))
+                result["peak_kb"] = (
+                    traced_peak(lambda: MODES[mode](server.url, method, short)) / 1024
+                )
+                results["%s/%s" % (method, mode)] = result
+                print(
+                    "%-20s %-8s %12.1f %10.2f %10.2f %10.1f"
+                    % (
+                        method,
+                        mode,
+                        result["throughput"],
+                        result["p50_ms"],
+                        result["p99_ms"],
+                        result["peak_kb"],
+                    )
+                )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline), args.max_regression)
+        for regression in regressions:
+            print("РЕГРЕССИЯ", regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Тесты пула аккаунтов
+"""
+import asyncio
+import time
+
+import pytest
+
+from unu_api import (
+    AccountPool,
+    Api,
+    AsyncApi,
+    AuthError,
+    RateLimiter,
+    ResponseCache,
+    merge_results,
+)
+from unu_api.stub import StubServer
+
+
+class AccountApi(Api):
+    """
+    Api без сети: отчёты с номером аккаунта, токен "bad" отклоняется
+    """
+
+    def _request(self, url, data, info=None):
+        time.sleep(0.1)
+        if data["api_key"] == "bad":
+            raise AuthError
+        return {
+            "success": "true",
+            "balance": len(data["api_key"]),
+            "reports": [{"id": 1, "token": data["api_key"]}],
+        }
+
+
+def test_pool_runs_accounts_concurrently():
+    """
+    Тест одновременного опроса аккаунтов и изоляции ошибок
+    """
+    tokens = {"shop-%d" % index: "token%d" % index for index in range(5)}
+    tokens["broken"] = "bad"
+    with AccountPool(tokens, api_class=AccountApi, limits={"rate": 100}) as pool:
+        assert len(pool) == 6
+        limiters = {id(api.rate_limiter) for api in pool.accounts.values()}
+        assert len(limiters) == 6
+        started = time.perf_counter()
+        result = pool.run("get_balance")
+        assert time.perf_counter() - started < 0.4
+        assert sorted(result.failed) == ["broken"]
+        assert isinstance(result.errors["broken"], AuthError)
+        assert result.results["shop-1"]["balance"] == 6
+        reports = merge_results(pool.run("get_reports"), key="reports")
+        assert sorted(name for name, _ in reports) == sorted(tokens)[1:]
+        assert all(report["token"] == tokens[name] for name, report in reports)
+        custom = pool.run(lambda api, extra: api.token + extra, "!")
+        assert custom.results["shop-0"] == "token0!"
+
+
+def test_pool_shared_cache():
+    """
+    Тест общего кэша для разных аккаунтов: записи разделены по токенам,
+    а общий RateLimiter запрещён
+    """
+    cache = ResponseCache()
+    with StubServer(tasks=0, reports=0) as server:
+        pool = AccountPool(["a", "b"], url=server.url, cache=cache, coalesce=True)
+        with pool:
+            first = pool.run("get_folders")
+            second = pool.run("get_folders")
+        assert not first.errors and not second.errors
+        assert server.requests["get_folders"] == 2
+        assert len(cache) == 2
+    with pytest.raises(ValueError):
+        AccountPool(["a", "b"], rate_limiter=RateLimiter())
+
+
+def test_pool_async():
+    """
+    Тест пула аккаунтов на асинхронном клиенте
+    """
+
+    class AccountAsyncApi(AsyncApi):
+        async def _request(self, url, data, info=None):
+            await asyncio.sleep(0.1)
+            return {"success": "true", "balance": data["api_key"]}
+
+    async def run():
+        pool = AccountPool(["a", "b", "c"], api_class=AccountAsyncApi)
+        try:
+            return await pool.run("get_balance")
+        finally:
+            await pool.aclose()
+
+    result = asyncio.run(run())
+    assert dict(merge_results(result)) == {
+        name: {"success": "true", "balance": name} for name in "abc"
+    }
+    assert sorted(result.succeeded) == ["a", "b", "c"]
+
+
+def test_rate_limiter_true():
+    """
+    Тест rate_limiter=True: у клиента и у каждого аккаунта пула свой RateLimiter
+    """
+    unu = AccountApi(token="one", rate_limiter=True)
+    assert isinstance(unu.rate_limiter, RateLimiter)
+    assert unu.get_balance()["balance"] == 3
+    with AccountPool(["a", "b"], api_class=AccountApi, rate_limiter=True) as pool:
+        limiters = [api.rate_limiter for api in pool.accounts.values()]
+        assert all(isinstance(limiter, RateLimiter) for limiter in limiters)
+        assert limiters[0] is not limiters[1]
+        assert pool.run("get_balance").ok
@@ -0,0 +1,82 @@
+"""
+Тесты асинхронного клиента
+"""
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from unu_api import AsyncApi, ThrottledError, TransportError
+from unu_api.models import Balance
+from unu_api.stub import StubServer
+
+aiohttp = pytest.importorskip("aiohttp")
+
+
+def test_timeouts():
+    """
+    Тест таймаутов: (connect_timeout, read_timeout) переходят в aiohttp
+    """
+
+    async def run():
+        async with AsyncApi(token="test", connect_timeout=2, read_timeout=7) as unu:
+            assert unu.timeout == (2, 7)
+            timeout = unu._get_session().timeout
+            assert (timeout.sock_connect, timeout.sock_read) == (2, 7)
+            assert timeout.total is None
+        async with AsyncApi(token="test", timeout=60) as unu:
+            assert unu.client_timeout().total == 60
+
+    asyncio.run(run())
+
+
+def test_no_sync_transport():
+    """
+    Тест того, что AsyncApi не создаёт синхронный транспорт и не загружает requests
+    """
+    unu = AsyncApi(token="test")
+    assert unu.transport is None
+    unu.close()
+    code = (
+        "import sys, unu_api; unu_api.AsyncApi(token='test');"
+        "print('requests' in sys.modules)"
+    )
+    loaded = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert loaded.stdout.strip() == "False"
+
+
+def test_concurrent_requests():
+    """
+    Тест одновременных запросов через общий пул и моделей ответов
+    """
+
+    async def run(url):
+        async with AsyncApi(url=url, token="test", limit=4, typed=True) as unu:
+            balances = await asyncio.gather(*(unu.get_balance() for _ in range(20)))
+            reports = [report async for report in unu.iter_reports()]
+            return balances, reports
+
+    with StubServer(tasks=2, reports=30) as server:
+        balances, reports = asyncio.run(run(server.url))
+        assert server.requests["get_balance"] == 20
+    assert all(isinstance(balance, Balance) for balance in balances)
+    assert len(reports) == 30
+
+
+def test_errors():
+    """
+    Тест сетевых ошибок и ответа 429
+    """
+
+    async def run(url):
+        async with AsyncApi(url=url, token="test", retry=False) as unu:
+            await unu.get_balance()
+
+    with pytest.raises(TransportError):
+        asyncio.run(run("http://127.0.0.1:9/api"))
+    with StubServer(throttle_rate=1.0) as server:
+        with pytest.raises(ThrottledError):
+            asyncio.run(run(server.url))
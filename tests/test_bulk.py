@@ -0,0 +1,60 @@
+"""
+Тесты массовых операций
+"""
+import asyncio
+
+from unu_api import Api, AsyncApi, BulkError, RequestError
+
+
+class FakeApi(Api):
+    """
+    Api без сети: отчёты с чётными идентификаторами принимаются успешно
+    """
+
+    def post(self, url, data):
+        if data["report_id"] % 2:
+            raise RequestError
+        return {"success": "true"}
+
+
+class FakeAsyncApi(AsyncApi):
+    """
+    AsyncApi без сети с тем же поведением, что и FakeApi
+    """
+
+    async def post(self, url, data):
+        await asyncio.sleep(0)
+        return FakeApi.post(self, url, data)
+
+
+def test_approve_reports_partial_failure():
+    """
+    Тест частичного отказа при массовом одобрении отчётов
+    """
+    unu = FakeApi(token="test")
+    progress = []
+    result = unu.approve_reports(
+        range(10), workers=4, progress=lambda done, total: progress.append(done)
+    )
+    assert sorted(result.succeeded) == [0, 2, 4, 6, 8]
+    assert sorted(result.failed) == [1, 3, 5, 7, 9]
+    assert isinstance(result.errors[1], RequestError)
+    assert sorted(progress) == list(range(1, 11))
+    try:
+        result.raise_for_errors()
+    except BulkError as error:
+        assert error.result is result
+    else:
+        raise AssertionError("BulkError не был брошен")
+
+
+def test_reject_reports_async():
+    """
+    Тест массового отклонения отчётов асинхронным клиентом
+    """
+    unu = FakeAsyncApi(token="test")
+    reports = [(report_id, 2, "comment") for report_id in range(6)]
+    result = asyncio.run(unu.reject_reports(reports, workers=2))
+    assert result.total == 6
+    assert sorted(result.succeeded) == [0, 2, 4]
+    assert not result.ok
@@ -0,0 +1,84 @@
+"""
+Тесты кэша ответов
+"""
+import asyncio
+
+from unu_api import Api, AsyncApi, ResponseCache
+from unu_api.cache import cache_key
+
+
+class CountingApi(Api):
+    """
+    Api без сети, считающее обращения к API
+    """
+
+    def _request(self, url, data, info=None):
+        self.calls = getattr(self, "calls", 0) + 1
+        return {"success": "true", "action": data["action"], "call": self.calls}
+
+
+def test_cache_hits_and_invalidation():
+    """
+    Тест повторного использования ответа и сброса после изменения
+    """
+    unu = CountingApi(token="test", cache=True)
+    first = unu.get_folders()
+    assert unu.get_folders() is first
+    assert unu.get_balance() is not unu.get_balance()
+    unu.create_folder("new")
+    assert unu.get_folders() is not first
+    assert unu.cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+def test_cache_ttl_and_lru():
+    """
+    Тест истечения времени жизни и вытеснения старых записей
+    """
+    cache = ResponseCache(ttl={"get_tasks": 60.0, "get_tariffs": 0.0}, maxsize=2)
+    unu = CountingApi(token="test", cache=cache)
+    unu.get_tariffs()
+    unu.get_tariffs()
+    assert unu.calls == 2
+    for folder_id in (1, 2, 3):
+        unu.get_tasks(folder_id=folder_id)
+    assert len(cache) == 2
+    unu.get_tasks(folder_id=3)
+    assert cache.hits == 1
+    unu.move_task(task_id=1, folder_id=2)
+    assert len(cache) == 0
+
+
+def test_async_cache():
+    """
+    Тест кэша в асинхронном клиенте
+    """
+
+    class CountingAsyncApi(AsyncApi):
+        async def _request(self, url, data, info=None):
+            return CountingApi._request(self, url, data)
+
+    async def run():
+        unu = CountingAsyncApi(token="test", cache=True)
+        first = await unu.get_minter_wallet()
+        assert await unu.get_minter_wallet() is first
+        assert unu.calls == 1
+
+    asyncio.run(run())
+
+
+def test_shared_cache_per_token():
+    """
+    Тест общего кэша и SingleFlight для двух токенов: ответы не смешиваются
+    """
+    cache = ResponseCache()
+    first = CountingApi(token="first", cache=cache)
+    second = CountingApi(token="second", cache=cache)
+    shared = first.get_folders()
+    assert first.get_folders() is shared
+    assert second.get_folders() is not shared
+    assert second.calls == 1
+    assert len(cache) == 2
+    assert cache_key({"action": "get_folders", "api_key": "first"}) != cache_key(
+        {"action": "get_folders", "api_key": "second"}
+    )
+    assert "first" not in repr(cache_key({"action": "get_folders", "api_key": "first"}))
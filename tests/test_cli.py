@@ -0,0 +1,148 @@
+"""
+Тесты командной строки и ленивой загрузки пакета
+"""
+import importlib
+import io
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import unu_api
+from unu_api import Api
+from unu_api.cli import main, parse_operation, run
+from unu_api.stub import StubServer
+
+
+def test_run_pipeline():
+    """
+    Тест выполнения операций с ограничением параллельности и порядком строк
+    """
+    lines = [
+        '{"action": "task_pause", "params": {"task_id": %d}, "id": %d}' % (i, i)
+        for i in range(1, 41)
+    ]
+    lines[5] = '{"action": "task_pause", "task_id": 9999}'
+    lines[6] = "# комментарий"
+    lines[7] = "не json"
+    output = []
+    with StubServer(tasks=40, reports=0) as server:
+        unu = Api(url=server.url, token="test", transport="urllib3")
+        stats = run(unu, lines, output.append, concurrency=4, ordered=True)
+        assert server.requests["task_pause"] == 38
+        assert server.state.tasks[1]["status"] == 3
+    results = [json.loads(line) for line in output]
+    assert (stats.total, stats.failed) == (39, 2)
+    assert [r["line"] for r in results] == [n for n in range(1, 41) if n != 7]
+    assert results[0] == {
+        "line": 1,
+        "id": 1,
+        "action": "task_pause",
+        "ok": True,
+        "result": {"success": "true"},
+    }
+    assert results[5]["error"] == "RequestError"
+    assert results[6]["error"] == "JSONDecodeError"
+
+
+def test_parse_operation():
+    """
+    Тест разбора строки операции
+    """
+    assert parse_operation('{"action": "get_tasks", "folder_id": 1}') == (
+        "get_tasks",
+        {"folder_id": 1},
+        None,
+    )
+    with pytest.raises(ValueError):
+        parse_operation('{"action": "close"}')
+    with pytest.raises(ValueError):
+        parse_operation("[1, 2]")
+
+
+def test_main(tmp_path, monkeypatch, capsys):
+    """
+    Тест команды run: операции со стандартного ввода, результаты в файл
+    """
+    path = tmp_path / "out.ndjson"
+    monkeypatch.setattr(sys, "stdin", io.StringIO('{"action": "get_balance"}\n'))
+    with StubServer(tasks=1, reports=0, balance=5.0) as server:
+        argv = ["run", "-o", str(path), "--url", server.url, "--token", "test"]
+        assert main(argv) == 0
+    (result,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert result["result"]["balance"] == 5.0
+    assert "1 операций, 0 с ошибкой" in capsys.readouterr().err
+
+    monkeypatch.delenv("API_KEY", raising=False)
+    assert main(["run"]) == 2
+
+
+def test_lazy_package():
+    """
+    Тест ленивых имён пакета: совпадают с __all__ модулей, а import unu_api
+    не загружает HTTP-клиенты
+    """
+    for module, names in unu_api.MODULES.items():
+        exported = getattr(
+            importlib.import_module("unu_api." + module), "__all__", None
+        )
+        if exported is not None:
+            assert sorted(names) == sorted(exported), module
+        for name in names:
+            assert getattr(unu_api, name) is not None
+    code = (
+        "import sys, unu_api, unu_api.cli;"
+        "print(sorted({'requests', 'httpx', 'aiohttp', 'asyncio'} & set(sys.modules)))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert loaded.stdout.strip() == "[]"
+
+
+def test_ordered_bound():
+    """
+    Тест предела в режиме ordered: за медленной первой операцией
+    не накапливаются результаты всего файла
+    """
+    release = threading.Event()
+    read_while_blocked = []
+
+    class SlowFirst:
+        calls = 0
+
+        def get_balance(self):
+            SlowFirst.calls += 1
+            if SlowFirst.calls == 1:
+                release.wait(5)
+            return {"balance": 1}
+
+    def lines():
+        for _ in range(200):
+            if not release.is_set():
+                read_while_blocked.append(1)
+            yield '{"action": "get_balance"}'
+
+    threading.Timer(0.3, release.set).start()
+    output = []
+    stats = run(SlowFirst(), lines(), output.append, concurrency=2, ordered=True)
+    assert stats.total == 200 and len(output) == 200
+    assert len(read_while_blocked) <= 5
+
+
+def test_import_is_lazy():
+    """
+    Тест того, что import unu_api не загружает модули пакета и зависимости
+    """
+    code = (
+        "import sys; before = set(sys.modules); import unu_api;"
+        "print(sorted(name for name in set(sys.modules) - before"
+        " if name.startswith('unu_api.') or name in ('requests', 'urllib3',"
+        " 'asyncio', 'csv', 'gzip', 'lzma', 'argparse', 'orjson', 'numpy')))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert loaded.stdout.strip() == "[]"
@@ -0,0 +1,84 @@
+"""
+Тесты клиента без обращения к API
+"""
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from unu_api import Api, Client, Hook
+from unu_api import client as client_module
+from unu_api.stub import StubServer
+
+
+def test_session_per_instance():
+    """
+    Тест того, что каждый экземпляр владеет собственным пулом соединений
+    """
+    first = Api(token="test", pool_size=32, read_timeout=3.0)
+    second = Api(token="test")
+    assert first.session is not second.session
+    assert first.session.get_adapter("https://unu.im")._pool_maxsize == 32
+    assert first.timeout == (5.0, 3.0)
+
+
+def test_session_shared_between_threads():
+    """
+    Тест общей сессии экземпляра при обращении из нескольких потоков
+    """
+    unu = Api(token="test")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        sessions = set(pool.map(lambda _: id(unu.session), range(64)))
+    assert len(sessions) == 1
+
+
+def test_session_per_thread():
+    """
+    Тест отдельных сессий для каждого потока
+    """
+    unu = Api(token="test", per_thread_session=True)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        other = pool.submit(lambda: unu.session).result()
+    assert unu.session is unu.session
+    assert unu.session is not other
+    unu.close()
+    assert not unu.transport.sessions
+
+
+def test_post_on_class_still_works():
+    """
+    Тест прежнего вызова Client.post у класса: выполняется общим клиентом
+    """
+    with StubServer(tasks=1, reports=0, balance=3.0) as server:
+        data = {"api_key": "test", "action": "get_balance"}
+        with pytest.warns(DeprecationWarning):
+            response = Client.post(url=server.url, data=data)
+        assert response["balance"] == 3.0
+        unu = Api(url=server.url, token="test")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            assert unu.post(server.url, data)["balance"] == 3.0
+
+
+def test_class_post_default_client_isolated():
+    """
+    Тест того, что общий клиент вызовов у класса не связан с экземплярами
+    """
+
+    class Counter(Hook):
+        calls = 0
+
+        def before_request(self, action, data):
+            Counter.calls += 1
+
+    with StubServer(tasks=1, reports=0) as server:
+        unu = Api(url=server.url, token="test", cache=True, rate_limiter=True)
+        unu.add_hook(Counter())
+        data = {"api_key": "test", "action": "get_tariffs"}
+        with pytest.warns(DeprecationWarning):
+            Client.post(url=server.url, data=data)
+        default = client_module._default
+        assert type(default) is Client and default is not unu
+        assert default.session is not unu.session
+        assert (default.cache, default.rate_limiter, default.hooks) == (None, None, [])
+        assert Counter.calls == 0 and len(unu.cache) == 0
@@ -0,0 +1,35 @@
+"""
+Тесты декодеров JSON
+"""
+import pytest
+
+from unu_api import Api, DECODERS, JsonParsingError, RequestError, get_decoder
+from unu_api.client import parse_body
+
+BODY = '{"success": "true", "reports": [{"id": 1, "price_rub": 1.5, "name": "тест"}]}'
+
+
+@pytest.mark.parametrize("name", list(DECODERS))
+def test_decoders_agree(name):
+    """
+    Тест одинакового результата всех установленных декодеров
+    """
+    try:
+        decode = get_decoder(name)
+    except ImportError:
+        pytest.skip("%s не установлен" % name)
+    body = BODY.encode()
+    assert parse_body(200, body, decode) == get_decoder("json")(body)
+    with pytest.raises(JsonParsingError):
+        parse_body(500, b"<b>Fatal error</b>", decode)
+    with pytest.raises(RequestError):
+        parse_body(200, b'{"success": "false"}', decode)
+
+
+def test_custom_decoder():
+    """
+    Тест собственной функции декодирования
+    """
+    unu = Api(token="test", decoder=lambda body: {"success": "true"})
+    assert unu.decode(b"") == {"success": "true"}
+    assert callable(Api(token="test").decode)
@@ -0,0 +1,139 @@
+"""
+Тесты агрегации расходов
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from unu_api import Api, AsyncApi, ExpenseAggregator, windows
+
+
+class ExpensesApi(Api):
+    """
+    Api без сети: расход за окно равен дню месяца его начала
+    """
+
+    def _request(self, url, data, info=None):
+        self.calls = getattr(self, "calls", 0) + 1
+        day = datetime.strptime(str(data["date_from"]), "%Y-%m-%d %H:%M:%S").day
+        folder = int(data.get("folder_id") or 0)
+        return {
+            "success": "true",
+            "expenses": day + folder * 100,
+            "expenses_in_rub": day / 2,
+        }
+
+
+def test_windows_do_not_overlap():
+    """
+    Тест разбиения периода на окна без пересечений
+    """
+    result = windows(datetime(2020, 1, 1), datetime(2020, 1, 3, 12), timedelta(days=1))
+    assert [end for _, end in result] == [
+        datetime(2020, 1, 1, 23, 59, 59),
+        datetime(2020, 1, 2, 23, 59, 59),
+        datetime(2020, 1, 3, 12),
+    ]
+
+
+def test_closed_windows_are_cached():
+    """
+    Тест того, что повторно запрашивается только открытое окно
+    """
+    unu = ExpensesApi(token="test")
+    aggregator = ExpenseAggregator(unu, workers=4)
+    now = datetime(2020, 1, 10, 15)
+    date_to = datetime(2020, 1, 10, 23, 59, 59)
+    series = aggregator.series(datetime(2020, 1, 1), date_to, now=now)
+    assert len(series) == 10 and unu.calls == 10
+    assert list(series.expenses) == [float(day) for day in range(1, 11)]
+    assert series.total() == 55.0
+    assert series.dates[0] == datetime(2020, 1, 1, tzinfo=timezone.utc)
+    aggregator.series(datetime(2020, 1, 1), date_to, now=now)
+    assert unu.calls == 11
+    assert series.to_numpy()["expenses"].sum() == 55.0
+    assert str(series.to_numpy()["starts"].dtype) == "datetime64[s]"
+
+
+def test_expenses_by_folder_async():
+    """
+    Тест расходов по папкам асинхронным клиентом
+    """
+
+    class ExpensesAsyncApi(AsyncApi):
+        async def _request(self, url, data, info=None):
+            return ExpensesApi._request(self, url, data)
+
+    async def run():
+        async with ExpensesAsyncApi(token="test") as unu:
+            aggregator = ExpenseAggregator(unu)
+            return await aggregator.by_folder(
+                [1, 2], datetime(2020, 2, 1), datetime(2020, 2, 3, 23, 59, 59)
+            )
+
+    result = asyncio.run(run())
+    assert sorted(result) == [1, 2]
+    assert list(result[2].expenses) == [201.0, 202.0, 203.0]
+    assert list(result[1].expenses_in_rub) == [0.5, 1.0, 1.5]
+
+
+def test_dates_in_utc(monkeypatch):
+    """
+    Тест того, что даты окон не сдвигаются локальным часовым поясом
+    """
+    numpy = pytest.importorskip("numpy")
+    monkeypatch.setenv("TZ", "Asia/Vladivostok")
+    time.tzset()
+    try:
+        unu = ExpensesApi(token="test")
+        aggregator = ExpenseAggregator(unu)
+        local = timezone(timedelta(hours=3))
+        series = aggregator.series(
+            datetime(2020, 1, 1, 3, tzinfo=local),
+            datetime(2020, 1, 2, 23, 59, 59),
+            now=datetime(2020, 1, 5),
+        )
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert series.dates == [
+        datetime(2020, 1, 1, tzinfo=timezone.utc),
+        datetime(2020, 1, 2, tzinfo=timezone.utc),
+    ]
+    assert list(series.expenses) == [1.0, 2.0]
+    starts = series.to_numpy()["starts"]
+    assert list(starts) == [
+        numpy.datetime64("2020-01-01"),
+        numpy.datetime64("2020-01-02"),
+    ]
+
+
+def test_server_timezone():
+    """
+    Тест часового пояса сервера: даты без пояса уходят в запрос
+    без сдвига, даты с поясом переводятся в часовой пояс сервера
+    """
+    sent = []
+
+    class RecordingApi(ExpensesApi):
+        def _request(self, url, data, info=None):
+            sent.append((str(data["date_from"]), str(data["date_to"])))
+            return ExpensesApi._request(self, url, data, info)
+
+    moscow = timezone(timedelta(hours=3))
+    aggregator = ExpenseAggregator(RecordingApi(token="test"), tz=moscow)
+    series = aggregator.series(
+        datetime(2020, 1, 1),
+        datetime(2020, 1, 1, 23, 59, 59),
+        now=datetime(2020, 1, 5),
+    )
+    assert sent == [("2020-01-01 00:00:00", "2020-01-01 23:59:59")]
+    assert series.dates == [datetime(2019, 12, 31, 21, tzinfo=timezone.utc)]
+    aggregator.series(
+        datetime(2020, 1, 1, 21, tzinfo=timezone.utc),
+        datetime(2020, 1, 2, 20, 59, 59, tzinfo=timezone.utc),
+        now=datetime(2020, 1, 5),
+    )
+    assert sent[1] == ("2020-01-02 00:00:00", "2020-01-02 23:59:59")
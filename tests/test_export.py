@@ -0,0 +1,137 @@
+"""
+Тесты потоковой выгрузки
+"""
+import asyncio
+import csv
+import gzip
+import json
+
+import pytest
+
+from unu_api import Api, AsyncApi, export
+from unu_api.exporting import CsvWriter, main
+from unu_api.stub import StubServer
+
+
+def test_export_formats(tmp_path):
+    """
+    Тест выгрузки отчётов в NDJSON, CSV с gzip и Parquet фрагментами
+    """
+    with StubServer(tasks=10, reports=2500) as server:
+        unu = Api(url=server.url, token="test")
+        stats = unu.export_reports(str(tmp_path / "r.ndjson"), chunk_size=1000)
+        assert (stats.rows, stats.chunks) == (2500, 3)
+        with open(str(tmp_path / "r.ndjson"), encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file]
+        assert rows[0] == server.state.reports[1]
+
+        unu.export_tasks(str(tmp_path / "t.csv.gz"), folder_id=1)
+        with gzip.open(str(tmp_path / "t.csv.gz"), "rt", encoding="utf-8") as file:
+            tasks = list(csv.DictReader(file))
+        expected = [t for t in server.state.tasks.values() if t["folder_id"] == 1]
+        assert [int(t["id"]) for t in tasks] == [t["id"] for t in expected]
+
+        pyarrow = pytest.importorskip("pyarrow.parquet")
+        typed = Api(url=server.url, token="test", typed=True)
+        path = str(tmp_path / "r.parquet")
+        typed.export_reports(path, chunk_size=1000, compression="zstd")
+        table = pyarrow.read_table(path)
+        assert table.num_rows == 2500
+        assert str(table.schema.field("price_rub").type) == "double"
+        assert table.column("status").to_pylist()[:3] == [
+            server.state.reports[i]["status"] for i in (1, 2, 3)
+        ]
+
+
+def test_export_empty_and_plain_records(tmp_path):
+    """
+    Тест выгрузки пустого набора и словарей с произвольными полями
+    """
+    path = str(tmp_path / "empty.csv")
+    stats = export([], path, kind="reports")
+    assert stats.rows == 0
+    with open(path, encoding="utf-8") as file:
+        assert file.read().startswith("id,task_id,worker_id")
+
+    path = str(tmp_path / "plain.csv")
+    export(({"a": i, "b": str(i)} for i in range(5)), path, chunk_size=2)
+    with open(path, encoding="utf-8") as file:
+        assert file.read().splitlines() == ["a,b"] + [
+            "%d,%d" % (i, i) for i in range(5)
+        ]
+    with pytest.raises(ValueError):
+        export([], str(tmp_path / "x.csv"), compression="zip")
+
+
+def test_export_typed_matches_untyped(tmp_path):
+    """
+    Тест того, что выгрузка моделей совпадает с выгрузкой словарей,
+    даже если поля моделей уже прочитаны
+    """
+    with StubServer(tasks=5, reports=300) as server:
+        plain = Api(url=server.url, token="test")
+        typed = Api(url=server.url, token="test", typed=True)
+        records = list(typed.iter_reports())
+        assert {record.status for record in records}
+        for name in ("r.ndjson", "r.csv"):
+            plain_path, typed_path = str(tmp_path / name), str(tmp_path / ("t" + name))
+            export(plain.iter_reports(), plain_path, kind="reports")
+            export(records, typed_path, kind="reports")
+            with open(plain_path, "rb") as left, open(typed_path, "rb") as right:
+                assert left.read() == right.read()
+
+
+def test_export_error_propagates(tmp_path, monkeypatch):
+    """
+    Тест ошибки источника: файл не создаётся, если писатель не открыт,
+    а ошибка закрытия не подменяет исходную
+    """
+
+    def failing(rows):
+        yield from ({"a": i} for i in range(rows))
+        raise KeyError("source")
+
+    path = tmp_path / "empty.csv"
+    with pytest.raises(KeyError):
+        export(failing(0), str(path))
+    assert not path.exists()
+
+    def broken_close(self):
+        raise OSError("close")
+
+    monkeypatch.setattr(CsvWriter, "close", broken_close)
+    with pytest.raises(KeyError):
+        export(failing(3), str(tmp_path / "partial.csv"), chunk_size=2)
+
+
+def test_export_async_and_cli(tmp_path):
+    """
+    Тест асинхронной выгрузки и команды python -m unu_api.exporting
+    """
+
+    async def run(url, path):
+        async with AsyncApi(url=url, token="test") as unu:
+            return await unu.export_reports(path, task_id=1)
+
+    with StubServer(tasks=5, reports=300) as server:
+        path = str(tmp_path / "r.jsonl.xz")
+        stats = asyncio.run(run(server.url, path))
+        expected = [r for r in server.state.reports.values() if r["task_id"] == 1]
+        assert stats.rows == len(expected)
+
+        path = str(tmp_path / "tasks.ndjson")
+        main(["tasks", path, "--url", server.url, "--token", "test"])
+        with open(path, encoding="utf-8") as file:
+            assert len(file.readlines()) == 5
+
+
+def test_module_not_shadowed():
+    """
+    Тест того, что функция export не подменяет модуль выгрузки
+    """
+    import unu_api  # pylint: disable=import-outside-toplevel
+    import unu_api.exporting as module  # pylint: disable=import-outside-toplevel
+
+    assert unu_api.export is module.export
+    assert callable(unu_api.export)
+    assert module.__name__ == "unu_api.exporting"
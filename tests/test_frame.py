@@ -0,0 +1,87 @@
+"""
+Тесты столбцового представления отчётов
+"""
+import asyncio
+from collections import Counter, defaultdict
+
+import pytest
+
+from unu_api import Api, AsyncApi, ReportFrame
+from unu_api.stub import StubServer
+
+numpy = pytest.importorskip("numpy")
+
+
+def test_groupby_matches_dict_loops():
+    """
+    Тест агрегатов по сравнению с циклами по словарям
+    """
+    with StubServer(tasks=30, reports=3000) as server:
+        reports = Api(url=server.url, token="test").get_reports()["reports"]
+        frame = Api(url=server.url, token="test", typed=True).report_frame()
+    assert len(frame) == 3000
+
+    spend = defaultdict(float)
+    for report in reports:
+        if report["status"] == 6:
+            spend[report["worker_id"]] += report["price_rub"]
+    paid = frame[frame.mask(status=6)]
+    by_worker = paid.groupby("worker_id")
+    assert by_worker.to_dict(by_worker.sum("price_rub")) == pytest.approx(dict(spend))
+
+    by_task = frame.groupby("task_id")
+    counts = Counter(report["task_id"] for report in reports)
+    assert by_task.to_dict(by_task.count()) == dict(counts)
+    prices = by_task.to_dict(by_task.mean("price_rub"))
+    assert prices[reports[0]["task_id"]] == pytest.approx(reports[0]["price_rub"])
+    assert (by_task.min("price_rub") == by_task.max("price_rub")).all()
+
+    result = frame.groupby("folder_id").aggregate(
+        reports=("id", "count"), workers=("worker_id", "nunique")
+    )
+    folder = result["folder_id"][0]
+    workers = {r["worker_id"] for r in reports if r["folder_id"] == folder}
+    assert result["workers"][0] == len(workers)
+
+
+def test_crosstab_and_conversion():
+    """
+    Тест долей статусов по папкам и разбора строковых значений
+    """
+    frame = ReportFrame.from_response(
+        {
+            "reports": {
+                "1": {"id": "1", "task_id": "1", "status": "2", "folder_id": 1},
+                "2": {"id": "2", "task_id": "1", "status": "6", "folder_id": 1},
+                "3": {"id": "3", "task_id": "2", "status": "6", "folder_id": 2},
+                "4": {"id": "4", "task_id": "2", "status": 6, "price_rub": "1.5"},
+            }
+        }
+    )
+    assert frame.id.tolist() == [1, 2, 3, 4]
+    assert numpy.isnan(frame.price_rub[0]) and frame.price_rub[3] == 1.5
+    folders, statuses, table = frame.crosstab("folder_id", "status", normalize=True)
+    assert frame.folder_id[3] == -1
+    # строка без folder_id не образует группу с ключом-заглушкой
+    assert folders.tolist() == [1, 2]
+    assert statuses.tolist() == [2, 6]
+    assert table.tolist() == [[0.5, 0.5], [0.0, 1.0]]
+    by_folder = frame.groupby("folder_id")
+    assert by_folder.to_dict(by_folder.count()) == {1: 2, 2: 1}
+    assert len(frame[frame.mask(status=[2, 3])]) == 1
+
+
+def test_report_frame_async():
+    """
+    Тест построения кадра из асинхронного потока отчётов
+    """
+
+    async def run(url):
+        async with AsyncApi(url=url, token="test") as unu:
+            return await unu.report_frame(task_id=1)
+
+    with StubServer(tasks=5, reports=500) as server:
+        frame = asyncio.run(run(server.url))
+        expected = [r for r in server.state.reports.values() if r["task_id"] == 1]
+        assert len(frame) == len(expected)
+        assert set(frame.task_id.tolist()) == {1}
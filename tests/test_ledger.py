@@ -0,0 +1,115 @@
+"""
+Тесты локального учёта баланса
+"""
+import pytest
+
+from unu_api import Api, BalanceError, BalanceLedger, RateLimiter, RequestError
+from unu_api.stub import StubServer
+
+
+def test_rejects_locally_and_tracks_spend():
+    """
+    Тест отказа без запроса к API и прогноза баланса после трат
+    """
+    with StubServer(tasks=5, reports=0, balance=1000.0) as server:
+        unu = Api(url=server.url, token="test")
+        ledger = BalanceLedger(unu)
+        unu.get_tasks()
+        price = server.state.tasks[1]["price_unu"]
+        for _ in range(3):
+            unu.task_limit_add(task_id=1, add_to_limit=10)
+        assert server.requests["get_balance"] == 1
+        assert ledger.balance == pytest.approx(server.state.balance)
+        assert ledger.blocked_money == pytest.approx(30 * price)
+
+        with pytest.raises(BalanceError) as error:
+            unu.task_limit_add(task_id=1, add_to_limit=10**6)
+        assert error.value.required == pytest.approx(price * 10**6)
+        # перед отказом баланс сверяется ещё раз
+        assert server.requests["get_balance"] == 2
+        assert server.requests["task_limit_add"] == 3
+        assert ledger.stats()["rejected"] == 1
+        assert ledger.stats()["drifts"] == 0
+
+
+def test_resync_after_drift():
+    """
+    Тест сверки после пополнения баланса и после ошибки траты
+    """
+    now = [0.0]
+    with StubServer(tasks=2, reports=0, balance=10.0) as server:
+        unu = Api(url=server.url, token="test")
+        ledger = BalanceLedger(unu, resync_interval=60, clock=lambda: now[0])
+        ledger.set_price(1, 4.0)
+        server.state.tasks[1]["price_unu"] = 4.0
+        unu.task_limit_add(task_id=1, add_to_limit=2)
+        assert ledger.available == pytest.approx(2.0)
+
+        # пополнение, о котором ledger не знает: сверка перед отказом
+        server.state.balance += 100.0
+        unu.task_limit_add(task_id=1, add_to_limit=5)
+        assert ledger.balance == pytest.approx(server.state.balance)
+        assert ledger.stats()["drifts"] == 1
+
+        # цена задачи изменилась на сервере: ошибка требует сверки
+        server.state.tasks[1]["price_unu"] = 1000.0
+        with pytest.raises(RequestError):
+            unu.task_limit_add(task_id=1, add_to_limit=1)
+        assert ledger.stale
+        now[0] = 1.0
+        unu.get_tasks()
+        calls = server.requests["get_balance"]
+        with pytest.raises(BalanceError):
+            unu.task_limit_add(task_id=1, add_to_limit=1)
+        assert server.requests["get_balance"] == calls + 1
+
+
+def test_prices_in_unu():
+    """
+    Тест учёта в UNU, когда рубль цены задачи стоит не 1 UNU: цена из
+    add_task переводится по курсу или перечитывается через get_tasks
+    """
+    with StubServer(tasks=3, reports=0, balance=1000.0, rate=2.0) as server:
+        unu = Api(url=server.url, token="test")
+        ledger = BalanceLedger(unu)
+        task_id = unu.add_task(
+            name="a", descr="b", need_for_report="c", price=5.0, tarif_id=1, folder_id=1
+        )["task_id"]
+        # курс ещё неизвестен: цена перечитывается перед тратой
+        assert task_id in ledger.unpriced
+        unu.task_limit_add(task_id=task_id, add_to_limit=10)
+        assert server.requests["get_tasks"] == 1
+        assert ledger.prices[task_id] == server.state.tasks[task_id]["price_unu"]
+        assert ledger.rate == pytest.approx(2.0)
+        assert ledger.balance == pytest.approx(server.state.balance)
+
+        unu.edit_task(
+            task_id=task_id,
+            name="a",
+            descr="b",
+            need_for_report="c",
+            price=7.0,
+            tarif_id=1,
+            folder_id=1,
+        )
+        assert ledger.prices[task_id] == pytest.approx(14.0)
+        with pytest.raises(BalanceError) as error:
+            unu.task_limit_add(task_id=task_id, add_to_limit=100)
+        assert error.value.required == pytest.approx(1400.0)
+        assert server.requests["get_tasks"] == 1
+
+
+def test_rejection_keeps_rate_tokens():
+    """
+    Тест того, что отклонённая локально трата не занимает токен ограничителя
+    """
+    limiter = RateLimiter(rate=1000, per_action={"task_limit_add": 0.001})
+    with StubServer(tasks=1, reports=0, balance=1.0) as server:
+        unu = Api(url=server.url, token="test", rate_limiter=limiter)
+        ledger = BalanceLedger(unu)
+        ledger.set_price(1, 10.0)
+        for _ in range(3):
+            with pytest.raises(BalanceError):
+                unu.task_limit_add(task_id=1, add_to_limit=1)
+        assert limiter.reserve("task_limit_add") == 0.0
+        assert "task_limit_add" not in server.requests
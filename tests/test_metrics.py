@@ -0,0 +1,156 @@
+"""
+Тесты метрик и хуков
+"""
+import asyncio
+import urllib.request
+
+import pytest
+
+from unu_api import (
+    Api,
+    AsyncApi,
+    Hook,
+    Metrics,
+    RequestError,
+    RetryPolicy,
+    ThrottledError,
+    ValidationError,
+)
+from unu_api.stub import StubServer
+
+
+class RecordingHook(Hook):
+    """
+    Хук, запоминающий события
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, action, data):
+        self.events.append(("before", action))
+        return action.upper()
+
+    def after_response(self, action, data, token, info):
+        self.events.append(("after", token, info.status, info.error is None))
+
+    def on_retry(self, action, attempt, error):
+        self.events.append(("retry", action, attempt))
+
+
+def test_metrics_and_hooks():
+    """
+    Тест метрик по action и вызова хуков
+    """
+    hook = RecordingHook()
+    with StubServer(reports=50) as server:
+        unu = Api(url=server.url, token="test", metrics=True, hooks=[hook])
+        unu.get_balance()
+        unu.get_reports()
+        with pytest.raises(RequestError):
+            unu.approve_report(10**9)
+    summary = unu.metrics.summary()
+    assert summary["get_balance"]["count"] == 1
+    assert (
+        summary["get_reports"]["response_bytes"]
+        > summary["get_balance"]["response_bytes"]
+    )
+    assert summary["approve_report"]["errors"] == {"RequestError": 1}
+    assert hook.events[:2] == [
+        ("before", "get_balance"),
+        ("after", "GET_BALANCE", 200, True),
+    ]
+    text = unu.metrics.to_prometheus()
+    assert 'unu_api_requests_total{action="get_reports"} 1' in text
+    assert (
+        'unu_api_errors_total{action="approve_report",error="RequestError"} 1' in text
+    )
+    assert (
+        'unu_api_request_duration_seconds_bucket{action="get_balance",le="+Inf"} 1'
+        in text
+    )
+
+
+def test_retries_counted():
+    """
+    Тест учёта повторов в метриках
+    """
+    metrics = Metrics()
+    with StubServer(throttle_rate=1.0) as server:
+        unu = Api(
+            url=server.url, token="test", metrics=metrics, retry=RetryPolicy(backoff=0)
+        )
+        with pytest.raises(ThrottledError):
+            unu.get_folders()
+    assert metrics.summary()["get_folders"]["retries"] == 2
+    assert metrics.summary()["get_folders"]["errors"] == {"ThrottledError": 3}
+
+
+def test_async_metrics():
+    """
+    Тест метрик асинхронного клиента
+    """
+
+    async def run(url):
+        async with AsyncApi(url=url, token="test", metrics=True) as unu:
+            await asyncio.gather(*(unu.get_tariffs() for _ in range(5)))
+            return unu.metrics.summary()
+
+    with StubServer() as server:
+        summary = asyncio.run(run(server.url))
+    assert summary["get_tariffs"]["count"] == 5
+    assert summary["get_tariffs"]["request_bytes"] > 0
+
+
+def test_serve_local_by_default():
+    """
+    Тест сервера метрик: по умолчанию слушает только локальный адрес
+    """
+    metrics = Metrics()
+    server = metrics.serve(port=0)
+    try:
+        host, port = server.server_address
+        assert host == "127.0.0.1"
+        url = "http://127.0.0.1:%d/metrics" % port
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class Reject(Hook):
+    """
+    Хук, отклоняющий каждый запрос
+    """
+
+    def before_request(self, action, data):
+        raise ValidationError(["отказ"])
+
+
+def test_rejected_request_closes_hooks():
+    """
+    Тест отказа хука: хуки перед ним получают after_response с ошибкой,
+    метрики учитывают отклонённый запрос
+    """
+    hook = RecordingHook()
+    unu = Api(token="test", metrics=True, hooks=[hook, Reject()])
+    with pytest.raises(ValidationError):
+        unu.get_balance()
+    with pytest.raises(ValidationError):
+        list(unu.iter_reports())
+    assert hook.events == [
+        ("before", "get_balance"),
+        ("after", "GET_BALANCE", 0, False),
+        ("before", "get_reports"),
+        ("after", "GET_REPORTS", 0, False),
+    ]
+    assert unu.metrics.summary()["get_balance"]["errors"] == {"ValidationError": 1}
+
+    async def run():
+        async with AsyncApi(token="test", hooks=[hook, Reject()]) as client:
+            with pytest.raises(ValidationError):
+                await client.get_folders()
+
+    asyncio.run(run())
+    assert hook.events[-1] == ("after", "GET_FOLDERS", 0, False)
@@ -0,0 +1,79 @@
+"""
+Тесты типизированных моделей
+"""
+from unu_api import Api, Balance, Report, ReportStatus, Task, TaskStatus
+
+
+class TypedApi(Api):
+    """
+    Api без сети с фиксированными ответами
+    """
+
+    RESPONSES = {
+        "get_balance": {"success": "true", "balance": "10.5", "blocked_money": 1},
+        "get_reports": {
+            "success": "true",
+            "reports": [
+                {"id": "7", "task_id": 3, "status": "2", "price_rub": "1.5"},
+                {"id": 8, "task_id": 3, "status": 9, "price_rub": 2},
+            ],
+        },
+        "get_tasks": {"success": "true", "tasks": {"5": {"id": 5, "status": 4}}},
+    }
+
+    def _request(self, url, data, info=None):
+        return self.RESPONSES[data["action"]]
+
+
+def test_typed_responses():
+    """
+    Тест преобразования ответов в модели
+    """
+    unu = TypedApi(token="test", typed=True)
+    balance = unu.get_balance()
+    assert isinstance(balance, Balance)
+    assert balance.balance == 10.5
+    reports = unu.get_reports()
+    assert [report.id for report in reports] == [7, 8]
+    assert reports[0].status is ReportStatus.REVIEW
+    assert reports[0].price_rub == 1.5
+    assert reports[1].status == 9
+    assert reports[0].worker_id is None
+    tasks = unu.get_tasks()
+    assert tasks == [Task(id=5, status=4)]
+    assert tasks[0].status is TaskStatus.ACTIVE
+
+
+def test_record_is_compact():
+    """
+    Тест того, что у моделей нет словаря атрибутов
+    """
+    report = Report.from_dict({"id": 1, "status": 6, "unknown": "x"})
+    assert not hasattr(report, "__dict__")
+    assert report.to_dict()["status"] is ReportStatus.PAID
+    assert "unknown" not in report.to_dict()
+
+
+def test_record_hash_and_cached_fields():
+    """
+    Тест хэша моделей и однократного преобразования значений
+    """
+    raw = Report.from_dict({"id": "1", "status": "6", "price_rub": "2.5"})
+    same = Report(id=1, status=6, price_rub=2.5)
+    assert raw == same and hash(raw) == hash(same)
+    assert len({raw, same, Report(id=2)}) == 2
+    assert raw.status is ReportStatus.PAID
+    assert raw._status is ReportStatus.PAID
+    calls = []
+    field = Report.price_rub
+    convert = field.convert
+    field.convert = lambda value: calls.append(value) or convert(value)
+    try:
+        report = Report.from_dict({"price_rub": "3"})
+        assert report.price_rub == report.price_rub == 3.0
+        assert calls == ["3"]
+        report.price_rub = "4"
+        assert report.price_rub == 4.0
+        assert calls == ["3", "4"]
+    finally:
+        field.convert = convert
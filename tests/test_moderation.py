@@ -0,0 +1,90 @@
+"""
+Тесты очереди модерации
+"""
+from unu_api import Api, ModerationScheduler
+from unu_api.stub import StubServer
+
+
+class Clock:
+    """
+    Управляемые часы
+    """
+
+    def __init__(self):
+        self.now = 1001.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_urgent_and_expensive_first():
+    """
+    Тест порядка обработки: ближайший срок, затем более высокая цена
+    """
+    clock = Clock()
+    scheduler = ModerationScheduler(
+        api=None, decide=lambda report: None, review_window=100, clock=clock
+    )
+    scheduler.add({"id": 1, "price_rub": 1}, seen_at=950)
+    scheduler.add({"id": 2, "price_rub": 5}, seen_at=900)
+    scheduler.add({"id": 3, "price_rub": 9}, seen_at=950)
+    scheduler.add({"id": 4, "price_rub": 2}, seen_at=990)
+    scheduler.discard(4)
+    stats = scheduler.stats()
+    assert (stats["depth"], stats["lag"], stats["overdue"]) == (3, 101.0, 1)
+    order = []
+    while scheduler.depth:
+        order.append(scheduler.pop()[1]["id"])
+    assert order == [2, 3, 1]
+    assert scheduler.pop() is None
+
+
+def test_dispatch_against_stub():
+    """
+    Тест отправки решений по отчётам на проверке
+    """
+    with StubServer(tasks=3, reports=40, seed=5) as server:
+        unu = Api(url=server.url, token="test")
+        review = [r for r in server.state.reports.values() if r["status"] == 2]
+
+        def decide(report):
+            if report["id"] % 2:
+                return ("reject", 1, "Нужен скриншот")
+            return ("approve",)
+
+        scheduler = ModerationScheduler(unu, decide, rate=1000)
+        assert scheduler.refresh() == len(review)
+        done = scheduler.dispatch(limit=3)
+        assert len(done) == 3 and scheduler.depth == len(review) - 3
+        scheduler.dispatch()
+        assert scheduler.depth == 0
+        assert scheduler.stats()["dispatched"] == len(review)
+        assert all(r["status"] != 2 for r in server.state.reports.values())
+        assert scheduler.refresh() == 0
+
+
+def test_undecided_stay_queued():
+    """
+    Тест отчётов без решения: остаются в очереди и снова попадают в decide
+    """
+    with StubServer(tasks=1, reports=10, seed=5) as server:
+        unu = Api(url=server.url, token="test")
+        ready = set()
+        seen = []
+
+        def decide(report):
+            seen.append(report["id"])
+            return ("approve",) if report["id"] in ready else None
+
+        scheduler = ModerationScheduler(unu, decide, rate=1000)
+        queued = scheduler.refresh()
+        assert queued > 1
+        assert scheduler.dispatch() == []
+        assert scheduler.depth == queued
+        ready.update(seen[:1])
+        seen.clear()
+        (done,) = scheduler.dispatch()
+        assert done[0] in ready
+        assert len(seen) == queued
+        assert scheduler.depth == queued - 1
+        assert scheduler.stats()["dispatched"] == 1
@@ -0,0 +1,154 @@
+"""
+Тесты массового создания задач
+"""
+import asyncio
+
+from unu_api import Api, AsyncApi, ProvisionJournal, ReviewRequiredError, spec_key
+from unu_api.stub import StubServer
+
+
+def make_specs(count):
+    return [
+        {
+            "name": "Кампания %d" % index,
+            "descr": "Текст",
+            "need_for_report": "Скриншот",
+            "price": 5,
+            "tarif_id": 1,
+            "folder_id": 1,
+            "add_to_limit": 10,
+            "move_to": 2,
+        }
+        for index in range(count)
+    ]
+
+
+def test_provision_is_idempotent(tmp_path):
+    """
+    Тест того, что повторный запуск не создаёт и не оплачивает задачи заново
+    """
+    path = str(tmp_path / "journal.jsonl")
+    specs = make_specs(5)
+    with StubServer(tasks=0, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        result = unu.provision_tasks(specs, journal=ProvisionJournal(path))
+        assert result.ok and len(result.results) == 5
+        outcome = result.results[spec_key(specs[0])]
+        assert outcome.created and outcome.funded and outcome.moved
+        task = server.state.tasks[outcome.task_id]
+        assert (task["status"], task["folder_id"]) == (4, 2)
+        balance = server.state.balance
+        again = unu.provision_tasks(specs, journal=ProvisionJournal(path))
+        assert again.ok
+        assert not any(item.created or item.funded for item in again.results.values())
+        assert len(server.state.tasks) == 5
+        assert server.state.balance == balance
+        assert server.requests["add_task"] == 5
+        assert server.requests["task_limit_add"] == 5
+
+
+def test_provision_resumes_interrupted_stages():
+    """
+    Тест восстановления после обрыва между запросом и записью в журнал
+    """
+    specs = make_specs(2)
+    with StubServer(tasks=0, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        fields = [
+            {k: v for k, v in spec.items() if k not in ("add_to_limit", "move_to")}
+            for spec in specs
+        ]
+        created = unu.add_task(**fields[0])
+        funded = unu.add_task(**fields[1])
+        unu.task_limit_add(funded["task_id"], 10)
+        journal = ProvisionJournal()
+        journal.record(spec_key(specs[0]), "pending")
+        journal.record(spec_key(specs[1]), "funding", task_id=funded["task_id"])
+        result = unu.provision_tasks(specs, journal=journal)
+        first, second = (result.results[spec_key(spec)] for spec in specs)
+        assert (first.task_id, first.created, first.funded) == (
+            created["task_id"],
+            False,
+            True,
+        )
+        assert (second.task_id, second.funded, second.moved) == (
+            funded["task_id"],
+            False,
+            True,
+        )
+        assert len(server.state.tasks) == 2
+        assert server.requests["task_limit_add"] == 2
+
+
+def test_recovery_matches_spec():
+    """
+    Тест восстановления стадии pending: чужая неоплаченная задача с тем же
+    именем не засчитывается, одинаковые спецификации получают разные задачи
+    """
+    spec = make_specs(1)[0]
+    twins = [dict(spec, key="a"), dict(spec, key="b")]
+    fields = {k: v for k, v in spec.items() if k not in ("add_to_limit", "move_to")}
+    with StubServer(tasks=0, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        foreign = unu.add_task(**dict(fields, price=7))["task_id"]
+        created = [unu.add_task(**fields)["task_id"] for _ in twins]
+        journal = ProvisionJournal()
+        for twin in twins:
+            journal.record(twin["key"], "pending")
+        result = unu.provision_tasks(twins, journal)
+        assert result.ok
+        claimed = sorted(outcome.task_id for outcome in result.results.values())
+        assert claimed == sorted(created)
+        assert not any(outcome.created for outcome in result.results.values())
+        assert server.state.tasks[foreign]["status"] == 1
+        assert server.requests["add_task"] == 3
+
+
+def test_funding_resume_task_not_found():
+    """
+    Тест восстановления стадии funding, когда задачи нет в списке папки:
+    повторной оплаты нет, запись помечается для ручной проверки
+    """
+    spec = make_specs(1)[0]
+    key = spec_key(spec)
+    fields = {k: v for k, v in spec.items() if k not in ("add_to_limit", "move_to")}
+    with StubServer(tasks=0, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        task_id = unu.add_task(**fields)["task_id"]
+        unu.move_task(task_id, 2)
+        journal = ProvisionJournal()
+        journal.record(key, "funding", task_id=task_id)
+        result = unu.provision_tasks([spec], journal)
+        assert isinstance(result.errors[key], ReviewRequiredError)
+        assert journal.get(key)["stage"] == "review"
+        again = unu.provision_tasks([spec], journal)
+        assert isinstance(again.errors[key], ReviewRequiredError)
+        assert server.requests["get_tasks"] == 1
+
+        async def run(url):
+            async with AsyncApi(url=url, token="test") as client:
+                other = ProvisionJournal()
+                other.record(key, "funding", task_id=task_id)
+                return await client.provision_tasks([spec], other)
+
+        result = asyncio.run(run(server.url))
+        assert isinstance(result.errors[key], ReviewRequiredError)
+        assert "task_limit_add" not in server.requests
+
+
+def test_provision_async():
+    """
+    Тест массового создания задач асинхронным клиентом
+    """
+
+    async def run(url):
+        async with AsyncApi(url=url, token="test") as unu:
+            return await unu.provision_tasks(
+                make_specs(4), ProvisionJournal(), workers=2
+            )
+
+    with StubServer(tasks=0, reports=0) as server:
+        result = asyncio.run(run(server.url))
+        assert result.ok
+        assert sorted(item.task_id for item in result.results.values()) == [1, 2, 3, 4]
+        assert all(task["folder_id"] == 2 for task in server.state.tasks.values())
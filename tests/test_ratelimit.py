@@ -0,0 +1,83 @@
+"""
+Тесты ограничения частоты и повторов
+"""
+import pytest
+
+from unu_api import (
+    Api,
+    RateLimiter,
+    RetryPolicy,
+    ThrottledError,
+    TokenBucket,
+    TransportError,
+)
+from unu_api.stub import StubServer
+
+
+class FlakyApi(Api):
+    """
+    Api без сети: первые failures запросов завершаются сетевой ошибкой
+    """
+
+    failures = 2
+
+    def _request(self, url, data, info=None):
+        self.calls = getattr(self, "calls", 0) + 1
+        if self.calls <= self.failures:
+            raise TransportError
+        return {"success": "true"}
+
+
+def test_token_bucket():
+    """
+    Тест задержек ведра токенов
+    """
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_limiter_adapts():
+    """
+    Тест снижения частоты при ограничении со стороны API и её восстановления
+    """
+    limiter = RateLimiter(rate=8, per_action={"get_reports": 1}, increase=1)
+    limiter.record("get_balance", 0.1, ThrottledError())
+    assert limiter.rate == 4
+    limiter.record("get_balance", 0.1, ThrottledError())
+    assert limiter.rate == 4
+    for _ in range(10):
+        limiter.record("get_balance", 0.1)
+    assert limiter.rate == 8
+    limiter.reserve("get_reports")
+    assert limiter.reserve("get_reports") == pytest.approx(1.0, abs=0.01)
+
+
+def test_retry_reads_only():
+    """
+    Тест повторов: чтение повторяется, списание денег - никогда
+    """
+    retry = RetryPolicy(attempts=3, backoff=0)
+    unu = FlakyApi(token="test", retry=retry)
+    assert unu.get_balance()["success"] == "true"
+    assert unu.calls == 3
+    unu = FlakyApi(token="test", retry=RetryPolicy(actions=["approve_report"]))
+    with pytest.raises(TransportError):
+        unu.approve_report(1)
+    assert unu.calls == 1
+    unu = FlakyApi(token="test", retry=False)
+    with pytest.raises(TransportError):
+        unu.get_balance()
+
+
+def test_throttled_by_server():
+    """
+    Тест ответа 429 от сервера
+    """
+    with StubServer(throttle_rate=1.0) as server:
+        unu = Api(url=server.url, token="test", retry=RetryPolicy(backoff=0))
+        with pytest.raises(ThrottledError):
+            unu.get_balance()
+        assert server.requests["get_balance"] == 3
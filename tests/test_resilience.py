@@ -0,0 +1,293 @@
+"""
+Тесты предохранителя и дублирующих запросов
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from unu_api import (
+    Api,
+    AsyncApi,
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgePolicy,
+    Hook,
+    JsonParsingError,
+    RequestError,
+    TransportError,
+    ValidationError,
+)
+from unu_api.stub import StubServer
+
+
+def test_breaker_states():
+    """
+    Тест размыкания, пробного запроса и замыкания предохранителя
+    """
+    now = [0.0]
+    breaker = CircuitBreaker(failures=3, reset_timeout=10, clock=lambda: now[0])
+    for _ in range(2):
+        breaker.allow("get_tasks")
+        breaker.record("get_tasks", TransportError())
+    breaker.record("get_tasks", RequestError())
+    assert breaker.state("get_tasks") == "closed"
+    for _ in range(3):
+        breaker.record("get_tasks", TransportError())
+    assert breaker.state("get_tasks") == "open"
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.allow("get_tasks")
+    assert error.value.retry_after == 10
+    breaker.allow("get_balance")
+    now[0] = 11.0
+    breaker.allow("get_tasks")
+    assert breaker.state("get_tasks") == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow("get_tasks")
+    breaker.record("get_tasks", TransportError())
+    assert breaker.state("get_tasks") == "open"
+    now[0] = 22.0
+    breaker.allow("get_tasks")
+    breaker.record("get_tasks")
+    assert breaker.stats() == {"get_tasks": "closed", "get_balance": "closed"}
+
+
+def test_breaker_fails_fast():
+    """
+    Тест того, что при разомкнутом предохранителе запрос не отправляется
+    """
+    with StubServer(fault_rate=1.0) as server:
+        unu = Api(url=server.url, token="test", breaker=CircuitBreaker(failures=2))
+        for _ in range(2):
+            with pytest.raises(JsonParsingError):
+                unu.get_balance()
+        with pytest.raises(CircuitOpenError):
+            unu.get_balance()
+        assert server.requests["get_balance"] == 2
+
+
+class SlowFirstApi(Api):
+    """
+    Api без сети: первый запрос зависает, следующие отвечают сразу
+    """
+
+    def _request(self, url, data, info=None):
+        with self.lock:
+            self.calls += 1
+            first = self.calls == 1
+        time.sleep(1.0 if first else 0.01)
+        if info is not None:
+            info.status = 200
+        return {"success": "true", "first": first}
+
+
+def test_hedged_read():
+    """
+    Тест дублирования медленного запроса на чтение
+    """
+    hedge = HedgePolicy(min_samples=5)
+    for _ in range(5):
+        hedge.record("get_balance", 0.02)
+    unu = SlowFirstApi(token="test", hedge=hedge, metrics=True)
+    unu.calls, unu.lock = 0, threading.Lock()
+    started = time.perf_counter()
+    assert unu.get_balance() == {"success": "true", "first": False}
+    assert time.perf_counter() - started < 0.5
+    assert hedge.stats() == {"fired": 1, "wins": 1}
+    assert unu.metrics.summary()["get_balance"]["count"] == 1
+    unu.get_folders()
+    assert unu.calls == 3
+
+
+def test_hedged_read_busy_pool():
+    """
+    Тест дублирования при занятом пуле: первый запрос выполняется
+    в вызывающем потоке, а дубль не отправляется, пока он стоит в очереди
+    """
+    hedge = HedgePolicy(min_samples=1, workers=1)
+    hedge.record("get_balance", 0.02)
+    release = threading.Event()
+    blocker = hedge._executor().submit(release.wait)
+    threads = []
+
+    def call(info):
+        threads.append(threading.current_thread())
+        time.sleep(0.05)
+        return {"success": "true"}
+
+    timer = threading.Timer(1.0, release.set)
+    timer.start()
+    try:
+        assert hedge.run("get_balance", call) == {"success": "true"}
+        assert threads == [threading.current_thread()]
+        assert hedge.stats() == {"fired": 0, "wins": 0}
+    finally:
+        release.set()
+        timer.cancel()
+        blocker.result()
+
+
+def test_hedged_read_async():
+    """
+    Тест дублирования медленного запроса в асинхронном клиенте
+    """
+
+    class SlowFirstAsyncApi(AsyncApi):
+        async def _request(self, url, data, info=None):
+            self.calls += 1
+            first = self.calls == 1
+            await asyncio.sleep(1.0 if first else 0.01)
+            return {"success": "true", "first": first}
+
+    hedge = HedgePolicy(min_samples=1)
+    hedge.record("get_reports", 0.02)
+
+    async def run():
+        async with SlowFirstAsyncApi(token="test", hedge=hedge) as unu:
+            unu.calls = 0
+            return await unu.get_reports()
+
+    started = time.perf_counter()
+    assert asyncio.run(run())["first"] is False
+    assert time.perf_counter() - started < 0.5
+    assert hedge.wins == 1
+
+
+class ProbeApi(Api):
+    """
+    Api без сети: поведение запроса задаёт атрибут outcome
+    """
+
+    outcome = "ok"
+
+    def _request(self, url, data, info=None):
+        if self.outcome == "crash":
+            raise KeyboardInterrupt
+        return {"success": "true"}
+
+
+class RejectOnce(Hook):
+    def __init__(self):
+        self.rejected = False
+
+    def before_request(self, action, data):
+        if not self.rejected:
+            self.rejected = True
+            raise ValidationError(["отказ хука"])
+
+
+def _half_open(now):
+    now[0] = 0.0
+    breaker = CircuitBreaker(failures=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record("get_balance", TransportError())
+    now[0] = 11.0
+    return breaker
+
+
+def test_probe_released():
+    """
+    Тест пробного запроса, прерванного исключением вне API или отказом хука:
+    предохранитель не остаётся закрытым для следующих запросов навсегда
+    """
+    now = [0.0]
+    unu = ProbeApi(token="test", breaker=_half_open(now))
+    unu.outcome = "crash"
+    with pytest.raises(KeyboardInterrupt):
+        unu.get_balance()
+    unu.outcome = "ok"
+    assert unu.get_balance() == {"success": "true"}
+    assert unu.breaker.state("get_balance") == "closed"
+
+    unu = ProbeApi(token="test", breaker=_half_open(now), hooks=[RejectOnce()])
+    with pytest.raises(ValidationError):
+        unu.get_balance()
+    assert unu.get_balance() == {"success": "true"}
+    assert unu.breaker.state("get_balance") == "closed"
+
+
+def test_probe_released_async():
+    """
+    Тест отмены пробного запроса асинхронного клиента по таймауту
+    и отказа хука
+    """
+
+    class ProbeAsyncApi(AsyncApi):
+        delay = 1.0
+
+        async def _request(self, url, data, info=None):
+            await asyncio.sleep(self.delay)
+            return {"success": "true"}
+
+    async def run():
+        now = [0.0]
+        async with ProbeAsyncApi(token="test", breaker=_half_open(now)) as unu:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(unu.get_balance(), 0.05)
+            unu.delay = 0.0
+            assert await unu.get_balance() == {"success": "true"}
+            assert unu.breaker.state("get_balance") == "closed"
+        breaker = _half_open(now)
+        async with ProbeAsyncApi(token="test", breaker=breaker) as unu:
+            unu.delay = 0.0
+            unu.add_hook(RejectOnce())
+            with pytest.raises(ValidationError):
+                await unu.get_balance()
+            assert await unu.get_balance() == {"success": "true"}
+
+    asyncio.run(run())
+
+
+def test_stream_through_breaker():
+    """
+    Тест потокового чтения: ошибки учитываются предохранителем и хуками,
+    а ранний выход из цикла не оставляет пробный запрос занятым
+    """
+    with StubServer(tasks=1, reports=20, fault_rate=1.0) as server:
+        unu = Api(
+            url=server.url,
+            token="test",
+            breaker=CircuitBreaker(failures=2),
+            metrics=True,
+        )
+        for _ in range(2):
+            with pytest.raises(JsonParsingError):
+                list(unu.iter_reports())
+        with pytest.raises(CircuitOpenError):
+            list(unu.iter_reports())
+        assert server.requests["get_reports"] == 2
+        assert unu.metrics.summary()["get_reports"]["count"] == 3
+
+    now = [0.0]
+    with StubServer(tasks=1, reports=20) as server:
+        unu = Api(url=server.url, token="test", breaker=_half_open(now))
+        unu.breaker.record("get_reports", TransportError())
+        now[0] = 22.0
+        assert next(iter(unu.iter_reports())) is not None
+        assert unu.breaker.state("get_reports") == "closed"
+
+
+def test_stream_through_breaker_async():
+    """
+    Тест потокового чтения асинхронного клиента через предохранитель и метрики
+    """
+    pytest.importorskip("aiohttp")
+
+    async def run(url):
+        breaker = CircuitBreaker(failures=2)
+        async with AsyncApi(
+            url=url, token="test", breaker=breaker, metrics=True
+        ) as unu:
+            for _ in range(2):
+                with pytest.raises(JsonParsingError):
+                    async for _ in unu.iter_reports():
+                        pass
+            with pytest.raises(CircuitOpenError):
+                async for _ in unu.iter_reports():
+                    pass
+            return unu.metrics.summary()
+
+    with StubServer(tasks=1, reports=20, fault_rate=1.0) as server:
+        summary = asyncio.run(run(server.url))
+        assert server.requests["get_reports"] == 2
+    assert summary["get_reports"]["count"] == 3
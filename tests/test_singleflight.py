@@ -0,0 +1,86 @@
+"""
+Тесты объединения одновременных запросов
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from unu_api import Api, AsyncApi, SingleFlight, TransportError
+
+
+class SlowApi(Api):
+    """
+    Api без сети, отвечающее с задержкой
+    """
+
+    def _request(self, url, data, info=None):
+        with self.lock:
+            self.requests.append(data["action"])
+        time.sleep(0.05)
+        if data.get("folder_id") == -1:
+            raise TransportError
+        return {"success": "true", "folder_id": data.get("folder_id")}
+
+
+def make_api(**options):
+    unu = SlowApi(token="test", retry=False, **options)
+    unu.lock = threading.Lock()
+    unu.requests = []
+    return unu
+
+
+def test_threads_coalesced():
+    """
+    Тест объединения одновременных чтений из нескольких потоков
+    """
+    unu = make_api(coalesce=True)
+    barrier = threading.Barrier(8)
+
+    def call(index):
+        barrier.wait()
+        return unu.get_tasks(folder_id=index % 2)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(call, range(8)))
+    assert [result["folder_id"] for result in results] == [0, 1] * 4
+    assert sorted(unu.requests) == ["get_tasks", "get_tasks"]
+    assert unu.singleflight.stats() == {"calls": 2, "coalesced": 6}
+
+
+def test_errors_shared_and_writes_not_coalesced():
+    """
+    Тест общей ошибки для ожидающих и отсутствия объединения для записи
+    """
+    unu = make_api(coalesce=SingleFlight())
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(unu.get_tasks, folder_id=-1) for _ in range(4)]
+        for future in futures:
+            with pytest.raises(TransportError):
+                future.result()
+        list(pool.map(lambda _: unu.task_pause(task_id=1), range(4)))
+    assert unu.requests.count("task_pause") == 4
+
+
+def test_async_coalesced():
+    """
+    Тест объединения запросов в асинхронном клиенте
+    """
+
+    class SlowAsyncApi(AsyncApi):
+        async def _request(self, url, data, info=None):
+            self.requests.append(data["action"])
+            await asyncio.sleep(0.05)
+            return {"success": "true"}
+
+    async def run():
+        unu = SlowAsyncApi(token="test", coalesce=True)
+        unu.requests = []
+        results = await asyncio.gather(*(unu.get_balance() for _ in range(10)))
+        assert all(result is results[0] for result in results)
+        assert unu.requests == ["get_balance"]
+        assert unu.singleflight.coalesced == 9
+
+    asyncio.run(run())
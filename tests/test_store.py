@@ -0,0 +1,57 @@
+"""
+Тесты локального зеркала в SQLite
+"""
+from unu_api import Api, LocalStore
+from unu_api.stub import StubServer
+
+
+def test_store_refresh_and_queries(tmp_path):
+    """
+    Тест инкрементального обновления и запросов к зеркалу
+    """
+    with StubServer(tasks=5, reports=50, seed=3) as server:
+        unu = Api(url=server.url, token="test")
+        store = LocalStore(str(tmp_path / "unu.sqlite"))
+        stats = store.refresh(unu)
+        assert stats["reports"].inserted == 50
+        assert stats["tasks"].inserted == 5
+        assert len(store.folders()) == len(server.state.folders)
+        review = store.reports(status=2)
+        assert review and all(report["status"] == 2 for report in review)
+        unu.approve_report(review[0]["id"])
+        stats = store.refresh(unu, tables=["reports"])
+        assert (stats["reports"].updated, stats["reports"].inserted) == (1, 0)
+        assert stats["reports"].unchanged == 49
+        assert store.reports(task_id=review[0]["task_id"], status=6)
+        assert (
+            sum(store.count("reports", "folder_id", status=2).values())
+            == len(review) - 1
+        )
+        assert store.refreshed_at("reports") is not None
+        assert store.refresh_stale(unu, max_age=3600) == {}
+        store.close()
+
+
+def test_store_scoped_refresh_deletes():
+    """
+    Тест удаления пропавших строк при обновлении одной задачи
+    """
+
+    class ReportsApi(Api):
+        reports = [
+            {"id": 1, "task_id": 1, "status": 1},
+            {"id": 2, "task_id": 1, "status": 2},
+            {"id": 3, "task_id": 2, "status": 2},
+        ]
+
+        def iter_reports(self, task_id=None):
+            return (r for r in self.reports if task_id in (None, r["task_id"]))
+
+    unu = ReportsApi(token="test")
+    with LocalStore() as store:
+        store.refresh(unu, tables=["reports"])
+        unu.reports = unu.reports[1:]
+        stats = store.refresh(unu, tables=["reports"], task_id=1)
+        assert stats["reports"].deleted == 1
+        assert [report["id"] for report in store.reports()] == [2, 3]
+        assert store.count("reports", "task_id") == {1: 1, 2: 1}
@@ -0,0 +1,51 @@
+"""
+Тесты потокового разбора ответов
+"""
+import json
+
+import pytest
+
+from unu_api import JsonParsingError, RequestError, StreamParser, iter_json_array
+
+
+def chunked(body: bytes, size: int):
+    return (body[pos : pos + size] for pos in range(0, len(body), size))
+
+
+def test_iter_json_array_any_chunk_size():
+    """
+    Тест разбора при любом разбиении ответа на части
+    """
+    reports = [
+        {"id": index, "price_rub": 1.5 * index, "comment": "отчёт ✓ %d" % index}
+        for index in range(50)
+    ]
+    body = json.dumps(
+        {"success": "true", "reports": reports, "count": 50}, ensure_ascii=False
+    ).encode()
+    for size in (1, 3, 7, 64, len(body)):
+        assert list(iter_json_array(chunked(body, size), "reports")) == reports
+
+
+def test_stream_parser_head_and_object_array():
+    """
+    Тест полей верхнего уровня и массива, пришедшего в виде объекта
+    """
+    parser = StreamParser("tasks")
+    items = parser.feed(b'{"tasks": {"1": {"id": 1}}, "total": 12')
+    items += parser.feed(b', "success": "true"}')
+    items += parser.close()
+    assert items == [{"id": 1}]
+    assert parser.head == {"total": 12, "success": "true"}
+
+
+def test_stream_errors():
+    """
+    Тест исключений для неуспешного и повреждённого ответа
+    """
+    with pytest.raises(RequestError):
+        list(iter_json_array([b'{"success": "false", "error": "x"}'], "reports"))
+    with pytest.raises(JsonParsingError):
+        list(iter_json_array([b"<b>Fatal error</b>"], "reports"))
+    with pytest.raises(JsonParsingError):
+        list(iter_json_array([b'{"success": "true", "reports": [{"id"'], "reports"))
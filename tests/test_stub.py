@@ -0,0 +1,89 @@
+"""
+Тесты методов API на локальном сервере-заглушке
+"""
+import asyncio
+
+import pytest
+
+from unu_api import Api, AsyncApi, JsonParsingError, RequestError
+from unu_api.stub import StubServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StubServer(tasks=20, reports=200) as stub:
+        yield stub
+
+
+def test_every_action(server):
+    """
+    Тест того, что заглушка отвечает на все методы Api
+    """
+    unu = Api(url=server.url, token="test")
+    assert isinstance(unu.get_balance()["balance"], float)
+    folder_id = unu.create_folder("folder")["folder_id"]
+    assert folder_id in [folder["id"] for folder in unu.get_folders()["folders"]]
+    tariff = unu.get_tariffs()["tariffs"][0]
+    task_id = unu.add_task(
+        name="task",
+        descr="descr",
+        need_for_report="report",
+        price=tariff["min_price_rub"],
+        tarif_id=tariff["id"],
+        folder_id=folder_id,
+    )["task_id"]
+    assert unu.task_limit_add(task_id=task_id, add_to_limit=5)["success"] == "true"
+    unu.edit_task(
+        task_id=task_id,
+        name="edited",
+        descr="descr",
+        need_for_report="report",
+        price=tariff["min_price_rub"] + 1,
+        tarif_id=tariff["id"],
+        folder_id=folder_id,
+    )
+    unu.move_task(task_id=task_id, folder_id=1)
+    unu.task_pause(task_id=task_id)
+    unu.task_play(task_id=task_id)
+    assert [task["id"] for task in unu.get_tasks(folder_id=1)["tasks"]].count(task_id)
+    pending = [r["id"] for r in unu.get_reports()["reports"] if r["status"] == 2]
+    unu.approve_report(pending[0])
+    unu.reject_report(pending[1], reject_type=1, comment="переделать")
+    assert unu.get_expenses()["expenses"] > 0
+    assert unu.get_minter_wallet()["wallet"].startswith("Mx")
+    assert sum(1 for _ in unu.iter_reports()) == len(unu.get_reports()["reports"])
+    assert set(server.requests) >= set(server.actions)
+
+
+def test_async_actions(server):
+    """
+    Тест асинхронного клиента на заглушке
+    """
+
+    async def run():
+        async with AsyncApi(url=server.url, token="test") as unu:
+            balance, tasks = await asyncio.gather(unu.get_balance(), unu.get_tasks())
+            assert balance["success"] == "true"
+            streamed = [task async for task in unu.iter_tasks()]
+            assert streamed == tasks["tasks"]
+            with pytest.raises(RequestError):
+                await unu.approve_report(10**9)
+
+    asyncio.run(run())
+
+
+def test_error_injection():
+    """
+    Тест ошибок, которые заглушка возвращает по запросу
+    """
+    with StubServer(error_rate=1.0) as failing:
+        with pytest.raises(RequestError):
+            Api(url=failing.url, token="test").get_balance()
+
+    async def run(url):
+        async with AsyncApi(url=url, token="test") as unu:
+            await unu.get_balance()
+
+    with StubServer(fault_rate=1.0) as broken:
+        with pytest.raises(JsonParsingError):
+            asyncio.run(run(broken.url))
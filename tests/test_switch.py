@@ -0,0 +1,65 @@
+"""
+Тесты массовой остановки и запуска задач
+"""
+import asyncio
+
+from unu_api import Api, AsyncApi
+from unu_api.stub import StubServer
+
+
+def test_pause_only_active_tasks():
+    """
+    Тест остановки аккаунта: одно чтение, запросы только к активным задачам
+    и задачам на модерации, одна сверка
+    """
+    with StubServer(tasks=60, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        tasks = server.state.tasks.values()
+        for task_id in (1, 2, 3):
+            server.state.tasks[task_id]["status"] = 6
+        active = {t["id"] for t in tasks if t["status"] in (4, 6)}
+        result = unu.pause_tasks()
+        assert result.ok
+        assert server.requests["get_tasks"] == 2
+        assert server.requests["task_pause"] == len(result.changed)
+        assert all(task["status"] not in (4, 6) for task in tasks)
+        assert {1, 2, 3} <= set(result.changed)
+        assert active == set(result.changed)
+        assert len(result.changed) + len(result.skipped) == result.total == 60
+
+        again = unu.pause_tasks()
+        assert not again.changed and len(again.skipped) == 60
+        assert server.requests["get_tasks"] == 3
+
+
+def test_play_by_ids_and_reconcile_missing():
+    """
+    Тест запуска по списку задач: неизвестная задача попадает в errors
+    """
+    with StubServer(tasks=10, reports=0) as server:
+        for task in server.state.tasks.values():
+            task["status"] = 3
+        unu = Api(url=server.url, token="test")
+        server.state.tasks[5]["status"] = 1
+        result = unu.play_tasks(task_ids=[1, 2, 5, 999], statuses=[3])
+        assert sorted(result.changed) == [1, 2]
+        assert result.results == {1: 4, 2: 4}
+        assert list(result.errors) == [999]
+        assert server.state.tasks[3]["status"] == 3
+
+
+def test_pause_tasks_async():
+    """
+    Тест асинхронной остановки задач папки
+    """
+
+    async def run(url):
+        async with AsyncApi(url=url, token="test") as unu:
+            return await unu.pause_tasks(folder_id=1)
+
+    with StubServer(tasks=100, reports=0) as server:
+        result = asyncio.run(run(server.url))
+        assert result.ok
+        in_folder = [t for t in server.state.tasks.values() if t["folder_id"] == 1]
+        assert result.total == len(in_folder)
+        assert all(task["status"] != 4 for task in in_folder)
@@ -0,0 +1,49 @@
+"""
+Тесты инкрементальной синхронизации отчётов
+"""
+import queue
+
+from unu_api import Api, ReportEvent, ReportSync
+from unu_api.stub import StubServer
+
+
+def test_sync_emits_only_changes():
+    """
+    Тест событий о новых отчётах и сменах статуса
+    """
+    with StubServer(tasks=2, reports=10, seed=1) as server:
+        unu = Api(url=server.url, token="test")
+        sync = ReportSync(unu, interval=10, min_interval=1, max_interval=20)
+        first = sync.poll()
+        assert len(first) == 10
+        assert {event.kind for event in first} == {ReportEvent.NEW}
+        assert sync.poll() == []
+        assert sync.interval == 7.5
+        report_id = next(event.report_id for event in first if event.status == 2)
+        unu.approve_report(report_id)
+        events = sync.poll()
+        assert len(events) == 1
+        assert events[0].kind == ReportEvent.STATUS
+        assert (events[0].report_id, events[0].old_status) == (report_id, 2)
+        assert sync.interval == 3.75
+
+
+def test_sync_filter_and_queue():
+    """
+    Тест фильтра по статусу и доставки событий в очередь
+    """
+
+    class ReportsApi(Api):
+        def iter_reports(self, task_id=None):
+            self.polls = getattr(self, "polls", 0) + 1
+            yield {"id": 1, "status": 1}
+            yield {"id": 2, "status": 2 if self.polls > 1 else 1}
+
+    events = queue.Queue()
+    sync = ReportSync(
+        ReportsApi(token="test"), statuses=[2], emit_initial=False, interval=0.01
+    )
+    sync.start(events)
+    event = events.get(timeout=5)
+    sync.stop(timeout=5)
+    assert (event.kind, event.report_id, event.old_status) == ("status", 2, 1)
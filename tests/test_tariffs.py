@@ -0,0 +1,152 @@
+"""
+Тесты справочника тарифов и проверки параметров задач
+"""
+import asyncio
+
+import pytest
+
+from unu_api import (
+    Api,
+    AsyncApi,
+    Hook,
+    ProvisionJournal,
+    TariffIndex,
+    ValidationError,
+)
+from unu_api.stub import StubServer
+
+SPEC = {
+    "name": "Задача",
+    "descr": "Описание",
+    "need_for_report": "Скриншот",
+    "price": 5.0,
+    "tarif_id": 1,
+    "folder_id": 1,
+}
+
+
+def test_rejects_before_request():
+    """
+    Тест отказа add_task и edit_task без запроса к API
+    """
+    with StubServer(tasks=1, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        index = TariffIndex(unu)
+        with pytest.raises(ValidationError) as error:
+            unu.add_task(**dict(SPEC, price=0.5, time_for_work=200))
+        assert len(error.value.problems) == 2
+        with pytest.raises(ValidationError):
+            unu.edit_task(task_id=1, **dict(SPEC, targeting_gender=3))
+        assert "add_task" not in server.requests
+        assert "edit_task" not in server.requests
+        assert server.requests["get_tariffs"] == 1
+
+        assert unu.add_task(**dict(SPEC, time_for_work=168))["task_id"] == 2
+        assert index.min_price(1) == server.state.tariffs[0]["min_price_rub"]
+        assert index.group(1) == server.state.tariffs[0]["group_id"]
+        assert server.requests["get_tariffs"] == 1
+
+
+def test_refresh():
+    """
+    Тест обновления справочника по ttl и для неизвестного тарифа
+    """
+    now = [0.0]
+    with StubServer(tasks=1, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        index = TariffIndex(unu, ttl=60, clock=lambda: now[0])
+        assert index.problems(dict(SPEC, tarif_id=99)) == ["неизвестный тариф 99"]
+        # первая загрузка и одно обновление ради неизвестного тарифа
+        assert server.requests["get_tariffs"] == 2
+        assert index.problems(dict(SPEC, tarif_id=99))
+        assert server.requests["get_tariffs"] == 2
+
+        server.state.tariffs.append(
+            {"id": 99, "name": "Новый", "min_price_rub": 1.0, "group_id": 1}
+        )
+        now[0] = 61.0
+        assert index.problems(dict(SPEC, tarif_id=99)) == []
+        assert server.requests["get_tariffs"] == 3
+
+
+def test_not_a_number():
+    """
+    Тест того, что нечисловое значение не проверяется как 0
+    """
+    with StubServer(tasks=0, reports=0) as server:
+        index = TariffIndex(Api(url=server.url, token="test"))
+        assert index.problems(dict(SPEC, time_for_work="сутки")) == [
+            "time_for_work не число"
+        ]
+
+
+def test_refresh_outside_hook_chain():
+    """
+    Тест того, что справочник загружается до начала запроса,
+    а не внутри цепочки хуков add_task
+    """
+
+    class Recorder(Hook):
+        def __init__(self):
+            self.events = []
+
+        def before_request(self, action, data):
+            self.events.append(("before", action))
+
+        def after_response(self, action, data, token, info):
+            self.events.append(("after", action))
+
+    with StubServer(tasks=0, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        recorder = Recorder()
+        unu.add_hook(recorder)
+        TariffIndex(unu)
+        unu.add_task(**SPEC)
+        assert recorder.events == [
+            ("before", "get_tariffs"),
+            ("after", "get_tariffs"),
+            ("before", "add_task"),
+            ("after", "add_task"),
+        ]
+
+
+def test_provision_validates_batch():
+    """
+    Тест проверки партии: спецификации с ошибками не отправляются
+    """
+    specs = [
+        dict(SPEC, name="a", add_to_limit=1),
+        dict(SPEC, name="b", add_to_limit=1, price=0.1),
+        dict(SPEC, name="c", add_to_limit=1, delay_from=10, delay_to=5),
+        dict(SPEC, name="d", add_to_limit=1, tarif_id=2),
+    ]
+    with StubServer(tasks=0, reports=0) as server:
+        unu = Api(url=server.url, token="test")
+        index = TariffIndex(unu)
+        result = unu.provision_tasks(specs, ProvisionJournal(), tariffs=index)
+        assert result.total == 4
+        assert len(result.results) == 2
+        assert {type(error) for error in result.errors.values()} == {ValidationError}
+        assert server.requests["add_task"] == 2
+        assert server.requests["get_tariffs"] == 1
+
+
+def test_async_index():
+    """
+    Тест справочника для AsyncApi: загрузка через refresh_async
+    """
+    pytest.importorskip("aiohttp")
+
+    async def scenario(url):
+        async with AsyncApi(url=url, token="test", typed=True) as unu:
+            index = TariffIndex(unu)
+            # до загрузки проверяются только диапазоны значений
+            assert index.problems(dict(SPEC, price=0.1)) == []
+            await index.refresh_async()
+            assert index.problems(dict(SPEC, price=0.1))
+            with pytest.raises(ValidationError):
+                await unu.add_task(**dict(SPEC, price=0.1))
+
+    with StubServer(tasks=0, reports=0) as server:
+        asyncio.run(scenario(server.url))
+        assert "add_task" not in server.requests
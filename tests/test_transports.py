@@ -0,0 +1,58 @@
+"""
+Тесты HTTP-транспортов
+"""
+import pytest
+
+from unu_api import Api, TransportError, get_transport
+from unu_api.stub import StubServer
+
+
+@pytest.mark.parametrize("transport", ["requests", "urllib3", "httpx"])
+def test_transport_roundtrip(transport):
+    """
+    Тест запросов, потокового чтения и сжатия для каждого транспорта
+    """
+    with StubServer(tasks=10, reports=500, seed=2) as server:
+        with Api(
+            url=server.url, token="test", transport=transport, metrics=True
+        ) as unu:
+            reports = unu.get_reports()["reports"]
+            assert len(reports) == 500
+            received = unu.metrics.summary()["get_reports"]["response_bytes"]
+            assert list(unu.iter_reports()) == reports
+            assert unu.get_balance()["balance"] == server.state.balance
+            # потоковое чтение учитывается в метриках как отдельный запрос
+            assert unu.metrics.summary()["get_reports"]["count"] == 2
+        with Api(
+            url=server.url,
+            token="test",
+            transport=transport,
+            compress=False,
+            metrics=True,
+        ) as plain:
+            plain.get_reports()
+            raw = plain.metrics.summary()["get_reports"]["response_bytes"]
+        assert received * 3 < raw
+
+
+@pytest.mark.parametrize("transport", ["requests", "urllib3", "httpx"])
+def test_transport_errors(transport):
+    """
+    Тест преобразования сетевых ошибок в TransportError
+    """
+    unu = Api(
+        url="http://127.0.0.1:9/api", token="test", transport=transport, retry=False
+    )
+    with pytest.raises(TransportError):
+        unu.get_balance()
+    with pytest.raises(TransportError):
+        list(unu.iter_reports())
+    unu.close()
+
+
+def test_unknown_transport():
+    """
+    Тест ошибки для неизвестного транспорта
+    """
+    with pytest.raises(ValueError):
+        get_transport("curl")
@@ -1,3 +1,95 @@
-from .api import *
-from .client import *
-from .exceptions import *
+"""
+Клиент API биржи микрозадач unu.im
+
+Модули пакета загружаются при первом обращении к их именам, поэтому
+import unu_api не тянет aiohttp, requests и остальные зависимости,
+пока они не нужны (это важно для коротких запусков unu-api из cron).
+"""
+import importlib
+from typing import Any, List
+
+# Модуль -> имена, которые пакет отдаёт из него
+MODULES = {
+    "accounts": ("AccountPool", "merge_results"),
+    "api": ("Api",),
+    "async_api": ("AsyncApi",),
+    "bulk": ("BulkResult", "run_bulk", "run_bulk_async"),
+    "cache": ("ResponseCache", "DEFAULT_TTL", "INVALIDATES"),
+    "client": ("Client", "THROTTLE_STATUSES", "form_data", "parse_body"),
+    "decoders": ("Decoder", "DECODERS", "get_decoder"),
+    "exceptions": (
+        "ApiError",
+        "AuthError",
+        "BalanceError",
+        "BulkError",
+        "CircuitOpenError",
+        "JsonParsingError",
+        "RequestError",
+        "ReviewRequiredError",
+        "ThrottledError",
+        "TransportError",
+        "UnknowError",
+        "ValidationError",
+    ),
+    "expenses": ("ExpenseAggregator", "ExpenseSeries", "windows"),
+    "exporting": ("ExportStats", "FORMATS", "export", "export_async"),
+    "frame": ("GroupBy", "ReportFrame"),
+    "hooks": ("Hook", "CallInfo", "ProfilingHook"),
+    "ledger": ("BalanceLedger",),
+    "metrics": ("Metrics", "DEFAULT_BUCKETS"),
+    "models": (
+        "TaskStatus",
+        "ReportStatus",
+        "Record",
+        "Balance",
+        "Expenses",
+        "Folder",
+        "Tariff",
+        "Task",
+        "Report",
+        "parse_response",
+        "RECORDS",
+    ),
+    "moderation": ("ModerationScheduler",),
+    "provision": ("ProvisionJournal", "ProvisionOutcome", "spec_key"),
+    "ratelimit": (
+        "IDEMPOTENT_ACTIONS",
+        "MONEY_ACTIONS",
+        "TokenBucket",
+        "RateLimiter",
+        "RetryPolicy",
+    ),
+    "resilience": ("CircuitBreaker", "HedgePolicy", "HEDGED_ACTIONS"),
+    "singleflight": ("SingleFlight",),
+    "store": ("LocalStore", "RefreshStats"),
+    "stream": ("StreamParser", "iter_json_array"),
+    "switch": ("SwitchResult",),
+    "sync": ("ReportEvent", "ReportSync"),
+    "tariffs": ("TariffIndex",),
+    "transports": (
+        "HttpxTransport",
+        "RequestsTransport",
+        "Transport",
+        "TransportResponse",
+        "TRANSPORTS",
+        "Urllib3Transport",
+        "get_transport",
+    ),
+}
+
+_NAMES = {name: module for module, names in MODULES.items() for name in names}
+
+__all__ = sorted(_NAMES)
+
+
+def __getattr__(name: str) -> Any:
+    module = _NAMES.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
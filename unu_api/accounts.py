@@ -0,0 +1,128 @@
+"""
+Одновременная работа с несколькими аккаунтами
+"""
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple, Union
+
+from .api import Api
+from .bulk import BulkResult
+from .ratelimit import RateLimiter
+from .sync import _field
+
+__all__ = ["AccountPool", "merge_results"]
+
+# Параметры клиента, экземпляры которых нельзя делить между аккаунтами:
+# лимит частоты у каждого аккаунта свой. Кэш и SingleFlight можно делить -
+# их ключ содержит отпечаток токена, и ответы аккаунтов не смешиваются
+PER_ACCOUNT_OPTIONS = ("rate_limiter",)
+
+
+class AccountPool:
+    """
+    Набор клиентов для нескольких токенов, выполняющий одну операцию
+    во всех аккаунтах одновременно
+
+    У каждого аккаунта свой клиент и свой RateLimiter (limits), ошибка
+    одного аккаунта не прерывает остальные. Результат - BulkResult
+    с ответами и исключениями по именам аккаунтов. Общие ResponseCache
+    и SingleFlight (cache, coalesce) допустимы: записи разделены по токенам.
+
+    Входные данные
+        tokens (dict) - имя аккаунта -> токен; список токенов, \
+            тогда именем служит сам токен
+        api_class (type) - Api или AsyncApi
+        workers (int) - сколько аккаунтов опрашивать одновременно
+        limits (dict) - параметры RateLimiter для каждого аккаунта \
+            (необязательный параметр)
+        options - остальные параметры клиента
+    """
+
+    def __init__(
+        self,
+        tokens: Union[Mapping[str, str], Iterable[str]],
+        api_class: type = Api,
+        workers: int = 16,
+        limits: Dict[str, Any] = None,
+        **options,
+    ):
+        for name in PER_ACCOUNT_OPTIONS:
+            if options.get(name) not in (None, True, False):
+                raise ValueError(
+                    "%s нельзя делить между аккаунтами: передайте True "
+                    "или используйте limits" % name
+                )
+        if not isinstance(tokens, Mapping):
+            tokens = {token: token for token in tokens}
+        self.workers = workers
+        self.accounts: Dict[str, Api] = {}
+        for name, token in tokens.items():
+            if limits is not None:
+                options["rate_limiter"] = RateLimiter(**limits)
+            self.accounts[name] = api_class(token=token, **options)
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def __enter__(self) -> "AccountPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for api in self.accounts.values():
+            api.close()
+
+    async def aclose(self) -> None:
+        for api in self.accounts.values():
+            await api.aclose()
+
+    def run(
+        self,
+        method: Union[str, Callable[..., Any]],
+        *args: Any,
+        progress: Callable[[int, int], Any] = None,
+        **kwargs: Any,
+    ) -> BulkResult:
+        """
+        Выполняет метод во всех аккаунтах
+
+        Входные данные
+            method (str или callable) - имя метода Api, например \
+                "get_balance", или функция, принимающая клиент первым аргументом
+            args, kwargs - аргументы метода
+            progress (callable) - функция progress(done, total) \
+                (необязательный параметр)
+        Выходные данные
+            BulkResult - ответы (results) и исключения (errors) по именам \
+                аккаунтов; для AsyncApi - корутина
+        """
+        if not self.accounts:
+            return BulkResult()
+
+        def call(api: Api) -> Any:
+            if isinstance(method, str):
+                return getattr(api, method)(*args, **kwargs)
+            return method(api, *args, **kwargs)
+
+        calls = ((name, (api,)) for name, api in self.accounts.items())
+        bulk = next(iter(self.accounts.values())).bulk
+        return bulk(call, calls, self.workers, progress)
+
+
+def merge_results(result: BulkResult, key: str = None) -> List[Tuple[str, Any]]:
+    """
+    Объединяет ответы аккаунтов в список пар (имя аккаунта, значение)
+
+    С параметром key из каждого ответа берётся список (например "reports"),
+    и в результат попадает каждый его элемент. Аккаунты с ошибкой пропускаются.
+    """
+    merged: List[Tuple[str, Any]] = []
+    for name, response in result.results.items():
+        if key is None:
+            merged.append((name, response))
+            continue
+        items = response if isinstance(response, list) else _field(response, key)
+        if isinstance(items, dict):
+            items = items.values()
+        merged.extend((name, item) for item in items or ())
+    return merged
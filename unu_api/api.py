@@ -1,8 +1,15 @@
 """ Text """
 from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Tuple
 
+from .bulk import BulkResult, run_bulk
 from .client import Client
 from .exceptions import AuthError
+from .exporting import ExportStats, export
+from .frame import ReportFrame
+from .provision import ProvisionJournal, prepare, provision_task, task_fields
+from .switch import SwitchResult, switch_tasks
+from .tariffs import TariffIndex
 
 
 class Api(Client):
@@ -10,12 +17,23 @@ class Api(Client):
     Класс для работы с API
     """
 
-    def __init__(self, url: str = "https://unu.im/api", token: str = None):
+    def __init__(self, url: str = "https://unu.im/api", token: str = None, **options):
+        """
+        Параметры options (размер пула, таймауты, кэш, ограничение частоты \
+            и другие) передаются в Client
+        """
+        super().__init__(**options)
         self.url = url
         self.token = token
         if self.token is None:
             raise AuthError
 
+    _bulk = staticmethod(run_bulk)
+    _provision = staticmethod(provision_task)
+    _switch = staticmethod(switch_tasks)
+    _export = staticmethod(export)
+    _frame = staticmethod(ReportFrame.from_records)
+
     def get_balance(self) -> str:
         """
         Возвращает количество доступных средств.
@@ -30,7 +48,7 @@ class Api(Client):
             "api_key": self.token,
             "action": "get_balance",
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def get_folders(self) -> str:
         """
@@ -48,7 +66,7 @@ class Api(Client):
             "api_key": self.token,
             "action": "get_folders",
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def create_folder(self, name: str) -> str:
         """
@@ -64,7 +82,7 @@ class Api(Client):
             "action": "create_folder",
             "name": name,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def move_task(self, task_id: int, folder_id: int) -> str:
         """
@@ -82,7 +100,7 @@ class Api(Client):
             "task_id": task_id,
             "folder_id": folder_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def get_tasks(self, folder_id: int = None) -> str:
         """
@@ -110,7 +128,7 @@ class Api(Client):
             "action": "get_tasks",
             "folder_id": folder_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def get_reports(self, task_id: int = None) -> str:
         """
@@ -138,7 +156,108 @@ class Api(Client):
             "action": "get_reports",
             "task_id": task_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
+
+    def iter_tasks(self, folder_id: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Возвращает существующие задачи по одной, разбирая ответ \
+            по мере чтения. Память не растёт с количеством задач.
+
+        Входные данные
+            folder_id (int) - идентификатор папки, из которой \
+                нужно показать задачи (необязательный параметр)
+        Выходные данные
+            генератор задач, поля такие же, как у get_tasks
+        """
+        data = {
+            "api_key": self.token,
+            "action": "get_tasks",
+            "folder_id": folder_id,
+        }
+        return self.stream(url=self.url, data=data, key="tasks")
+
+    def iter_reports(self, task_id: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Возвращает отчёты по одному, разбирая ответ по мере чтения. \
+            Память не растёт с количеством отчётов.
+
+        Входные данные
+            task_id (int) - идентификатор задачи, по которой \
+                нужно вернуть отчёты (необязательный параметр)
+        Выходные данные
+            генератор отчётов, поля такие же, как у get_reports
+        """
+        data = {
+            "api_key": self.token,
+            "action": "get_reports",
+            "task_id": task_id,
+        }
+        return self.stream(url=self.url, data=data, key="reports")
+
+    def report_frame(self, task_id: int = None) -> ReportFrame:
+        """
+        Возвращает отчёты в виде столбцов NumPy для группировок \
+            и агрегатов без циклов по словарям (нужен numpy).
+
+        Входные данные
+            task_id (int) - отчёты одной задачи (необязательный параметр)
+        Выходные данные
+            ReportFrame - столбцы id, task_id, worker_id, price_unu, \
+                price_rub, status, folder_id
+        """
+        return self._frame(self.iter_reports(task_id=task_id))
+
+    def export_reports(
+        self,
+        path: str,
+        task_id: int = None,
+        fmt: str = None,
+        compression: str = None,
+        chunk_size: int = 10000,
+    ) -> ExportStats:
+        """
+        Выгружает отчёты в файл NDJSON, CSV или Parquet, читая ответ \
+            потоково и записывая его фрагментами по chunk_size строк.
+
+        Входные данные
+            path (str) - файл выгрузки, формат и сжатие определяются \
+                по расширению, например reports.csv.gz или reports.parquet
+            task_id (int) - отчёты одной задачи (необязательный параметр)
+            fmt (str) - "ndjson", "csv" или "parquet" (необязательный параметр)
+            compression (str) - "gzip", "bz2", "xz"; для Parquet - кодек \
+                pyarrow (необязательный параметр)
+            chunk_size (int) - строк во фрагменте
+        Выходные данные
+            ExportStats - число строк, время и размер файла
+        """
+        return self._export(
+            self.iter_reports(task_id=task_id),
+            path,
+            fmt,
+            compression,
+            chunk_size,
+            kind="reports",
+        )
+
+    def export_tasks(
+        self,
+        path: str,
+        folder_id: int = None,
+        fmt: str = None,
+        compression: str = None,
+        chunk_size: int = 10000,
+    ) -> ExportStats:
+        """
+        Выгружает задачи в файл. Параметры такие же, как у export_reports.
+        """
+        return self._export(
+            self.iter_tasks(folder_id=folder_id),
+            path,
+            fmt,
+            compression,
+            chunk_size,
+            kind="tasks",
+        )
 
     def approve_report(self, report_id: int) -> str:
         """
@@ -154,7 +273,7 @@ class Api(Client):
             "action": "approve_report",
             "report_id": report_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def reject_report(
         self, report_id: int, reject_type: int, comment: str = None
@@ -178,7 +297,121 @@ class Api(Client):
             "comment": comment,
             "reject_type": reject_type,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
+
+    def approve_reports(
+        self,
+        report_ids: Iterable[int],
+        workers: int = 8,
+        progress: Callable[[int, int], Any] = None,
+    ) -> BulkResult:
+        """
+        Принимает (оплачивает) несколько отчётов, выполняя запросы параллельно.
+
+        Входные данные
+            report_ids (list) - идентификаторы отчётов, которые нужно одобрить
+            workers (int) - сколько запросов выполнять одновременно
+            progress (callable) - функция progress(done, total), \
+                вызывается после каждого отчёта (необязательный параметр)
+        Выходные данные
+            BulkResult - ответы (results) и исключения (errors) \
+                по идентификаторам отчётов
+        """
+        calls = ((report_id, (report_id,)) for report_id in report_ids)
+        return self._bulk(self.approve_report, calls, workers, progress)
+
+    def reject_reports(
+        self,
+        reports: Iterable[Tuple[int, int, str]],
+        workers: int = 8,
+        progress: Callable[[int, int], Any] = None,
+    ) -> BulkResult:
+        """
+        Отклоняет несколько отчётов, выполняя запросы параллельно.
+
+        Входные данные
+            reports (list) - кортежи (report_id, reject_type, comment), \
+                значения такие же, как у reject_report
+            workers (int) - сколько запросов выполнять одновременно
+            progress (callable) - функция progress(done, total), \
+                вызывается после каждого отчёта (необязательный параметр)
+        Выходные данные
+            BulkResult - ответы (results) и исключения (errors) \
+                по идентификаторам отчётов
+        """
+        calls = ((report[0], tuple(report)) for report in reports)
+        return self._bulk(self.reject_report, calls, workers, progress)
+
+    def bulk(
+        self,
+        func: Callable[..., Any],
+        calls: Iterable[Tuple[Hashable, Tuple[Any, ...]]],
+        workers: int = 8,
+        progress: Callable[[int, int], Any] = None,
+    ) -> BulkResult:
+        """
+        Выполняет func(*args) для каждой пары (ключ, args) параллельно, \
+            как approve_reports. Для AsyncApi func - корутинная функция, \
+                а метод возвращает корутину.
+
+        Входные данные
+            func (callable) - вызываемый метод, например self.get_expenses
+            calls (iterable) - пары (ключ, кортеж аргументов func)
+            workers (int) - сколько вызовов выполнять одновременно
+            progress (callable) - функция progress(done, total) \
+                (необязательный параметр)
+        Выходные данные
+            BulkResult - ответы (results) и исключения (errors) по ключам
+        """
+        return self._bulk(func, calls, workers, progress)
+
+    def provision_tasks(
+        self,
+        specs: Iterable[Dict[str, Any]],
+        journal: ProvisionJournal,
+        workers: int = 8,
+        progress: Callable[[int, int], Any] = None,
+        tariffs: TariffIndex = None,
+    ) -> BulkResult:
+        """
+        Создаёт, оплачивает и, при необходимости, перемещает несколько задач. \
+            Спецификации обрабатываются параллельно, шаги одной \
+                задачи - последовательно.
+
+        Входные данные
+            specs (list) - словари с параметрами add_task и полями:
+                add_to_limit (int) - лимит выполнений для task_limit_add
+                move_to (int) - папка для move_task (необязательный параметр)
+                key (str) - ключ идемпотентности, по умолчанию \
+                    хэш спецификации (необязательный параметр)
+            journal (ProvisionJournal) - журнал стадий; при повторном \
+                запуске с тем же журналом выполненные шаги пропускаются. \
+                    Чтобы повтор пережил перезапуск процесса, журнал \
+                        должен писаться в файл: ProvisionJournal(path)
+            workers (int) - сколько задач обрабатывать одновременно
+            progress (callable) - функция progress(done, total) \
+                (необязательный параметр)
+            tariffs (TariffIndex) - справочник тарифов: вся партия \
+                проверяется до первого запроса, спецификации с ошибками \
+                попадают в errors как ValidationError и не отправляются \
+                (необязательный параметр)
+        Выходные данные
+            BulkResult - ProvisionOutcome (results) и исключения (errors) \
+                по ключам спецификаций
+        """
+        prepared = prepare(specs)
+        result = BulkResult()
+        if tariffs is not None:
+            errors = tariffs.validate(task_fields(spec) for _, spec in prepared)
+            for index, error in errors.items():
+                result.errors[prepared[index][0]] = error
+            result.total = len(errors)
+        calls = (
+            (key, (self, key, spec, journal))
+            for key, spec in prepared
+            if key not in result.errors
+        )
+        return self._bulk(self._provision, calls, workers, progress, result)
 
     def get_expenses(
         self,
@@ -213,7 +446,7 @@ class Api(Client):
             "date_from": date_from,
             "date_to": date_to,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def add_task(
         self,
@@ -313,7 +546,7 @@ class Api(Client):
             "targeting_geo_city_id": targeting_geo_city_id,
             "task_only_for_list_id": task_only_for_list_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def task_limit_add(self, task_id: int, add_to_limit: int) -> str:
         """
@@ -333,7 +566,7 @@ class Api(Client):
             "task_id": task_id,
             "add_to_limit": add_to_limit,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def edit_task(
         self,
@@ -429,7 +662,7 @@ class Api(Client):
             "targeting_geo_region_id": targeting_geo_region_id,
             "targeting_geo_city_id": targeting_geo_city_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def get_tariffs(self) -> str:
         """
@@ -449,7 +682,7 @@ class Api(Client):
             "api_key": self.token,
             "action": "get_tariffs",
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def task_pause(self, task_id: int) -> str:
         """
@@ -465,7 +698,7 @@ class Api(Client):
             "action": "task_pause",
             "task_id": task_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
 
     def task_play(self, task_id: int) -> str:
         """
@@ -481,7 +714,54 @@ class Api(Client):
             "action": "task_play",
             "task_id": task_id,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
+
+    def pause_tasks(
+        self,
+        folder_id: int = None,
+        statuses: Iterable[int] = None,
+        task_ids: Iterable[int] = None,
+        workers: int = 16,
+        progress: Callable[[int, int], Any] = None,
+    ) -> SwitchResult:
+        """
+        Приостанавливает несколько задач: задачи читаются одним запросом, \
+            task_pause отправляется параллельно только активным задачам \
+                и задачам на модерации, \
+                    результат сверяется одним повторным чтением.
+
+        Входные данные
+            folder_id (int) - только задачи папки (необязательный параметр)
+            statuses (list) - только задачи с этими статусами \
+                (необязательный параметр)
+            task_ids (list) - только задачи с этими идентификаторами \
+                (необязательный параметр)
+            workers (int) - сколько запросов выполнять одновременно
+            progress (callable) - функция progress(done, total) \
+                (необязательный параметр)
+        Выходные данные
+            SwitchResult - итоговые статусы (results), исключения (errors), \
+                изменённые (changed) и пропущенные (skipped) задачи
+        """
+        return self._switch(
+            self, "task_pause", folder_id, statuses, task_ids, workers, progress
+        )
+
+    def play_tasks(
+        self,
+        folder_id: int = None,
+        statuses: Iterable[int] = None,
+        task_ids: Iterable[int] = None,
+        workers: int = 16,
+        progress: Callable[[int, int], Any] = None,
+    ) -> SwitchResult:
+        """
+        Активирует несколько остановленных задач. Параметры и результат \
+            такие же, как у pause_tasks.
+        """
+        return self._switch(
+            self, "task_play", folder_id, statuses, task_ids, workers, progress
+        )
 
     def get_minter_wallet(self, email: str = None) -> str:
         """
@@ -500,4 +780,4 @@ class Api(Client):
             "action": "get_minter_wallet",
             "email": email,
         }
-        return Client.post(url=self.url, data=data)
+        return self.post(url=self.url, data=data)
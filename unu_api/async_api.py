@@ -0,0 +1,321 @@
+"""
+Асинхронный клиент к API
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict
+from urllib.parse import urlencode
+
+from .api import Api
+from .bulk import run_bulk_async
+from .cache import cache_key
+from .client import THROTTLE_STATUSES, form_data, parse_body
+from .exceptions import ApiError, ThrottledError, TransportError
+from .exporting import export_async
+from .frame import ReportFrame
+from .hooks import CallInfo
+from .models import RECORDS, parse_response
+from .provision import provision_task_async
+from .ratelimit import IDEMPOTENT_ACTIONS
+from .stream import StreamParser
+from .switch import switch_tasks_async
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - зависит от окружения
+    aiohttp = None
+
+__all__ = ["AsyncApi"]
+
+
+def _no_transport(transport: Any, **options: Any) -> None:
+    """
+    Синхронный транспорт AsyncApi не нужен: запросы идут через aiohttp
+    """
+    return None
+
+
+class AsyncApi(Api):
+    """
+    Асинхронный класс для работы с API
+
+    Повторяет все методы Api, но каждый из них возвращает корутину.
+    Соединения берутся из общего пула aiohttp, поэтому один цикл событий
+    может держать сотни одновременных запросов к API.
+
+    connect_timeout и read_timeout значат то же, что у Api, и переходят
+    в sock_connect и sock_read aiohttp; timeout ограничивает время всего
+    запроса (по умолчанию не ограничено). Синхронный HTTP-транспорт
+    не создаётся, параметры transport и pool_size не используются.
+    """
+
+    def __init__(
+        self,
+        url: str = "https://unu.im/api",
+        token: str = None,
+        limit: int = 100,
+        timeout: float = None,
+        **options,
+    ):
+        if aiohttp is None:
+            raise ImportError("Для AsyncApi нужен aiohttp: pip install unu_api[async]")
+        super().__init__(url=url, token=token, **options)
+        self.limit = limit
+        self.total_timeout = timeout
+        self._session = None
+
+    _transport = staticmethod(_no_transport)
+
+    _bulk = staticmethod(run_bulk_async)
+    _provision = staticmethod(provision_task_async)
+    _switch = staticmethod(switch_tasks_async)
+    _export = staticmethod(export_async)
+    _frame = staticmethod(ReportFrame.from_records_async)
+
+    async def __aenter__(self) -> "AsyncApi":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """
+        Лениво создаёт сессию: она должна принадлежать работающему циклу событий
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                timeout=self.client_timeout(),
+            )
+        return self._session
+
+    def client_timeout(self) -> "aiohttp.ClientTimeout":
+        """
+        Таймауты aiohttp из (connect_timeout, read_timeout) и timeout
+        """
+        connect, read = self.timeout
+        return aiohttp.ClientTimeout(
+            total=self.total_timeout, sock_connect=connect, sock_read=read
+        )
+
+    async def aclose(self) -> None:
+        """
+        Закрывает пул соединений
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def post(self, url: str, data: Dict[Any, Any]) -> Dict[str, Any]:
+        """
+        Метод реализует асинхронный post-запрос к API
+        """
+        response = await self._fetch(url, data)
+        if self.typed:
+            return parse_response(data.get("action"), response)
+        return response
+
+    async def _fetch(self, url: str, data: Dict[Any, Any]) -> Dict[str, Any]:
+        """
+        Выполняет асинхронный запрос с учётом кэша
+        """
+        cache = self.cache
+        if cache is None:
+            return await self._shared(url, data)
+        response = cache.get(data)
+        if response is not None:
+            return response
+        try:
+            response = await self._shared(url, data)
+        finally:
+            cache.invalidate_for(data.get("action"))
+        cache.put(data, response)
+        return response
+
+    async def _shared(self, url: str, data: Dict[Any, Any]) -> Dict[str, Any]:
+        """
+        Объединяет одновременные одинаковые запросы на чтение
+        """
+        flight = self.singleflight
+        if flight is None or data.get("action") not in IDEMPOTENT_ACTIONS:
+            return await self._send(url, data)
+        return await flight.do_async(cache_key(data), lambda: self._send(url, data))
+
+    async def _send(self, url: str, data: Dict[Any, Any]) -> Dict[str, Any]:
+        """
+        Выполняет асинхронный запрос с ограничением частоты, повторами и хуками
+        """
+        action = data.get("action")
+        limiter = self.rate_limiter
+        breaker = self.breaker
+        self._prepare(action, data)
+        attempt = 0
+        while True:
+            # локальные проверки хуков выполняются до того, как запрос займёт
+            # токен ограничителя или пробный запрос предохранителя
+            info = CallInfo(0.0) if self.hooks else None
+            tokens = self._before_request(action, data, info)
+            probe = sent = False
+            started = time.perf_counter()
+            try:
+                if breaker is not None:
+                    breaker.allow(action)
+                    probe = True
+                if limiter is not None:
+                    await asyncio.sleep(limiter.reserve(action))
+                started = time.perf_counter()
+                sent = True
+                response = await self._attempt(url, data, info)
+            except ApiError as error:
+                elapsed = time.perf_counter() - started
+                if probe:
+                    breaker.record(action, error, elapsed)
+                self._after_response(action, data, tokens, info, elapsed, error)
+                if not sent:
+                    raise
+                if limiter is not None:
+                    limiter.record(action, elapsed, error)
+                if self.retry is None or not self.retry.should_retry(
+                    action, error, attempt
+                ):
+                    raise
+                for hook in self.hooks:
+                    hook.on_retry(action, attempt, error)
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            except BaseException as error:
+                # отмена или таймаут корутины не должны держать предохранитель
+                if probe:
+                    breaker.release(action)
+                elapsed = time.perf_counter() - started
+                self._after_response(action, data, tokens, info, elapsed, error)
+                raise
+            elapsed = time.perf_counter() - started
+            if breaker is not None:
+                breaker.record(action, None, elapsed)
+            self._after_response(action, data, tokens, info, elapsed, None, response)
+            if limiter is not None:
+                limiter.record(action, elapsed)
+            return response
+
+    async def _attempt(
+        self, url: str, data: Dict[Any, Any], info: CallInfo
+    ) -> Dict[str, Any]:
+        """
+        Одна попытка запроса, при необходимости с дублированием
+        """
+        hedge = self.hedge
+        action = data.get("action")
+        if hedge is None or action not in hedge.actions:
+            return await self._request(url, data, info)
+        return await hedge.run_async(
+            action, lambda call_info: self._request(url, data, call_info), info
+        )
+
+    async def stream(
+        self, url: str, data: Dict[Any, Any], key: str, chunk_size: int = 65536
+    ) -> AsyncIterator[Any]:
+        """
+        Асинхронный вариант Client.stream: элементы массива key возвращаются
+        по мере чтения ответа из сокета
+        """
+        action = data.get("action")
+        limiter = self.rate_limiter
+        breaker = self.breaker
+        self._prepare(action, data)
+        attempt = 0
+        while True:
+            info = CallInfo(0.0) if self.hooks else None
+            tokens = self._before_request(action, data, info)
+            probe = sent = yielded = False
+            started = time.perf_counter()
+            try:
+                if breaker is not None:
+                    breaker.allow(action)
+                    probe = True
+                if limiter is not None:
+                    await asyncio.sleep(limiter.reserve(action))
+                started = time.perf_counter()
+                sent = True
+                async for item in self._stream_items(url, data, key, chunk_size, info):
+                    yielded = True
+                    yield item
+            except ApiError as error:
+                elapsed = time.perf_counter() - started
+                if probe:
+                    breaker.record(action, error, elapsed)
+                self._after_response(action, data, tokens, info, elapsed, error)
+                if not sent:
+                    raise
+                if limiter is not None:
+                    limiter.record(action, elapsed, error)
+                if (
+                    yielded
+                    or self.retry is None
+                    or not self.retry.should_retry(action, error, attempt)
+                ):
+                    raise
+                for hook in self.hooks:
+                    hook.on_retry(action, attempt, error)
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            except GeneratorExit:
+                # чтение прекращено вызывающим кодом: ответ получен без ошибки
+                self._stream_done(action, data, tokens, info, started, probe)
+                raise
+            except BaseException as error:
+                if probe:
+                    breaker.release(action)
+                elapsed = time.perf_counter() - started
+                self._after_response(action, data, tokens, info, elapsed, error)
+                raise
+            self._stream_done(action, data, tokens, info, started, probe)
+            if limiter is not None:
+                limiter.record(action, time.perf_counter() - started)
+            return
+
+    async def _stream_items(
+        self, url: str, data: Dict[Any, Any], key: str, chunk_size: int, info
+    ) -> AsyncIterator[Any]:
+        """
+        Одна попытка потокового запроса, заполняя info (если передан)
+        """
+        parser = StreamParser(key)
+        record = RECORDS.get(key) if self.typed else None
+        form = form_data(data)
+        try:
+            async with self._get_session().post(url, data=form) as response:
+                if info is not None:
+                    info.status = response.status
+                    info.request_bytes = len(urlencode(form))
+                if response.status in THROTTLE_STATUSES:
+                    raise ThrottledError
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if info is not None:
+                        info.response_bytes += len(chunk)
+                    for item in parser.feed(chunk):
+                        yield record.from_dict(item) if record else item
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise TransportError from error
+        for item in parser.close():
+            yield record.from_dict(item) if record else item
+
+    async def _request(
+        self, url: str, data: Dict[Any, Any], info: CallInfo = None
+    ) -> Dict[str, Any]:
+        """
+        Выполняет асинхронный post-запрос к API, заполняя info (если передан)
+        """
+        form = form_data(data)
+        try:
+            async with self._get_session().post(url, data=form) as response:
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise TransportError from error
+        if info is not None:
+            info.status = response.status
+            info.request_bytes = len(urlencode(form))
+            info.response_bytes = len(body)
+        return parse_body(response.status, body, self.decode)
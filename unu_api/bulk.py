@@ -0,0 +1,123 @@
+"""
+Массовое выполнение однотипных запросов к API
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+from .exceptions import BulkError
+
+__all__ = ["BulkResult", "run_bulk", "run_bulk_async"]
+
+Call = Tuple[Hashable, Tuple[Any, ...]]
+
+
+class BulkResult:
+    """
+    Результат массовой операции: ответы и исключения по каждому ключу
+    """
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.results: Dict[Hashable, Any] = {}
+        self.errors: Dict[Hashable, Exception] = {}
+
+    def __repr__(self) -> str:
+        return "<BulkResult ok=%d failed=%d total=%d>" % (
+            len(self.results),
+            len(self.errors),
+            self.total,
+        )
+
+    @property
+    def ok(self) -> bool:
+        """
+        True, если все операции выполнены успешно
+        """
+        return not self.errors
+
+    @property
+    def succeeded(self) -> List[Hashable]:
+        return list(self.results)
+
+    @property
+    def failed(self) -> List[Hashable]:
+        return list(self.errors)
+
+    def raise_for_errors(self) -> "BulkResult":
+        """
+        Бросает BulkError, если хотя бы одна операция завершилась ошибкой
+        """
+        if self.errors:
+            raise BulkError(self)
+        return self
+
+
+def _progress(result: BulkResult, progress: Callable[[int, int], Any]) -> None:
+    if progress is not None:
+        progress(len(result.results) + len(result.errors), result.total)
+
+
+def _extend(result: BulkResult, count: int) -> BulkResult:
+    if result is None:
+        return BulkResult(total=count)
+    result.total += count
+    return result
+
+
+def run_bulk(
+    func: Callable[..., Any],
+    calls: Iterable[Call],
+    workers: int = 8,
+    progress: Callable[[int, int], Any] = None,
+    result: BulkResult = None,
+) -> BulkResult:
+    """
+    Выполняет func(*args) для каждой пары (ключ, args) в пуле потоков
+
+    Ошибка одного вызова не прерывает остальные: она сохраняется
+    в BulkResult.errors под ключом этого вызова. result - уже частично
+    заполненный результат (например, ошибками проверки), в который
+    добавляются вызовы.
+    """
+    calls = list(calls)
+    result = _extend(result, len(calls))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(func, *args): key for key, args in calls}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                result.results[key] = future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                result.errors[key] = error
+            _progress(result, progress)
+    return result
+
+
+async def run_bulk_async(
+    func: Callable[..., Any],
+    calls: Iterable[Call],
+    workers: int = 8,
+    progress: Callable[[int, int], Any] = None,
+    result: BulkResult = None,
+) -> BulkResult:
+    """
+    Асинхронный вариант run_bulk: не более workers корутин одновременно
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    calls = list(calls)
+    result = _extend(result, len(calls))
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async def call(key: Hashable, args: Tuple[Any, ...]) -> None:
+        async with semaphore:
+            try:
+                result.results[key] = await func(*args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:  # pylint: disable=broad-except
+                result.errors[key] = error
+        _progress(result, progress)
+
+    await asyncio.gather(*(call(key, args) for key, args in calls))
+    return result
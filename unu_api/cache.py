@@ -0,0 +1,132 @@
+"""
+Кэш ответов API для редко меняющихся данных
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+__all__ = ["ResponseCache", "DEFAULT_TTL", "INVALIDATES"]
+
+# Время жизни ответа в секундах для кэшируемых методов
+DEFAULT_TTL = {
+    "get_tariffs": 3600.0,
+    "get_folders": 300.0,
+    "get_minter_wallet": 86400.0,
+}
+
+# Какие кэшированные методы устаревают после изменяющего запроса
+INVALIDATES = {
+    "create_folder": ("get_folders",),
+    "move_task": ("get_tasks",),
+    "add_task": ("get_tasks",),
+    "edit_task": ("get_tasks",),
+    "task_limit_add": ("get_tasks",),
+    "task_pause": ("get_tasks",),
+    "task_play": ("get_tasks",),
+}
+
+
+@lru_cache(maxsize=64)
+def _token_digest(token: Any) -> str:
+    return hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:32]
+
+
+def cache_key(data: Dict[Any, Any]) -> Tuple[Hashable, ...]:
+    """
+    Ключ запроса: action, хэш токена и все непустые параметры
+
+    Сам токен в ключе не хранится, но по хэшу ответы разных аккаунтов
+    не смешиваются в общем кэше или SingleFlight.
+    """
+    params = tuple(
+        sorted(
+            (key, str(value))
+            for key, value in data.items()
+            if value is not None and key not in ("api_key", "action")
+        )
+    )
+    return (data.get("action"), _token_digest(data.get("api_key")), params)
+
+
+class ResponseCache:
+    """
+    LRU-кэш ответов с временем жизни для каждого action
+
+    Кэшируются только action, для которых задан ttl. Изменяющие запросы
+    из INVALIDATES сбрасывают связанные записи. Ответы отдаются без
+    копирования, поэтому изменять их не следует.
+    """
+
+    def __init__(self, ttl: Dict[str, float] = None, maxsize: int = 256):
+        self.ttl = dict(DEFAULT_TTL if ttl is None else ttl)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def cacheable(self, action: str) -> bool:
+        return action in self.ttl
+
+    def get(self, data: Dict[Any, Any]) -> Optional[Any]:
+        """
+        Возвращает сохранённый ответ или None
+        """
+        if not self.cacheable(data.get("action")):
+            return None
+        key = cache_key(data)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+        return None
+
+    def put(self, data: Dict[Any, Any], response: Any) -> None:
+        """
+        Сохраняет ответ, если action кэшируется
+        """
+        action = data.get("action")
+        if not self.cacheable(action):
+            return
+        key = cache_key(data)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl[action], response)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, actions: Iterable[str] = None) -> None:
+        """
+        Удаляет записи указанных action (или все записи)
+        """
+        with self._lock:
+            if actions is None:
+                self._data.clear()
+                return
+            actions = set(actions)
+            for key in [key for key in self._data if key[0] in actions]:
+                del self._data[key]
+
+    def invalidate_for(self, action: str) -> None:
+        """
+        Сбрасывает записи, которые устаревают после запроса action
+        """
+        related = INVALIDATES.get(action)
+        if related:
+            self.invalidate(related)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
@@ -0,0 +1,291 @@
+"""
+Командная строка: выполнение файла операций NDJSON
+
+    unu-api run operations.ndjson --concurrency 16 --rate 5 > results.ndjson
+    unu-api export reports reports.parquet --task-id 123
+
+Каждая строка входного файла - объект JSON с именем метода API и его
+параметрами: {"action": "task_pause", "params": {"task_id": 1}, "id": "a"}.
+Параметры можно указать и рядом с action: {"action": "get_tasks",
+"folder_id": 1}. Пустые строки и строки, начинающиеся с #, пропускаются.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+__all__ = ["ACTIONS", "RunStats", "main", "parse_operation", "run"]
+
+# Методы API, которые можно вызывать из файла операций
+ACTIONS = (
+    "get_balance",
+    "get_folders",
+    "create_folder",
+    "move_task",
+    "get_tasks",
+    "get_reports",
+    "approve_report",
+    "reject_report",
+    "get_expenses",
+    "add_task",
+    "task_limit_add",
+    "edit_task",
+    "get_tariffs",
+    "task_pause",
+    "task_play",
+    "get_minter_wallet",
+)
+
+# Ключи операции, которые не относятся к параметрам метода
+RESERVED = ("action", "params", "id")
+
+
+class RunStats:
+    """
+    Итог выполнения: число операций, ошибок и время
+    """
+
+    __slots__ = ("total", "failed", "elapsed")
+
+    def __init__(self):
+        self.total = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def operations_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self) -> str:
+        return "<RunStats total=%d failed=%d %.0f op/s>" % (
+            self.total,
+            self.failed,
+            self.operations_per_second,
+        )
+
+
+def parse_operation(line: str) -> Tuple[str, Dict[str, Any], Any]:
+    """
+    Разбирает строку файла операций
+
+    Выходные данные
+        (action, параметры, id операции или None)
+    """
+    operation = json.loads(line)
+    if not isinstance(operation, dict):
+        raise ValueError("Операция должна быть объектом JSON")
+    action = operation.get("action")
+    if action not in ACTIONS:
+        raise ValueError("Неизвестный action %r" % action)
+    params = operation.get("params")
+    if params is None:
+        params = {
+            name: value for name, value in operation.items() if name not in RESERVED
+        }
+    if not isinstance(params, dict):
+        raise ValueError("params должен быть объектом JSON")
+    return action, params, operation.get("id")
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+class _Runner:
+    """
+    Конвейер операций: читает следующие строки, пока выполняются
+    предыдущие, и держит в работе не больше 2 * concurrency операций.
+    В режиме ordered в этот предел входят и результаты, ожидающие записи
+    после медленной операции, поэтому память не растёт с размером файла.
+    """
+
+    def __init__(self, api: Any, write: Callable[[str], Any], concurrency, ordered):
+        self.api = api
+        self.write = write
+        self.concurrency = max(1, concurrency)
+        self.ordered = ordered
+        self.stats = RunStats()
+        self.pending: Dict[Future, Tuple[int, Dict[str, Any]]] = {}
+        self.ready: Dict[int, Dict[str, Any]] = {}
+        self.written = 0
+
+    def finish(self, seq: int, record: Dict[str, Any]) -> None:
+        self.stats.total += 1
+        if not record["ok"]:
+            self.stats.failed += 1
+        if not self.ordered:
+            self.write(_dumps(record))
+            return
+        # результаты пишутся в порядке строк входного файла
+        self.ready[seq] = record
+        while self.written in self.ready:
+            self.write(_dumps(self.ready.pop(self.written)))
+            self.written += 1
+
+    def collect(self, futures: Iterable[Future]) -> None:
+        for future in futures:
+            seq, record = self.pending.pop(future)
+            error = future.exception()
+            if error is None:
+                record.update(ok=True, result=future.result())
+            else:
+                record.update(ok=False, error=type(error).__name__, message=str(error))
+            self.finish(seq, record)
+
+    def run(self, lines: Iterable[str]) -> RunStats:
+        started = time.perf_counter()
+        limit = 2 * self.concurrency
+        seq = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    action, params, op_id = parse_operation(line)
+                except ValueError as error:
+                    record = {"line": number, "id": None, "action": None, "ok": False}
+                    record.update(error=type(error).__name__, message=str(error))
+                    self.finish(seq, record)
+                    seq += 1
+                    continue
+                record = {"line": number, "id": op_id, "action": action}
+                future = executor.submit(getattr(self.api, action), **params)
+                self.pending[future] = (seq, record)
+                seq += 1
+                while self.pending and len(self.pending) + len(self.ready) >= limit:
+                    done, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+                    self.collect(done)
+            self.collect(wait(self.pending).done)
+        self.stats.elapsed = time.perf_counter() - started
+        return self.stats
+
+
+def run(
+    api: Any,
+    lines: Iterable[str],
+    write: Callable[[str], Any],
+    concurrency: int = 8,
+    ordered: bool = False,
+) -> RunStats:
+    """
+    Выполняет операции из строк NDJSON и передаёт результаты в write
+
+    Строки читаются по мере выполнения, поэтому файл операций может быть
+    сколь угодно большим. Результат каждой операции - строка JSON:
+    {"line": номер строки, "id": id операции, "action": ..., "ok": true,
+    "result": ответ API} или, при ошибке, "ok": false с именем исключения
+    в "error" и текстом в "message".
+
+    Входные данные
+        api (Api) - клиент, через который выполняются операции
+        lines (iterable) - строки файла операций
+        write (callable) - получает строку результата без перевода строки
+        concurrency (int) - сколько операций выполняется одновременно
+        ordered (bool) - писать результаты в порядке строк, а не по мере \
+            завершения
+    Выходные данные
+        RunStats
+    """
+    return _Runner(api, write, concurrency, ordered).run(lines)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="unu-api", description="Клиент API unu.im")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    run_parser = commands.add_parser("run", help="выполнить файл операций NDJSON")
+    run_parser.add_argument(
+        "input", nargs="?", default="-", help='файл операций, "-" - стандартный ввод'
+    )
+    run_parser.add_argument(
+        "-o", "--output", default="-", help='файл результатов, "-" - стандартный вывод'
+    )
+    run_parser.add_argument("-c", "--concurrency", type=int, default=8)
+    run_parser.add_argument("--rate", type=float, help="запросов в секунду")
+    run_parser.add_argument(
+        "--ordered", action="store_true", help="результаты в порядке операций"
+    )
+    run_parser.add_argument(
+        "--transport", default="urllib3", choices=("urllib3", "requests", "httpx")
+    )
+    run_parser.add_argument("--timeout", type=float, default=30.0)
+    run_parser.add_argument("--url", default="https://unu.im/api")
+    run_parser.add_argument("--token", default=os.getenv("API_KEY"))
+    run_parser.add_argument("-q", "--quiet", action="store_true")
+
+    export_parser = commands.add_parser(
+        "export", help="выгрузить отчёты или задачи в файл", add_help=False
+    )
+    export_parser.add_argument("args", nargs=argparse.REMAINDER)
+    return parser
+
+
+def _open(path: str, mode: str) -> TextIO:
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8")
+
+
+def main(argv: List[str] = None) -> Optional[int]:
+    """
+    Точка входа unu-api. Код выхода: 0 - все операции выполнены,
+    1 - часть операций завершилась ошибкой, 2 - ошибка параметров
+    """
+    args = _parser().parse_args(argv)
+    # модули клиента загружаются только для выбранной команды
+    # pylint: disable=import-outside-toplevel
+    if args.command == "export":
+        from .exporting import main as export_main
+
+        return export_main(args.args)
+
+    from .api import Api
+    from .exceptions import AuthError
+    from .ratelimit import RateLimiter
+
+    try:
+        api = Api(
+            url=args.url,
+            token=args.token,
+            transport=args.transport,
+            pool_size=max(1, args.concurrency),
+            read_timeout=args.timeout,
+            rate_limiter=RateLimiter(args.rate) if args.rate else None,
+        )
+    except AuthError:
+        print("unu-api: нужен токен (--token или API_KEY)", file=sys.stderr)
+        return 2
+    source = _open(args.input, "r")
+    target = _open(args.output, "w")
+    try:
+        with api:
+            stats = run(
+                api,
+                source,
+                lambda line: target.write(line + "\n"),
+                args.concurrency,
+                args.ordered,
+            )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is sys.stdout:
+            target.flush()
+        else:
+            target.close()
+    if not args.quiet:
+        print(
+            "%d операций, %d с ошибкой за %.1f с (%.0f операций/с)"
+            % (stats.total, stats.failed, stats.elapsed, stats.operations_per_second),
+            file=sys.stderr,
+        )
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
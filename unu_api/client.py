@@ -1,41 +1,494 @@
 """
 Клиент к API
 """
+import json
 import logging
-from json.decoder import JSONDecodeError
-from typing import Any, Dict
+import threading
+import time
+import warnings
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Union
+from urllib.parse import urlencode
 
-import requests
+from .cache import ResponseCache, cache_key
+from .decoders import Decoder, get_decoder
+from .exceptions import (
+    ApiError,
+    JsonParsingError,
+    RequestError,
+    ThrottledError,
+)
+from .hooks import CallInfo, Hook
+from .metrics import Metrics
+from .models import RECORDS, parse_response
+from .ratelimit import IDEMPOTENT_ACTIONS, RateLimiter, RetryPolicy
+from .resilience import CircuitBreaker, HedgePolicy
+from .singleflight import SingleFlight
+from .stream import iter_json_array
+from .transports import Transport, get_transport
 
-from .exceptions import JsonParsingError, RequestError, UnknowError
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
 
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
+
+
+# Ответы, которыми API сообщает о превышении частоты запросов
+THROTTLE_STATUSES = (429, 503)
+
+
+def form_data(data: Dict[Any, Any]) -> Dict[str, str]:
+    """
+    Приводит параметры запроса к виду формы так же, как это делает requests:
+    пустые (None) значения отбрасываются, остальные приводятся к строке
+    """
+    return {
+        str(key): value if isinstance(value, str) else str(value)
+        for key, value in data.items()
+        if value is not None
+    }
+
+
+def parse_body(
+    status: int, body: bytes, decode: Decoder = json.loads
+) -> Dict[str, Any]:
+    """
+    Разбирает тело ответа API и проверяет признак успеха
+
+    Тело декодируется один раз прямо из байтов, текст ответа для журнала
+    формируется только при включённом уровне DEBUG.
+    """
+    if status in THROTTLE_STATUSES:
+        raise ThrottledError
+    try:
+        response_json = decode(body)
+    except ValueError:
+        _debug_body(body)
+        raise JsonParsingError
+    if isinstance(response_json, dict) and response_json.get("success") == "true":
+        return response_json
+    _debug_body(body)
+    raise RequestError
+
+
+def _debug_body(body: bytes) -> None:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(body[:4096].decode("utf-8", "replace"))
+
+
+class _ClassCallable:
+    """
+    Метод экземпляра, который можно вызвать и у класса, как в прежних версиях:
+    Client.post(url, data) выполняется общим клиентом по умолчанию
+    """
+
+    def __init__(self, func: Any):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj: Any, owner: type = None) -> Any:
+        if obj is None:
+            warnings.warn(
+                "Client.post у класса устарел: создайте клиент и вызывайте "
+                "post у экземпляра",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            obj = _default_client()
+        return self.func.__get__(obj, type(obj))
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def _default_client() -> "Client":
+    """
+    Общий клиент для вызовов post у класса; создаётся при первом вызове
+    """
+    global _default  # pylint: disable=global-statement
+    with _default_lock:
+        if _default is None:
+            _default = Client()
+        return _default
+
+
+def _counted(chunks: Iterable[bytes], info: CallInfo) -> Iterator[bytes]:
+    """
+    Считает объём прочитанного тела потокового ответа
+    """
+    for chunk in chunks:
+        info.response_bytes += len(chunk)
+        yield chunk
 
 
 class Client:
     """
     Клиент для подключения к API
+
+    Каждый экземпляр владеет собственным пулом соединений. Экземпляр можно
+    безопасно использовать из нескольких потоков: по умолчанию потоки делят
+    один пул размером pool_size, а при per_thread_session=True каждый поток
+    получает собственную сессию. transport выбирает HTTP-клиент: "requests",
+    "urllib3" или "httpx" (HTTP/2), см. unu_api.transports; при compress=True
+    ответы запрашиваются сжатыми (gzip, deflate). При typed=True ответы
+    преобразуются в модели из unu_api.models.
+
+    Сетевые ошибки бросают TransportError (ThrottledError при ограничении
+    частоты), методы только для чтения по умолчанию повторяются согласно
+    RetryPolicy. Методы, списывающие деньги, не повторяются никогда.
+    rate_limiter=True включает RateLimiter с настройками по умолчанию.
+    При coalesce=True одновременные одинаковые запросы на чтение
+    объединяются в один, и все вызовы получают общий ответ. decoder
+    задаёт декодер JSON (по умолчанию самый быстрый из установленных).
+    hooks получают события каждой попытки запроса, metrics=True собирает
+    метрики по action (см. unu_api.metrics). breaker=True включает
+    предохранитель по action, hedge=True - дублирование медленных запросов
+    на чтение (см. unu_api.resilience).
+
+    Устаревший вызов у класса, Client.post(url, data), выполняется скрытым
+    общим клиентом процесса: он создаётся при первом таком вызове
+    с настройками по умолчанию (без кэша, RateLimiter и хуков) и ничего
+    не делит с экземплярами, созданными явно.
     """
 
-    req = requests.Session()
+    def __init__(
+        self,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        per_thread_session: bool = False,
+        transport: Union[str, Transport] = "requests",
+        compress: bool = True,
+        cache: Union[bool, ResponseCache] = None,
+        typed: bool = False,
+        rate_limiter: Union[bool, RateLimiter] = None,
+        retry: Union[bool, RetryPolicy] = True,
+        coalesce: Union[bool, SingleFlight] = False,
+        decoder: Union[str, Decoder] = "auto",
+        hooks: Iterable[Hook] = (),
+        metrics: Union[bool, Metrics] = False,
+        breaker: Union[bool, CircuitBreaker] = None,
+        hedge: Union[bool, HedgePolicy] = None,
+    ):
+        self.decode = get_decoder(decoder)
+        self.hooks: List[Hook] = list(hooks)
+        if metrics is True:
+            metrics = Metrics()
+        self.metrics = metrics if isinstance(metrics, Metrics) else None
+        if self.metrics is not None:
+            # метрики идут первыми, чтобы учесть и запросы, отклонённые хуками
+            self.hooks.insert(0, self.metrics)
+        self.typed = typed
+        if rate_limiter is True:
+            rate_limiter = RateLimiter()
+        self.rate_limiter = (
+            rate_limiter if isinstance(rate_limiter, RateLimiter) else None
+        )
+        if breaker is True:
+            breaker = CircuitBreaker()
+        self.breaker = breaker if isinstance(breaker, CircuitBreaker) else None
+        if hedge is True:
+            hedge = HedgePolicy()
+        self.hedge = hedge if isinstance(hedge, HedgePolicy) else None
+        if retry is True:
+            retry = RetryPolicy()
+        self.retry = retry if isinstance(retry, RetryPolicy) else None
+        if coalesce is True:
+            coalesce = SingleFlight()
+        self.singleflight = coalesce if isinstance(coalesce, SingleFlight) else None
+        if cache is True:
+            cache = ResponseCache()
+        self.cache = cache if isinstance(cache, ResponseCache) else None
+        self.timeout = (connect_timeout, read_timeout)
+        self.transport = self._transport(
+            transport,
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            compress=compress,
+            per_thread_session=per_thread_session,
+        )
 
-    @classmethod
-    def post(cls, url: str, data: Dict[Any, Any]) -> str:
+    # Фабрика HTTP-транспорта; AsyncApi транспорт не создаёт
+    _transport = staticmethod(get_transport)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        Сессия requests для текущего потока (только для транспорта requests)
+        """
+        return self.transport.session
+
+    def close(self) -> None:
+        """
+        Закрывает все соединения экземпляра
+        """
+        if self.transport is not None:
+            self.transport.close()
+
+    @_ClassCallable
+    def post(self, url: str, data: Dict[Any, Any]) -> str:
         """
         Метод реализует post-запрос к API
+
+        Вызов у класса (Client.post(url, data)) по-прежнему работает через
+        общий клиент с настройками по умолчанию, но устарел.
+        """
+        response = self._fetch(url, data)
+        if self.typed:
+            return parse_response(data.get("action"), response)
+        return response
+
+    def _fetch(self, url: str, data: Dict[Any, Any]) -> str:
         """
+        Выполняет запрос с учётом кэша
+        """
+        cache = self.cache
+        if cache is None:
+            return self._shared(url, data)
+        response = cache.get(data)
+        if response is not None:
+            return response
         try:
-            response = cls.req.post(url=url, data=data)
-            response_json = response.json()
-            if response_json["success"] == "true":
-                return response_json
-            elif response_json["success"] == "false":
-                logging.debug(response.text)
-                raise RequestError
-        except JSONDecodeError:
-            logging.debug(response.text)
-            raise JsonParsingError
-        except Exception:
-            raise UnknowError
+            response = self._shared(url, data)
+        finally:
+            cache.invalidate_for(data.get("action"))
+        cache.put(data, response)
+        return response
+
+    def _shared(self, url: str, data: Dict[Any, Any]) -> str:
+        """
+        Объединяет одновременные одинаковые запросы на чтение
+        """
+        flight = self.singleflight
+        if flight is None or data.get("action") not in IDEMPOTENT_ACTIONS:
+            return self._send(url, data)
+        return flight.do(cache_key(data), lambda: self._send(url, data))
+
+    def _send(self, url: str, data: Dict[Any, Any]) -> str:
+        """
+        Выполняет запрос с ограничением частоты, повторами и хуками
+        """
+        action = data.get("action")
+        limiter = self.rate_limiter
+        breaker = self.breaker
+        self._prepare(action, data)
+        attempt = 0
+        while True:
+            # локальные проверки хуков выполняются до того, как запрос займёт
+            # токен ограничителя или пробный запрос предохранителя
+            info = CallInfo(0.0) if self.hooks else None
+            tokens = self._before_request(action, data, info)
+            probe = sent = False
+            started = time.perf_counter()
+            try:
+                if breaker is not None:
+                    breaker.allow(action)
+                    probe = True
+                if limiter is not None:
+                    limiter.acquire(action)
+                started = time.perf_counter()
+                sent = True
+                response = self._attempt(url, data, info)
+            except ApiError as error:
+                elapsed = time.perf_counter() - started
+                if probe:
+                    breaker.record(action, error, elapsed)
+                self._after_response(action, data, tokens, info, elapsed, error)
+                if not sent:
+                    raise
+                if limiter is not None:
+                    limiter.record(action, elapsed, error)
+                if self.retry is None or not self.retry.should_retry(
+                    action, error, attempt
+                ):
+                    raise
+                for hook in self.hooks:
+                    hook.on_retry(action, attempt, error)
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            except BaseException as error:
+                # проба, не давшая ответа, не должна держать предохранитель
+                if probe:
+                    breaker.release(action)
+                elapsed = time.perf_counter() - started
+                self._after_response(action, data, tokens, info, elapsed, error)
+                raise
+            elapsed = time.perf_counter() - started
+            if breaker is not None:
+                breaker.record(action, None, elapsed)
+            self._after_response(action, data, tokens, info, elapsed, None, response)
+            if limiter is not None:
+                limiter.record(action, elapsed)
+            return response
+
+    def _attempt(self, url: str, data: Dict[Any, Any], info: CallInfo) -> str:
+        """
+        Одна попытка запроса, при необходимости с дублированием
+        """
+        hedge = self.hedge
+        action = data.get("action")
+        if hedge is None or action not in hedge.actions:
+            return self._request(url, data, info)
+        return hedge.run(
+            action, lambda call_info: self._request(url, data, call_info), info
+        )
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Подключает хук, который будет вызываться для каждого запроса
+        """
+        self.hooks.append(hook)
+
+    def _prepare(self, action: str, data: Dict[Any, Any]) -> None:
+        """
+        Подготовка хуков один раз на запрос, до before_request и повторов
+        """
+        for hook in self.hooks:
+            hook.prepare(action, data)
+
+    def _before_request(
+        self, action: str, data: Dict[Any, Any], info: CallInfo
+    ) -> List[Any]:
+        """
+        Токены хуков для запроса. Если хук отклонил запрос исключением,
+        хуки перед ним получают after_response с этой ошибкой.
+        """
+        tokens: List[Any] = []
+        try:
+            for hook in self.hooks:
+                tokens.append(hook.before_request(action, data))
+        except BaseException as error:
+            self._after_response(action, data, tokens, info, 0.0, error)
+            raise
+        return tokens
+
+    def _after_response(
+        self,
+        action: str,
+        data: Dict[Any, Any],
+        tokens: List[Any],
+        info: CallInfo,
+        elapsed: float,
+        error: Exception = None,
+        response: Any = None,
+    ) -> None:
+        if info is None:
+            return
+        info.elapsed = elapsed
+        info.error = error
+        info.response = response
+        for hook, token in zip(self.hooks, tokens):
+            hook.after_response(action, data, token, info)
+
+    def stream(
+        self, url: str, data: Dict[Any, Any], key: str, chunk_size: int = 65536
+    ) -> Iterator[Any]:
+        """
+        Метод реализует post-запрос к API и возвращает элементы массива key
+        по мере чтения ответа из сокета, не загружая его целиком
+
+        Хуки, метрики и предохранитель учитывают запрос так же, как в post;
+        время запроса - до конца чтения ответа. Повтор возможен, только
+        пока не отдан ни один элемент.
+        """
+        action = data.get("action")
+        limiter = self.rate_limiter
+        breaker = self.breaker
+        self._prepare(action, data)
+        attempt = 0
+        while True:
+            info = CallInfo(0.0) if self.hooks else None
+            tokens = self._before_request(action, data, info)
+            probe = sent = yielded = False
+            started = time.perf_counter()
+            try:
+                if breaker is not None:
+                    breaker.allow(action)
+                    probe = True
+                if limiter is not None:
+                    limiter.acquire(action)
+                started = time.perf_counter()
+                sent = True
+                form = form_data(data)
+                response = self.transport.stream(url, form, self.timeout, chunk_size)
+                with response as (status, chunks):
+                    if info is not None:
+                        info.status = status
+                        info.request_bytes = len(urlencode(form))
+                        chunks = _counted(chunks, info)
+                    if status in THROTTLE_STATUSES:
+                        raise ThrottledError
+                    items = iter_json_array(chunks, key)
+                    if self.typed and key in RECORDS:
+                        items = map(RECORDS[key].from_dict, items)
+                    for item in items:
+                        yielded = True
+                        yield item
+            except ApiError as error:
+                elapsed = time.perf_counter() - started
+                if probe:
+                    breaker.record(action, error, elapsed)
+                self._after_response(action, data, tokens, info, elapsed, error)
+                if not sent:
+                    raise
+                if limiter is not None:
+                    limiter.record(action, elapsed, error)
+                if (
+                    yielded
+                    or self.retry is None
+                    or not self.retry.should_retry(action, error, attempt)
+                ):
+                    raise
+                for hook in self.hooks:
+                    hook.on_retry(action, attempt, error)
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            except GeneratorExit:
+                # чтение прекращено вызывающим кодом: ответ получен без ошибки
+                self._stream_done(action, data, tokens, info, started, probe)
+                raise
+            except BaseException as error:
+                if probe:
+                    breaker.release(action)
+                elapsed = time.perf_counter() - started
+                self._after_response(action, data, tokens, info, elapsed, error)
+                raise
+            self._stream_done(action, data, tokens, info, started, probe)
+            if limiter is not None:
+                limiter.record(action, time.perf_counter() - started)
+            return
+
+    def _stream_done(
+        self,
+        action: str,
+        data: Dict[Any, Any],
+        tokens: List[Any],
+        info: CallInfo,
+        started: float,
+        probe: bool,
+    ) -> None:
+        elapsed = time.perf_counter() - started
+        if probe:
+            self.breaker.record(action, None, elapsed)
+        self._after_response(action, data, tokens, info, elapsed)
+
+    def _request(self, url: str, data: Dict[Any, Any], info: CallInfo = None) -> str:
+        """
+        Выполняет post-запрос к API, заполняя info (если передан)
+        """
+        form = form_data(data)
+        response = self.transport.post(url, form, self.timeout)
+        if info is not None:
+            info.status = response.status
+            info.request_bytes = len(urlencode(form))
+            info.response_bytes = response.wire_bytes
+        return parse_body(response.status, response.body, self.decode)
@@ -0,0 +1,61 @@
+"""
+Декодеры JSON для ответов API
+"""
+import json
+from typing import Any, Callable, Dict, Union
+
+__all__ = ["Decoder", "DECODERS", "get_decoder"]
+
+# Декодер принимает тело ответа в байтах, при ошибке бросает ValueError
+Decoder = Callable[[bytes], Any]
+
+
+def _orjson() -> Decoder:
+    import orjson  # pylint: disable=import-outside-toplevel
+
+    return orjson.loads
+
+
+def _msgspec() -> Decoder:
+    import msgspec  # pylint: disable=import-outside-toplevel
+
+    decode = msgspec.json.decode
+    error = msgspec.DecodeError
+
+    def loads(body: bytes) -> Any:
+        try:
+            return decode(body)
+        except error as exc:
+            raise ValueError(str(exc)) from exc
+
+    return loads
+
+
+def _stdlib() -> Decoder:
+    return json.loads
+
+
+DECODERS: Dict[str, Callable[[], Decoder]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": _stdlib,
+}
+
+
+def get_decoder(name: Union[str, Decoder] = "auto") -> Decoder:
+    """
+    Возвращает функцию декодирования по имени
+
+    "auto" выбирает самый быстрый из установленных: orjson, msgspec, json.
+    Можно передать и собственную функцию bytes -> объект.
+    """
+    if callable(name):
+        return name
+    if name != "auto":
+        return DECODERS[name]()
+    for factory in DECODERS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _stdlib()
@@ -23,8 +23,18 @@ class BalanceError(ApiError):
     Исключения при отрицательном балансе
     """
 
+    def __init__(self, required=None, available=None):
+        super().__init__()
+        self.required = required
+        self.available = available
+
     def __str__(self):
-        return "На вашем балансе отсутствуют средства"
+        if self.required is None:
+            return "На вашем балансе отсутствуют средства"
+        return "Недостаточно средств: нужно %.2f, доступно %.2f" % (
+            self.required,
+            self.available,
+        )
 
 
 class RequestError(ApiError):
@@ -52,3 +62,84 @@ class UnknowError(ApiError):
 
     def __str__(self):
         return "Неизвестная ошибка"
+
+
+class TransportError(UnknowError):
+    """
+    Исключение для сетевых ошибок и таймаутов
+    """
+
+    def __str__(self):
+        return "Не удалось выполнить запрос к API (ошибка соединения или таймаут)"
+
+
+class ThrottledError(TransportError):
+    """
+    Исключение при ограничении частоты запросов со стороны API
+    """
+
+    def __str__(self):
+        return "API ограничило частоту запросов"
+
+
+class BulkError(ApiError):
+    """
+    Исключение для массовых операций, часть которых завершилась ошибкой
+    """
+
+    def __init__(self, result=None):
+        super().__init__()
+        self.result = result
+
+    def __str__(self):
+        failed = len(self.result.errors) if self.result is not None else 0
+        return "Часть операций завершилась с ошибкой: %d" % failed
+
+
+class CircuitOpenError(UnknowError):
+    """
+    Исключение при разомкнутом предохранителе: запрос не отправлялся
+    """
+
+    def __init__(self, action=None, retry_after=0.0):
+        super().__init__()
+        self.action = action
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return "API недоступно для %s, следующая попытка через %.1f с" % (
+            self.action,
+            self.retry_after,
+        )
+
+
+class ValidationError(ApiError):
+    """
+    Исключение для параметров задачи, не прошедших локальную проверку:
+    запрос не отправлялся
+    """
+
+    def __init__(self, problems=None):
+        super().__init__()
+        self.problems = list(problems or ())
+
+    def __str__(self):
+        return "Параметры задачи не прошли проверку: %s" % "; ".join(self.problems)
+
+
+class ReviewRequiredError(ApiError):
+    """
+    Исключение, когда состояние задачи нельзя определить без человека:
+    повторный запрос мог бы списать деньги второй раз
+    """
+
+    def __init__(self, key=None, task_id=None):
+        super().__init__()
+        self.key = key
+        self.task_id = task_id
+
+    def __str__(self):
+        return (
+            "Задача %s (%s) не найдена после прерванной оплаты: "
+            "проверьте её вручную" % (self.task_id, self.key)
+        )
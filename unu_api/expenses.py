@@ -0,0 +1,280 @@
+"""
+Агрегация расходов по временным окнам
+"""
+import inspect
+from array import array
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .bulk import BulkResult
+from .sync import _field
+
+__all__ = ["ExpenseAggregator", "ExpenseSeries", "windows"]
+
+Window = Tuple[datetime, datetime]
+# (task_id, folder_id) - чьи расходы считаются
+Scope = Tuple[Optional[int], Optional[int]]
+
+SECOND = timedelta(seconds=1)
+
+
+def _utc(value: datetime) -> datetime:
+    """
+    Приводит момент времени к UTC; значение без часового пояса считается UTC
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+def _in_zone(value: datetime, tz: tzinfo) -> datetime:
+    """
+    Переводит момент времени в часовой пояс tz; значение без часового
+    пояса считается уже заданным в tz и не сдвигается
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=tz)
+    return value.astimezone(tz)
+
+
+def windows(date_from: datetime, date_to: datetime, step: timedelta) -> List[Window]:
+    """
+    Делит период на окна длиной step. Конец окна - последняя секунда
+    перед началом следующего, чтобы расходы на границе не считались дважды.
+    """
+    result = []
+    start = date_from
+    while start <= date_to:
+        end = min(start + step - SECOND, date_to)
+        result.append((start, end))
+        start += step
+    return result
+
+
+class ExpenseSeries:
+    """
+    Временной ряд расходов в столбцах array
+
+    starts - начала окон (unix time UTC, секунды), expenses
+    и expenses_in_rub - суммы расходов за окно. dates отдаёт начала окон
+    с часовым поясом UTC. Столбцы поддерживают протокол буфера, поэтому
+    numpy.frombuffer(series.expenses) не копирует данные.
+    """
+
+    __slots__ = (
+        "task_id",
+        "folder_id",
+        "step",
+        "starts",
+        "expenses",
+        "expenses_in_rub",
+    )
+
+    def __init__(
+        self,
+        step: timedelta,
+        task_id: Optional[int] = None,
+        folder_id: Optional[int] = None,
+    ):
+        self.task_id = task_id
+        self.folder_id = folder_id
+        self.step = step
+        self.starts = array("q")
+        self.expenses = array("d")
+        self.expenses_in_rub = array("d")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __repr__(self) -> str:
+        return "<ExpenseSeries folder_id=%s task_id=%s windows=%d total=%s>" % (
+            self.folder_id,
+            self.task_id,
+            len(self),
+            self.total(),
+        )
+
+    def append(self, start: datetime, expenses: float, expenses_in_rub: float):
+        self.starts.append(int(_utc(start).timestamp()))
+        self.expenses.append(expenses)
+        self.expenses_in_rub.append(expenses_in_rub)
+
+    @property
+    def dates(self) -> List[datetime]:
+        return [datetime.fromtimestamp(start, timezone.utc) for start in self.starts]
+
+    def total(self) -> float:
+        return sum(self.expenses)
+
+    def total_in_rub(self) -> float:
+        return sum(self.expenses_in_rub)
+
+    def rows(self) -> Iterator[Tuple[datetime, float, float]]:
+        for start, expenses, rub in zip(
+            self.dates, self.expenses, self.expenses_in_rub
+        ):
+            yield start, expenses, rub
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Столбцы в виде массивов NumPy (нужен numpy)
+        """
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        return {
+            "starts": numpy.frombuffer(self.starts, dtype=numpy.int64).astype(
+                "datetime64[s]"
+            ),
+            "expenses": numpy.frombuffer(self.expenses, dtype=numpy.float64),
+            "expenses_in_rub": numpy.frombuffer(
+                self.expenses_in_rub, dtype=numpy.float64
+            ),
+        }
+
+
+def _cache_key(scope: Scope, window: Window) -> str:
+    edges = tuple(_naive(_utc(edge)).isoformat() for edge in window)
+    return "%s|%s|%s|%s" % (scope + edges)
+
+
+class ExpenseAggregator:
+    """
+    Собирает расходы за период по окнам, запрашивая окна параллельно
+
+    Расходы за окна, закончившиеся в прошлом, больше не меняются, поэтому
+    они сохраняются в cache навсегда; заново запрашивается только текущее
+    окно. В качестве cache подойдёт любой словарь со строковыми ключами,
+    например shelve.open("expenses.db") для хранения на диске.
+
+    Работает и с AsyncApi: тогда series и by_folder возвращают корутины.
+
+    API понимает date_from и date_to как время в часовом поясе сервера,
+    его задаёт tz (по умолчанию UTC). Даты без часового пояса считаются
+    заданными в tz и уходят в запрос без изменений; даты с часовым поясом
+    переводятся в tz. Окна строятся по часам tz, а starts и dates
+    ExpenseSeries хранят соответствующие моменты в UTC.
+
+    Входные данные
+        api (Api) - клиент
+        step (timedelta) - длина окна, по умолчанию сутки
+        workers (int) - сколько окон запрашивать одновременно
+        cache (dict) - хранилище закрытых окон (необязательный параметр)
+        tz (tzinfo) - часовой пояс сервера API, по умолчанию UTC
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        step: timedelta = timedelta(days=1),
+        workers: int = 8,
+        cache: MutableMapping[str, Sequence[float]] = None,
+        tz: tzinfo = timezone.utc,
+    ):
+        self.api = api
+        self.tz = tz
+        self.step = step
+        self.workers = workers
+        self.cache = {} if cache is None else cache
+
+    def series(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        task_id: int = None,
+        folder_id: int = None,
+        now: datetime = None,
+    ) -> ExpenseSeries:
+        """
+        Расходы задачи, папки или всего аккаунта по окнам периода
+        """
+        return self._collect([(task_id, folder_id)], date_from, date_to, now, False)
+
+    def by_folder(
+        self,
+        folder_ids: Iterable[int],
+        date_from: datetime,
+        date_to: datetime,
+        now: datetime = None,
+    ) -> Dict[int, ExpenseSeries]:
+        """
+        Расходы нескольких папок по окнам периода: папка -> ExpenseSeries
+        """
+        scopes = [(None, folder_id) for folder_id in folder_ids]
+        return self._collect(scopes, date_from, date_to, now, True)
+
+    def _collect(
+        self,
+        scopes: List[Scope],
+        date_from: datetime,
+        date_to: datetime,
+        now: Optional[datetime],
+        by_folder: bool,
+    ) -> Any:
+        now = datetime.now(timezone.utc) if now is None else _utc(now)
+        plan = windows(
+            _in_zone(date_from, self.tz), _in_zone(date_to, self.tz), self.step
+        )
+        calls = []
+        for scope in scopes:
+            for window in plan:
+                key = _cache_key(scope, window)
+                if key not in self.cache:
+                    calls.append(((key, window[1] < now), scope + window))
+        result = self.api.bulk(self._fetch, calls, self.workers)
+        if inspect.isawaitable(result):
+            return self._finish_async(result, scopes, plan, by_folder)
+        return self._finish(result, scopes, plan, by_folder)
+
+    def _fetch(self, task_id, folder_id, date_from, date_to):
+        return self.api.get_expenses(
+            task_id=task_id,
+            folder_id=folder_id,
+            date_from=_naive(date_from),
+            date_to=_naive(date_to),
+        )
+
+    async def _finish_async(self, result, scopes, plan, by_folder):
+        return self._finish(await result, scopes, plan, by_folder)
+
+    def _finish(
+        self,
+        result: BulkResult,
+        scopes: List[Scope],
+        plan: List[Window],
+        by_folder: bool,
+    ) -> Any:
+        fetched: Dict[str, Tuple[float, float]] = {}
+        for (key, closed), response in result.results.items():
+            value = (
+                float(_field(response, "expenses")),
+                float(_field(response, "expenses_in_rub")),
+            )
+            fetched[key] = value
+            if closed:
+                self.cache[key] = value
+        result.raise_for_errors()
+        collected = []
+        for scope in scopes:
+            series = ExpenseSeries(self.step, *scope)
+            for window in plan:
+                key = _cache_key(scope, window)
+                value = fetched.get(key) or self.cache[key]
+                series.append(window[0], value[0], value[1])
+            collected.append(series)
+        if by_folder:
+            return {series.folder_id: series for series in collected}
+        return collected[0]
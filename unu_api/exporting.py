@@ -0,0 +1,404 @@
+"""
+Потоковая выгрузка отчётов и задач в NDJSON, CSV и Parquet
+
+    python -m unu_api.exporting reports reports.parquet --task-id 123
+"""
+import argparse
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import os
+import sys
+import time
+from enum import IntEnum
+from itertools import islice
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional
+
+from .models import RECORDS, Record
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+__all__ = ["ExportStats", "FORMATS", "export", "export_async"]
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+# Расширение файла -> формат
+EXTENSIONS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".parquet": "parquet",
+}
+COMPRESSIONS: Dict[Optional[str], Callable[..., Any]] = {
+    None: open,
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+# Расширение сжатого файла -> сжатие
+SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+
+class ExportStats:
+    """
+    Итог выгрузки: число строк и фрагментов, время и размер файла
+    """
+
+    __slots__ = ("path", "format", "rows", "chunks", "elapsed", "size")
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.format = fmt
+        self.rows = 0
+        self.chunks = 0
+        self.elapsed = 0.0
+        self.size = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self) -> str:
+        return "<ExportStats %s %s rows=%d chunks=%d %.0f rows/s>" % (
+            self.path,
+            self.format,
+            self.rows,
+            self.chunks,
+            self.rows_per_second,
+        )
+
+
+def detect(path: str, fmt: str = None, compression: str = None):
+    """
+    Формат и сжатие по явным параметрам или по расширению файла
+    """
+    root, ext = os.path.splitext(path.lower())
+    if ext in SUFFIXES:
+        compression = compression or SUFFIXES[ext]
+        root, ext = os.path.splitext(root)
+    fmt = fmt or EXTENSIONS.get(ext, "ndjson")
+    if fmt not in FORMATS:
+        raise ValueError("Неизвестный формат %r" % fmt)
+    if fmt != "parquet" and compression not in COMPRESSIONS:
+        raise ValueError("Неизвестное сжатие %r" % compression)
+    return fmt, compression
+
+
+def _raw(record: Any, name: str) -> Any:
+    """
+    Значение поля для выгрузки без обращения к свойствам модели
+
+    Модель хранит исходное значение ответа, пока поле не прочитано, и
+    преобразованное после; перечисления выгружаются числом, как в ответе
+    API, поэтому строки выгрузки не зависят от typed.
+    """
+    if isinstance(record, dict):
+        return record.get(name)
+    value = getattr(record, "_" + name)
+    if isinstance(value, IntEnum):
+        return int(value)
+    return value
+
+
+def _as_dict(record: Any) -> Dict[str, Any]:
+    if isinstance(record, Record):
+        return {name: _raw(record, name) for name in record._fields}
+    return record
+
+
+def _pyarrow() -> Any:
+    """
+    pyarrow импортируется только для Parquet: он заметно замедляет запуск
+    """
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise ImportError(
+            "Для Parquet нужен pyarrow: pip install unu_api[parquet]"
+        ) from None
+    return pyarrow
+
+
+class _Writer:
+    def __init__(self, path: str, columns: List[str], compression: Optional[str]):
+        self.path = path
+        self.columns = columns
+        self.compression = compression
+
+    def _open(self, mode: str) -> Any:
+        if self.path == "-":
+            return sys.stdout if "t" in mode else sys.stdout.buffer
+        if "t" in mode:
+            return COMPRESSIONS[self.compression](
+                self.path, mode, encoding="utf-8", newline=""
+            )
+        return COMPRESSIONS[self.compression](self.path, mode)
+
+    def write(self, chunk: List[Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        if self.path == "-":
+            self.file.flush()
+        else:
+            self.file.close()
+
+
+class NdjsonWriter(_Writer):
+    """
+    Одна запись JSON на строку; запись пишется целиком, со всеми полями
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.file = self._open("wb")
+        if orjson is not None:
+            self.dumps = orjson.dumps
+        else:
+            self.dumps = lambda obj: json.dumps(obj, ensure_ascii=False).encode()
+
+    def write(self, chunk: List[Any]) -> None:
+        dumps = self.dumps
+        self.file.write(b"\n".join(dumps(_as_dict(record)) for record in chunk))
+        self.file.write(b"\n")
+
+
+class CsvWriter(_Writer):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.file = self._open("wt")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+
+    def write(self, chunk: List[Any]) -> None:
+        columns = self.columns
+        self.writer.writerows(
+            [_raw(record, name) for name in columns] for record in chunk
+        )
+
+
+class ParquetWriter(_Writer):
+    """
+    Каждый фрагмент записывается отдельной группой строк Parquet
+    """
+
+    def __init__(self, path, columns, compression, kind=None):
+        super().__init__(path, columns, compression)
+        self.pyarrow = _pyarrow()
+        self.types = _types(self.pyarrow, kind)
+        self.schema = None
+        self.file = None
+
+    def _arrays(self, chunk: List[Any]) -> Dict[str, Any]:
+        pyarrow = self.pyarrow
+        arrays = {}
+        for name in self.columns:
+            convert, arrow_type = self.types.get(name, (None, None))
+            values = [_raw(record, name) for record in chunk]
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            arrays[name] = pyarrow.array(values, type=arrow_type)
+        return arrays
+
+    def write(self, chunk: List[Any]) -> None:
+        table = self.pyarrow.table(self._arrays(chunk))
+        if self.file is None:
+            self.schema = table.schema
+            self.file = self.pyarrow.parquet.ParquetWriter(
+                sys.stdout.buffer if self.path == "-" else self.path,
+                self.schema,
+                compression=self.compression or "snappy",
+            )
+        elif table.schema != self.schema:
+            table = table.cast(self.schema)
+        self.file.write_table(table)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+def _types(pyarrow: Any, kind: Optional[str]) -> Dict[str, Any]:
+    """
+    Типы столбцов Parquet по полям модели: float, str, остальное - int64
+    """
+    if kind not in RECORDS:
+        return {}
+    types = {}
+    for name in RECORDS[kind]._fields:
+        convert = vars(RECORDS[kind])[name].convert
+        if convert is float:
+            types[name] = (float, pyarrow.float64())
+        elif convert is str:
+            types[name] = (str, pyarrow.string())
+        else:
+            types[name] = (int, pyarrow.int64())
+    return types
+
+
+class _Export:
+    """
+    Общая часть export и export_async: писатель создаётся по первому фрагменту
+    """
+
+    def __init__(self, path, fmt, compression, columns, kind):
+        fmt, compression = detect(path, fmt, compression)
+        self.stats = ExportStats(path, fmt)
+        self.compression = compression
+        self.columns = columns or (list(RECORDS[kind]._fields) if kind else None)
+        self.kind = kind
+        self.writer: Optional[_Writer] = None
+        self.started = time.perf_counter()
+
+    def _open(self, columns: List[str]) -> _Writer:
+        path, compression = self.stats.path, self.compression
+        if self.stats.format == "parquet":
+            return ParquetWriter(path, columns, compression, self.kind)
+        if self.stats.format == "csv":
+            return CsvWriter(path, columns, compression)
+        return NdjsonWriter(path, columns, compression)
+
+    def write(self, chunk: List[Any]) -> None:
+        if self.writer is None:
+            self.writer = self._open(self.columns or list(_as_dict(chunk[0])))
+        self.writer.write(chunk)
+        self.stats.rows += len(chunk)
+        self.stats.chunks += 1
+
+    def abort(self) -> None:
+        """
+        Закрывает открытый писатель после ошибки, не подменяя её своей
+        """
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+    def close(self) -> ExportStats:
+        if self.writer is None:
+            # пустая выгрузка: файл только с заголовком или схемой
+            self.writer = self._open(self.columns or [])
+            if self.stats.format == "parquet":
+                self.writer.write([])
+        self.writer.close()
+        self.stats.elapsed = time.perf_counter() - self.started
+        if self.stats.path != "-":
+            self.stats.size = os.path.getsize(self.stats.path)
+        return self.stats
+
+
+def export(
+    records: Iterable[Any],
+    path: str,
+    fmt: str = None,
+    compression: str = None,
+    chunk_size: int = 10000,
+    columns: List[str] = None,
+    kind: str = None,
+) -> ExportStats:
+    """
+    Записывает записи в файл фрагментами по chunk_size строк
+
+    В памяти одновременно находится не больше одного фрагмента, поэтому
+    вместе с iter_reports/iter_tasks память не зависит от объёма выгрузки.
+
+    Входные данные
+        records (iterable) - словари или модели unu_api.models
+        path (str) - файл, "-" - стандартный вывод
+        fmt (str) - "ndjson", "csv" или "parquet", по умолчанию \
+            по расширению файла
+        compression (str) - "gzip", "bz2" или "xz" для NDJSON и CSV \
+            (по умолчанию по расширению .gz, .bz2, .xz); для Parquet - \
+            кодек pyarrow, по умолчанию "snappy"
+        chunk_size (int) - строк во фрагменте
+        columns (list) - столбцы CSV и Parquet, по умолчанию поля модели kind \
+            или ключи первой записи
+        kind (str) - "reports", "tasks", "folders" или "tariffs" \
+            (необязательный параметр)
+    Выходные данные
+        ExportStats
+    """
+    job = _Export(path, fmt, compression, columns, kind)
+    records = iter(records)
+    try:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            job.write(chunk)
+    except BaseException:
+        job.abort()
+        raise
+    return job.close()
+
+
+async def export_async(
+    records: AsyncIterable[Any],
+    path: str,
+    fmt: str = None,
+    compression: str = None,
+    chunk_size: int = 10000,
+    columns: List[str] = None,
+    kind: str = None,
+) -> ExportStats:
+    """
+    Асинхронный вариант export для iter_reports/iter_tasks AsyncApi
+    """
+    job = _Export(path, fmt, compression, columns, kind)
+    chunk: List[Any] = []
+    try:
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                job.write(chunk)
+                chunk = []
+        if chunk:
+            job.write(chunk)
+    except BaseException:
+        job.abort()
+        raise
+    return job.close()
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m unu_api.exporting", description="Выгрузка отчётов и задач"
+    )
+    parser.add_argument("kind", choices=("reports", "tasks"))
+    parser.add_argument("path", help='файл выгрузки, "-" - стандартный вывод')
+    parser.add_argument("--format", choices=FORMATS, dest="fmt")
+    parser.add_argument("--compression")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--task-id", type=int, help="отчёты одной задачи")
+    parser.add_argument("--folder-id", type=int, help="задачи одной папки")
+    parser.add_argument("--url", default="https://unu.im/api")
+    parser.add_argument("--token", default=os.getenv("API_KEY"))
+    args = parser.parse_args(argv)
+
+    from .api import Api  # pylint: disable=import-outside-toplevel
+
+    with Api(url=args.url, token=args.token) as api:
+        if args.kind == "reports":
+            stats = api.export_reports(
+                args.path, args.task_id, args.fmt, args.compression, args.chunk_size
+            )
+        else:
+            stats = api.export_tasks(
+                args.path, args.folder_id, args.fmt, args.compression, args.chunk_size
+            )
+    print(
+        "%s: %d строк за %.1f с (%.0f строк/с)"
+        % (stats.path, stats.rows, stats.elapsed, stats.rows_per_second),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Столбцовое представление отчётов для быстрой аналитики на NumPy
+"""
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Any, AsyncIterable, Dict, Iterable, List, Sequence, Tuple, Union
+
+from .models import Record
+
+__all__ = ["GroupBy", "ReportFrame"]
+
+# Столбец -> тип: q - int64, d - float64
+COLUMNS = (
+    ("id", "q"),
+    ("task_id", "q"),
+    ("worker_id", "q"),
+    ("price_unu", "d"),
+    ("price_rub", "d"),
+    ("status", "q"),
+    ("folder_id", "q"),
+)
+
+# Сколько записей переносится в столбцы за один проход
+CHUNK = 10000
+
+# Пустое значение в целочисленном столбце (идентификаторы и статусы >= 0)
+MISSING = -1
+
+
+def _numpy() -> Any:
+    """
+    numpy импортируется при первом обращении, чтобы не замедлять запуск
+    """
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise ImportError(
+            "Для ReportFrame нужен numpy: pip install unu_api[numpy]"
+        ) from None
+    return numpy
+
+
+class _Builder:
+    """
+    Переносит отчёты в столбцы фрагментами по CHUNK записей; пустые
+    значения - MISSING (-1) для целых и NaN для цен
+    """
+
+    def __init__(self):
+        numpy = _numpy()
+        self.numpy = numpy
+        self.dtypes = {"q": numpy.int64, "d": numpy.float64}
+        self.chunks: Dict[str, List[Any]] = {name: [] for name, _ in COLUMNS}
+
+    def add(self, records: Iterable[Any]) -> None:
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, CHUNK))
+            if not chunk:
+                return
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, chunk: List[Any]) -> None:
+        fromiter = self.numpy.fromiter
+        records = isinstance(chunk[0], Record)
+        for name, code in COLUMNS:
+            getter = attrgetter("_" + name) if records else itemgetter(name)
+            dtype = self.dtypes[code]
+            try:
+                column = fromiter(map(getter, chunk), dtype=dtype, count=len(chunk))
+            except (KeyError, TypeError, ValueError):
+                # пропущенные поля, строки из PHP или пустые значения
+                column = fromiter(
+                    (_convert(_raw(record, name), code) for record in chunk),
+                    dtype=dtype,
+                    count=len(chunk),
+                )
+            self.chunks[name].append(column)
+
+    def frame(self) -> "ReportFrame":
+        numpy = self.numpy
+        return ReportFrame(
+            {
+                name: (
+                    numpy.concatenate(self.chunks[name])
+                    if self.chunks[name]
+                    else numpy.empty(0, dtype=self.dtypes[code])
+                )
+                for name, code in COLUMNS
+            }
+        )
+
+
+def _raw(record: Any, name: str) -> Any:
+    if isinstance(record, Record):
+        return getattr(record, "_" + name)
+    return record.get(name)
+
+
+def _convert(value: Any, code: str) -> Union[int, float]:
+    if value is None or value == "":
+        return MISSING if code == "q" else float("nan")
+    return int(value) if code == "q" else float(value)
+
+
+def _present(frame: "ReportFrame", names: Sequence[str]) -> "ReportFrame":
+    """
+    Кадр без строк, в которых хотя бы один из столбцов names пуст
+    """
+    numpy = _numpy()
+    keep = None
+    for name in names:
+        column = frame[name]
+        filled = column != MISSING if column.dtype.kind == "i" else ~numpy.isnan(column)
+        keep = filled if keep is None else keep & filled
+    if keep is None or keep.all():
+        return frame
+    return frame[keep]
+
+
+def _factorize(column: Any) -> Tuple[Any, Any]:
+    """
+    Различные значения столбца по возрастанию и номер значения для каждой
+    строки. Идентификаторы - небольшие неотрицательные числа, для них
+    хватает линейного bincount вместо сортировки numpy.unique.
+    """
+    numpy = _numpy()
+    if (
+        column.dtype.kind == "i"
+        and len(column)
+        and column.min() >= 0
+        and column.max() <= max(4 * len(column), 1 << 16)
+    ):
+        present = numpy.bincount(column) > 0
+        keys = numpy.flatnonzero(present)
+        lookup = numpy.cumsum(present) - 1
+        return keys, lookup[column]
+    keys, index = numpy.unique(column, return_inverse=True)
+    return keys, index.ravel()
+
+
+class ReportFrame:
+    """
+    Отчёты в виде столбцов NumPy: id, task_id, worker_id, price_unu,
+    price_rub, status, folder_id
+
+    Столбцы доступны как атрибуты (frame.price_rub). frame.mask(...)
+    строит логическую маску, frame[mask] - кадр из отобранных строк,
+    frame.groupby(столбец) - группировку с векторными агрегатами.
+    Пустые значения целочисленных столбцов - MISSING (-1), цен - NaN;
+    groupby и crosstab не включают такие строки в группы.
+
+        paid = frame[frame.mask(status=6)]
+        spend = paid.groupby("worker_id").sum("price_rub")
+    """
+
+    def __init__(self, columns: Dict[str, Any]):
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> "ReportFrame":
+        """
+        Кадр из словарей ответа или моделей Report (например, iter_reports)
+        """
+        builder = _Builder()
+        builder.add(records)
+        return builder.frame()
+
+    @classmethod
+    async def from_records_async(cls, records: AsyncIterable[Any]) -> "ReportFrame":
+        """
+        Кадр из асинхронного потока отчётов AsyncApi.iter_reports
+        """
+        builder = _Builder()
+        chunk: List[Any] = []
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= CHUNK:
+                builder.add(chunk)
+                chunk = []
+        builder.add(chunk)
+        return builder.frame()
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> "ReportFrame":
+        """
+        Кадр из ответа get_reports
+        """
+        reports = response.get("reports") or ()
+        if isinstance(reports, dict):
+            reports = reports.values()
+        return cls.from_records(reports)
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __repr__(self) -> str:
+        return "<ReportFrame rows=%d>" % len(self)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key: Union[str, Any]) -> Any:
+        """
+        frame["status"] - столбец, frame[mask] - кадр из отобранных строк
+        """
+        if isinstance(key, str):
+            return self.columns[key]
+        numpy = _numpy()
+        key = numpy.asarray(key)
+        if key.dtype == bool:
+            # номера строк находятся один раз, а не для каждого столбца
+            key = numpy.flatnonzero(key)
+        return ReportFrame(
+            {name: column.take(key) for name, column in self.columns.items()}
+        )
+
+    def mask(self, **conditions: Any) -> Any:
+        """
+        Логическая маска строк: значение столбца равно заданному или,
+        для списка значений, входит в список. Условия объединяются через "и".
+
+            frame.mask(status=2, folder_id=[1, 2])
+        """
+        numpy = _numpy()
+        result = numpy.ones(len(self), dtype=bool)
+        for name, value in conditions.items():
+            column = self.columns[name]
+            if isinstance(value, (list, tuple, set, frozenset)):
+                result &= numpy.isin(column, list(value))
+            else:
+                result &= column == value
+        return result
+
+    def groupby(self, by: str) -> "GroupBy":
+        return GroupBy(self, by)
+
+    def crosstab(
+        self, rows: str, columns: str, normalize: bool = False
+    ) -> Tuple[Any, Any, Any]:
+        """
+        Таблица числа отчётов по парам значений двух столбцов
+
+        Выходные данные
+            (значения rows, значения columns, матрица); при normalize=True \
+                каждая строка матрицы - доли, в сумме 1
+        """
+        numpy = _numpy()
+        frame = _present(self, (rows, columns))
+        row_keys, row_index = _factorize(frame[rows])
+        col_keys, col_index = _factorize(frame[columns])
+        flat = row_index * len(col_keys) + col_index
+        table = numpy.bincount(flat, minlength=len(row_keys) * len(col_keys))
+        table = table.reshape(len(row_keys), len(col_keys))
+        if normalize:
+            totals = table.sum(axis=1, keepdims=True)
+            table = table / numpy.where(totals == 0, 1, totals)
+        return row_keys, col_keys, table
+
+
+class GroupBy:
+    """
+    Группировка кадра по значениям столбца
+
+    keys - различные значения столбца по возрастанию, агрегаты возвращают
+    массив значений в том же порядке. to_dict(values) превращает результат
+    в словарь ключ -> значение. Строки с пустым значением by
+    в группы не входят.
+    """
+
+    def __init__(self, frame: ReportFrame, by: str):
+        frame = _present(frame, (by,))
+        self.frame = frame
+        self.by = by
+        self.keys, self.index = _factorize(frame[by])
+        self._order = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def count(self) -> Any:
+        return _numpy().bincount(self.index, minlength=len(self.keys))
+
+    def sum(self, column: str) -> Any:
+        return _numpy().bincount(
+            self.index, weights=self.frame[column], minlength=len(self.keys)
+        )
+
+    def mean(self, column: str) -> Any:
+        return self.sum(column) / self.count()
+
+    def _reduce(self, ufunc: Any, column: str) -> Any:
+        numpy = _numpy()
+        if self._order is None:
+            self._order = numpy.argsort(self.index, kind="stable")
+        if not len(self.keys):
+            return numpy.empty(0, dtype=self.frame[column].dtype)
+        starts = numpy.searchsorted(
+            self.index[self._order], numpy.arange(len(self.keys))
+        )
+        return ufunc.reduceat(self.frame[column][self._order], starts)
+
+    def min(self, column: str) -> Any:
+        return self._reduce(_numpy().minimum, column)
+
+    def max(self, column: str) -> Any:
+        return self._reduce(_numpy().maximum, column)
+
+    def nunique(self, column: str) -> Any:
+        """
+        Число различных значений column в каждой группе
+        """
+        numpy = _numpy()
+        pairs = numpy.unique(numpy.stack([self.index, self.frame[column]]), axis=1)
+        return numpy.bincount(pairs[0].astype(numpy.int64), minlength=len(self.keys))
+
+    def aggregate(self, **specs: Tuple[str, str]) -> Dict[str, Any]:
+        """
+        Несколько агрегатов сразу: имя=(столбец, "sum" | "mean" | "min" | \
+            "max" | "nunique") или имя=("id", "count")
+
+            frame.groupby("task_id").aggregate(
+                reports=("id", "count"), spend=("price_rub", "sum")
+            )
+        """
+        result = {self.by: self.keys}
+        for name, (column, how) in specs.items():
+            result[name] = (
+                self.count() if how == "count" else getattr(self, how)(column)
+            )
+        return result
+
+    def to_dict(self, values: Sequence[Any]) -> Dict[Any, Any]:
+        return dict(zip(self.keys.tolist(), _numpy().asarray(values).tolist()))
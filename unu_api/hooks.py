@@ -0,0 +1,117 @@
+"""
+Точки расширения для наблюдения за запросами к API
+"""
+import cProfile
+import pstats
+import random
+import threading
+from typing import Any, Dict, Optional
+
+__all__ = ["Hook", "CallInfo", "ProfilingHook"]
+
+
+class CallInfo:
+    """
+    Сведения о выполненной попытке запроса
+    """
+
+    __slots__ = (
+        "elapsed",
+        "status",
+        "request_bytes",
+        "response_bytes",
+        "error",
+        "response",
+    )
+
+    def __init__(
+        self,
+        elapsed: float,
+        status: int = 0,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        error: Exception = None,
+        response: Any = None,
+    ):
+        self.elapsed = elapsed
+        self.status = status
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.error = error
+        self.response = response
+
+    def __repr__(self) -> str:
+        return "<CallInfo %.4fs status=%s sent=%d received=%d error=%r>" % (
+            self.elapsed,
+            self.status,
+            self.request_bytes,
+            self.response_bytes,
+            self.error,
+        )
+
+
+class Hook:
+    """
+    Базовый класс хуков клиента
+
+    before_request вызывается перед каждой попыткой запроса, его результат
+    передаётся в after_response той же попытки (например, открытый span
+    трассировки). Исключение из before_request отменяет запрос. Разобранный
+    ответ успешной попытки доступен в info.response. on_retry вызывается
+    перед повтором запроса.
+
+    prepare вызывается один раз на запрос, до before_request всех хуков:
+    в нём хук может сам обратиться к API через клиент (например, загрузить
+    справочник), не вкладывая запрос в цепочку хуков другого запроса.
+    """
+
+    def prepare(self, action: str, data: Dict[str, Any]) -> None:
+        pass
+
+    def before_request(self, action: str, data: Dict[str, Any]) -> Any:
+        return None
+
+    def after_response(
+        self, action: str, data: Dict[str, Any], token: Any, info: CallInfo
+    ) -> None:
+        pass
+
+    def on_retry(self, action: str, attempt: int, error: Exception) -> None:
+        pass
+
+
+class ProfilingHook(Hook):
+    """
+    Профилирует cProfile случайную долю запросов (sample_rate)
+
+    Профиль накапливается в stats (pstats.Stats). Профилируется поток,
+    выполняющий запрос, поэтому хук предназначен для синхронного клиента.
+    """
+
+    def __init__(self, sample_rate: float = 0.01):
+        self.sample_rate = sample_rate
+        self.stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+    def before_request(self, action: str, data: Dict[str, Any]) -> Any:
+        if random.random() >= self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # в потоке уже работает другой профилировщик
+            return None
+        return profiler
+
+    def after_response(
+        self, action: str, data: Dict[str, Any], token: Any, info: CallInfo
+    ) -> None:
+        if token is None:
+            return
+        token.disable()
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(token)
+            else:
+                self.stats.add(token)
@@ -0,0 +1,254 @@
+"""
+Локальный учёт баланса без запроса get_balance перед каждой тратой
+"""
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from .exceptions import BalanceError
+from .hooks import CallInfo, Hook
+from .sync import _field
+
+__all__ = ["BalanceLedger"]
+
+logger = logging.getLogger(__name__)
+
+# Методы, перед которыми проверяется, хватит ли средств
+CHARGED_ACTIONS = ("add_task", "task_limit_add")
+
+
+def _tasks(response: Any) -> Iterable[Any]:
+    if isinstance(response, dict):
+        return response.get("tasks") or ()
+    return response or ()
+
+
+class BalanceLedger(Hook):
+    """
+    Хук, ведущий прогноз баланса аккаунта на стороне клиента
+
+    Баланс и замороженные средства берутся из ответов get_balance, после
+    чего ledger сам вычитает стоимость добавленных лимитов (цена задачи,
+    умноженная на число выполнений). task_limit_add, на который не хватает
+    средств, и add_task с ценой выше доступного баланса отклоняются
+    BalanceError до отправки запроса. Перед отказом баланс один раз
+    сверяется с сервером (средства могли пополнить). Сверка выполняется
+    также раз в resync_interval секунд и после ошибки траты, когда прогноз
+    мог разойтись с сервером.
+
+    Баланс и цены ledger ведёт в UNU. Цены задач он узнаёт из ответов
+    get_tasks (price_unu). add_task и edit_task задают цену в рублях: она
+    переводится в UNU по курсу rate, а если курс неизвестен, цена задачи
+    перечитывается через get_tasks перед следующим task_limit_add. Траты
+    задач с неизвестной ценой не проверяются. AsyncApi
+    не позволяет сверяться внутри хука, поэтому для него сверку выполняет
+    await ledger.resync_async().
+
+    Входные данные
+        api (Api) - клиент, к которому подключается хук
+        resync_interval (float) - как часто сверять баланс, в секундах
+        tolerance (float) - расхождение с сервером, которое не считается \
+            ошибкой прогноза
+        rate (float) - сколько UNU стоит рубль цены задачи, по умолчанию \
+            определяется по price_unu и price_rub из get_tasks \
+            (необязательный параметр)
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        resync_interval: float = 300.0,
+        tolerance: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+        rate: float = None,
+    ):
+        self.api = api
+        self.rate = rate
+        self._learn_rate = rate is None
+        self.resync_interval = resync_interval
+        self.tolerance = tolerance
+        self.clock = clock
+        self.balance: Optional[float] = None
+        self.blocked_money = 0.0
+        self.reserved = 0.0
+        self.prices: Dict[int, float] = {}
+        # задачи, цена которых в UNU неизвестна после add_task/edit_task
+        self.unpriced: Set[int] = set()
+        self.synced_at = 0.0
+        self.stale = True
+        self.resyncs = 0
+        self.rejected = 0
+        self.drifts = 0
+        self.drift = 0.0
+        self._async = inspect.iscoroutinefunction(getattr(api, "_send", None))
+        self._lock = threading.Lock()
+        api.add_hook(self)
+
+    @property
+    def available(self) -> Optional[float]:
+        """
+        Прогноз доступных средств с учётом выполняющихся трат
+        """
+        with self._lock:
+            if self.balance is None:
+                return None
+            return self.balance - self.reserved
+
+    def seed(self, response: Dict[str, Any]) -> None:
+        """
+        Принимает ответ get_balance как точное значение баланса
+        """
+        balance = float(response["balance"])
+        with self._lock:
+            if self.balance is not None:
+                self.drift = balance - self.balance
+                if abs(self.drift) > self.tolerance:
+                    self.drifts += 1
+                    logger.info("Прогноз баланса разошёлся на %.2f", self.drift)
+            self.balance = balance
+            self.blocked_money = float(response.get("blocked_money") or 0)
+            self.synced_at = self.clock()
+            self.stale = False
+
+    def resync(self) -> None:
+        """
+        Сверяет баланс с сервером (ответ обрабатывает сам хук)
+        """
+        self.resyncs += 1
+        self.api.get_balance()
+
+    async def resync_async(self) -> None:
+        self.resyncs += 1
+        await self.api.get_balance()
+
+    def set_price(self, task_id: int, price: float) -> None:
+        """
+        Цена одного выполнения задачи в UNU
+        """
+        with self._lock:
+            self.prices[int(task_id)] = float(price)
+            self.unpriced.discard(int(task_id))
+
+    def learn_prices(self, tasks: Iterable[Any]) -> None:
+        """
+        Запоминает price_unu задач (словари ответа get_tasks или модели Task)
+        и, если курс не задан, курс UNU к рублю
+        """
+        with self._lock:
+            for task in tasks:
+                price_unu = _field(task, "price_unu")
+                if price_unu is None:
+                    continue
+                task_id = int(_field(task, "id"))
+                self.prices[task_id] = float(price_unu)
+                self.unpriced.discard(task_id)
+                price_rub = _field(task, "price_rub")
+                if self._learn_rate and price_rub and float(price_rub) > 0:
+                    self.rate = float(price_unu) / float(price_rub)
+
+    def _rub_price(self, task_id: int, price: Any) -> None:
+        """
+        Цена из add_task/edit_task задана в рублях
+        """
+        if self.rate is not None:
+            self.set_price(task_id, float(price) * self.rate)
+            return
+        with self._lock:
+            self.prices.pop(int(task_id), None)
+            self.unpriced.add(int(task_id))
+
+    def cost(self, action: str, data: Dict[str, Any]) -> Optional[float]:
+        """
+        Стоимость операции в UNU или None, если её нельзя оценить
+        """
+        if action == "add_task":
+            if self.rate is None:
+                return None
+            return float(data["price"]) * self.rate
+        if action == "task_limit_add":
+            price = self.prices.get(int(data["task_id"]))
+            if price is None:
+                return None
+            return price * int(data["add_to_limit"])
+        return None
+
+    def _due(self) -> bool:
+        return (
+            self.stale
+            or self.balance is None
+            or self.clock() - self.synced_at >= self.resync_interval
+        )
+
+    def _reserve(self, action: str, cost: float) -> bool:
+        with self._lock:
+            if self.balance is not None and cost > self.balance - self.reserved:
+                return False
+            if action == "task_limit_add":
+                self.reserved += cost
+            return True
+
+    def before_request(self, action: str, data: Dict[str, Any]) -> Any:
+        if action not in CHARGED_ACTIONS:
+            return None
+        if (
+            action == "task_limit_add"
+            and not self._async
+            and int(data["task_id"]) in self.unpriced
+        ):
+            self.learn_prices(_tasks(self.api.get_tasks()))
+        cost = self.cost(action, data)
+        if cost is None:
+            return None
+        resynced = False
+        if not self._async and self._due():
+            self.resync()
+            resynced = True
+        if not self._reserve(action, cost):
+            if not self._async and not resynced:
+                self.resync()
+            if not self._reserve(action, cost):
+                self.rejected += 1
+                raise BalanceError(cost, self.available)
+        return cost if action == "task_limit_add" else None
+
+    def after_response(
+        self, action: str, data: Dict[str, Any], token: Any, info: CallInfo
+    ) -> None:
+        response = info.response
+        if action == "task_limit_add" and token is not None:
+            with self._lock:
+                self.reserved -= token
+                if info.error is None and self.balance is not None:
+                    self.balance -= token
+                    self.blocked_money += token
+                elif info.error is not None:
+                    # неизвестно, списал ли сервер деньги
+                    self.stale = True
+            return
+        if info.error is not None:
+            return
+        if action == "get_balance":
+            self.seed(response)
+        elif action == "get_tasks":
+            self.learn_prices(_tasks(response))
+        elif action == "add_task" and response.get("task_id") is not None:
+            self._rub_price(response["task_id"], data["price"])
+        elif action == "edit_task":
+            self._rub_price(data["task_id"], data["price"])
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Прогноз баланса и счётчики сверок, отказов и расхождений
+        """
+        with self._lock:
+            return {
+                "balance": self.balance,
+                "blocked_money": self.blocked_money,
+                "reserved": self.reserved,
+                "resyncs": self.resyncs,
+                "rejected": self.rejected,
+                "drifts": self.drifts,
+                "drift": self.drift,
+            }
@@ -0,0 +1,180 @@
+"""
+Метрики запросов к API
+"""
+import threading
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+from .hooks import CallInfo, Hook
+
+if TYPE_CHECKING:  # pragma: no cover
+    from http.server import ThreadingHTTPServer
+
+__all__ = ["Metrics", "DEFAULT_BUCKETS"]
+
+# Границы корзин гистограммы задержек в секундах
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class ActionStats:
+    """
+    Накопленные показатели одного action
+    """
+
+    __slots__ = (
+        "count",
+        "retries",
+        "errors",
+        "buckets",
+        "latency_sum",
+        "request_bytes",
+        "response_bytes",
+    )
+
+    def __init__(self, size: int):
+        self.count = 0
+        self.retries = 0
+        self.errors: Dict[str, int] = {}
+        self.buckets = [0] * size
+        self.latency_sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class Metrics(Hook):
+    """
+    Хук, собирающий по каждому action число запросов, гистограмму задержек,
+    объём отправленных и полученных байт, ошибки по классам и повторы
+
+    Метрики отдаются в текстовом формате Prometheus (to_prometheus) или
+    по HTTP (serve).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix="unu_api"):
+        self.bounds = tuple(sorted(buckets))
+        self.prefix = prefix
+        self.actions: Dict[str, ActionStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, action: str) -> ActionStats:
+        stats = self.actions.get(action)
+        if stats is None:
+            stats = self.actions[action] = ActionStats(len(self.bounds) + 1)
+        return stats
+
+    def after_response(
+        self, action: str, data: Dict[str, Any], token: Any, info: CallInfo
+    ) -> None:
+        index = bisect_left(self.bounds, info.elapsed)
+        with self._lock:
+            stats = self._stats(action)
+            stats.count += 1
+            stats.buckets[index] += 1
+            stats.latency_sum += info.elapsed
+            stats.request_bytes += info.request_bytes
+            stats.response_bytes += info.response_bytes
+            if info.error is not None:
+                name = type(info.error).__name__
+                stats.errors[name] = stats.errors.get(name, 0) + 1
+
+    def on_retry(self, action: str, attempt: int, error: Exception) -> None:
+        with self._lock:
+            self._stats(action).retries += 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Краткая сводка по action: запросы, ошибки, повторы, средняя задержка
+        """
+        with self._lock:
+            return {
+                action: {
+                    "count": stats.count,
+                    "errors": dict(stats.errors),
+                    "retries": stats.retries,
+                    "mean_latency": (
+                        stats.latency_sum / stats.count if stats.count else 0.0
+                    ),
+                    "request_bytes": stats.request_bytes,
+                    "response_bytes": stats.response_bytes,
+                }
+                for action, stats in self.actions.items()
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Метрики в текстовом формате Prometheus
+        """
+        name = self.prefix
+        counters: List[Tuple[str, str, str]] = [
+            ("requests_total", "count", "Число запросов к API"),
+            ("retries_total", "retries", "Число повторов запросов"),
+            ("request_bytes_total", "request_bytes", "Отправлено байт"),
+            ("response_bytes_total", "response_bytes", "Получено байт"),
+        ]
+        lines: List[str] = []
+        with self._lock:
+            actions = sorted(self.actions.items())
+            for metric, attr, help_text in counters:
+                lines.append("# HELP %s_%s %s" % (name, metric, help_text))
+                lines.append("# TYPE %s_%s counter" % (name, metric))
+                for action, stats in actions:
+                    lines.append(
+                        '%s_%s{action="%s"} %s'
+                        % (name, metric, action, getattr(stats, attr))
+                    )
+            lines.append("# HELP %s_errors_total Ошибки запросов по классам" % name)
+            lines.append("# TYPE %s_errors_total counter" % name)
+            for action, stats in actions:
+                for error, count in sorted(stats.errors.items()):
+                    lines.append(
+                        '%s_errors_total{action="%s",error="%s"} %d'
+                        % (name, action, error, count)
+                    )
+            metric = "%s_request_duration_seconds" % name
+            lines.append("# HELP %s Длительность запросов к API" % metric)
+            lines.append("# TYPE %s histogram" % metric)
+            for action, stats in actions:
+                total = 0
+                for bound, count in zip(self.bounds + (None,), stats.buckets):
+                    total += count
+                    le = "+Inf" if bound is None else repr(float(bound))
+                    lines.append(
+                        '%s_bucket{action="%s",le="%s"} %d'
+                        % (metric, action, le, total)
+                    )
+                lines.append(
+                    '%s_sum{action="%s"} %r' % (metric, action, stats.latency_sum)
+                )
+                lines.append('%s_count{action="%s"} %d' % (metric, action, stats.count))
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9100, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """
+        Запускает в фоновом потоке HTTP-сервер, отдающий метрики по /metrics.
+        По умолчанию сервер доступен только с этой машины; чтобы метрики
+        забирал внешний Prometheus, передайте host="0.0.0.0".
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
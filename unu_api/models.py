@@ -0,0 +1,267 @@
+"""
+Типизированные модели ответов API
+"""
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+__all__ = [
+    "TaskStatus",
+    "ReportStatus",
+    "Record",
+    "Balance",
+    "Expenses",
+    "Folder",
+    "Tariff",
+    "Task",
+    "Report",
+    "parse_response",
+    "RECORDS",
+]
+
+
+class TaskStatus(IntEnum):
+    """
+    Статус задачи
+    """
+
+    NEW = 1  # новое задание, нужно оплатить (увеличить лимит)
+    LIMIT_REACHED = 2  # достигло лимита
+    STOPPED = 3  # остановлено
+    ACTIVE = 4  # активно
+    REJECTED = 5  # отклонено модератором
+    MODERATION = 6  # на модерации
+
+
+class ReportStatus(IntEnum):
+    """
+    Статус отчёта
+    """
+
+    IN_WORK = 1  # в работе
+    REVIEW = 2  # на проверке
+    REWORK = 3  # на доработке
+    PAID = 6  # оплачено
+
+
+def _enum(enum: Callable[[int], IntEnum]) -> Callable[[Any], Union[IntEnum, int]]:
+    """
+    Преобразователь в перечисление, неизвестные значения остаются числом
+    """
+
+    def convert(value: Any) -> Union[IntEnum, int]:
+        try:
+            return enum(int(value))
+        except ValueError:
+            return int(value)
+
+    return convert
+
+
+class Field:
+    """
+    Поле модели: хранит значение из ответа как есть и преобразует его
+    при первом обращении; преобразованное значение заменяет исходное,
+    а бит поля в Record._converted отмечает, что преобразование сделано
+    """
+
+    __slots__ = ("name", "slot", "convert", "bit")
+
+    def __init__(self, convert: Callable[[Any], Any] = None):
+        self.convert = convert
+        self.name = ""
+        self.slot = ""
+        self.bit = 0
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.slot = "_" + name
+
+    def __get__(self, obj: "Record", owner: type = None) -> Any:
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if value is None or self.convert is None or obj._converted & self.bit:
+            return value
+        value = self.convert(value)
+        setattr(obj, self.slot, value)
+        obj._converted |= self.bit
+        return value
+
+    def __set__(self, obj: "Record", value: Any) -> None:
+        setattr(obj, self.slot, value)
+        obj._converted &= ~self.bit
+
+
+class Record:
+    """
+    Базовый класс моделей с __slots__ вместо словаря атрибутов
+
+    Модели сравниваются и хэшируются по преобразованным значениям полей,
+    поэтому Task(id="5") == Task(id=5). Хэш меняется при изменении поля:
+    модель в множестве или ключе словаря изменять не следует.
+    """
+
+    __slots__ = ("_converted",)
+    _fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(
+            name for name, value in vars(cls).items() if isinstance(value, Field)
+        )
+        for index, name in enumerate(cls._fields):
+            vars(cls)[name].bit = 1 << index
+
+    def __init__(self, **values: Any):
+        self._converted = 0
+        for name in self._fields:
+            setattr(self, "_" + name, values.get(name))
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "Record":
+        """
+        Создаёт модель из словаря ответа, лишние поля отбрасываются
+        """
+        obj = cls.__new__(cls)
+        obj._converted = 0
+        get = raw.get
+        for name in cls._fields:
+            setattr(obj, "_" + name, get(name))
+        return obj
+
+    @classmethod
+    def from_list(cls, raw: Union[Iterable[Dict[str, Any]], Dict[Any, Any]]) -> List:
+        """
+        Создаёт список моделей, PHP может отдать массив в виде объекта
+        """
+        if isinstance(raw, dict):
+            raw = raw.values()
+        return [cls.from_dict(item) for item in raw or ()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._values()))
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self._fields
+        )
+        return "%s(%s)" % (type(self).__name__, values)
+
+
+class Balance(Record):
+    """
+    Баланс аккаунта
+    """
+
+    __slots__ = ("_balance", "_blocked_money")
+    balance = Field(float)
+    blocked_money = Field(float)
+
+
+class Expenses(Record):
+    """
+    Сумма израсходованных средств
+    """
+
+    __slots__ = ("_expenses", "_expenses_in_rub")
+    expenses = Field(float)
+    expenses_in_rub = Field(float)
+
+
+class Folder(Record):
+    """
+    Папка с задачами
+    """
+
+    __slots__ = ("_id", "_name")
+    id = Field(int)
+    name = Field(str)
+
+
+class Tariff(Record):
+    """
+    Тариф
+    """
+
+    __slots__ = ("_id", "_name", "_min_price_rub", "_group_id")
+    id = Field(int)
+    name = Field(str)
+    min_price_rub = Field(float)
+    group_id = Field(int)
+
+
+class Task(Record):
+    """
+    Задача
+    """
+
+    __slots__ = ("_id", "_name", "_price_unu", "_price_rub", "_status", "_folder_id")
+    id = Field(int)
+    name = Field(str)
+    price_unu = Field(float)
+    price_rub = Field(float)
+    status = Field(_enum(TaskStatus))
+    folder_id = Field(int)
+
+
+class Report(Record):
+    """
+    Отчёт по задаче
+    """
+
+    __slots__ = (
+        "_id",
+        "_task_id",
+        "_worker_id",
+        "_price_unu",
+        "_price_rub",
+        "_status",
+        "_folder_id",
+    )
+    id = Field(int)
+    task_id = Field(int)
+    worker_id = Field(int)
+    price_unu = Field(float)
+    price_rub = Field(float)
+    status = Field(_enum(ReportStatus))
+    folder_id = Field(int)
+
+
+# Ключ списка в ответе -> модель элемента
+RECORDS = {
+    "folders": Folder,
+    "tariffs": Tariff,
+    "tasks": Task,
+    "reports": Report,
+}
+
+_SINGLE = {"get_balance": Balance, "get_expenses": Expenses}
+_LISTS = {
+    "get_folders": "folders",
+    "get_tariffs": "tariffs",
+    "get_tasks": "tasks",
+    "get_reports": "reports",
+}
+
+
+def parse_response(action: str, response: Any) -> Any:
+    """
+    Преобразует ответ action в модели, остальные ответы не меняются
+    """
+    if action in _SINGLE:
+        return _SINGLE[action].from_dict(response)
+    if action in _LISTS:
+        key = _LISTS[action]
+        return RECORDS[key].from_list(response.get(key))
+    return response
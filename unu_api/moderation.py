@@ -0,0 +1,232 @@
+"""
+Очередь модерации отчётов по сроку проверки и цене
+"""
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .exceptions import ApiError, TransportError
+from .ratelimit import TokenBucket
+from .sync import ReportEvent, ReportSync, _field
+
+__all__ = ["ModerationScheduler"]
+
+logger = logging.getLogger(__name__)
+
+# Статус отчёта "на проверке"
+REVIEW = 2
+
+# Решение: ("approve",) или ("reject", reject_type, comment); None - решить позже
+Decision = Optional[Sequence[Any]]
+
+
+class ModerationScheduler:
+    """
+    Приоритетная очередь отчётов на проверке
+
+    Срок проверки отчёта - момент, когда он впервые попал в очередь, плюс
+    review_window секунд (или значение функции deadline(report, seen_at)). Первыми
+    обрабатываются отчёты с ближайшим сроком, при равном сроке - более
+    дорогие. Решения отправляются не чаще rate в секунду.
+
+    Входные данные
+        api (Api) - клиент
+        decide (callable) - функция decide(report), возвращающая \
+            ("approve",), ("reject", reject_type, comment) или None - \
+                отчёт остаётся в очереди до следующего dispatch
+        review_window (float) - сколько секунд есть на проверку отчёта
+        rate (float) - решений в секунду
+        deadline (callable) - функция deadline(report, seen_at) -> unix time \
+            (необязательный параметр)
+        task_id (int) - модерировать отчёты одной задачи (необязательный параметр)
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        decide: Callable[[Any], Decision],
+        review_window: float = 86400.0,
+        rate: float = 5.0,
+        deadline: Callable[[Any, float], float] = None,
+        task_id: int = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.api = api
+        self.decide = decide
+        self.review_window = review_window
+        self.deadline = deadline
+        self.clock = clock
+        self.bucket = TokenBucket(rate)
+        self.sync = ReportSync(api, task_id=task_id)
+        self.dispatched = 0
+        self.errors = 0
+        self.expired = 0
+        self._heap: List[List[Any]] = []
+        self._entries: Dict[int, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def add(self, report: Any, seen_at: float = None) -> None:
+        """
+        Добавляет отчёт в очередь или обновляет его
+        """
+        seen_at = self.clock() if seen_at is None else seen_at
+        report_id = int(_field(report, "id"))
+        if self.deadline is not None:
+            due = self.deadline(report, seen_at)
+        else:
+            due = seen_at + self.review_window
+        price = float(_field(report, "price_rub") or 0)
+        self._push([due, -price, report_id, seen_at, report])
+
+    def discard(self, report_id: int) -> None:
+        """
+        Убирает отчёт из очереди (удаление ленивое, запись в куче пропускается)
+        """
+        with self._lock:
+            self._entries.pop(report_id, None)
+
+    def refresh(self) -> int:
+        """
+        Опрашивает get_reports: новые отчёты на проверке попадают в очередь,
+        проверенные где-то ещё - убираются. Возвращает глубину очереди.
+        """
+        for event in self.sync.poll():
+            if event.status == REVIEW:
+                self.add(event.report)
+            elif event.kind != ReportEvent.NEW:
+                self.discard(event.report_id)
+        return self.depth
+
+    def _pop(self) -> Optional[List[Any]]:
+        with self._lock:
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                if self._entries.get(entry[2]) is entry:
+                    del self._entries[entry[2]]
+                    return entry
+        return None
+
+    def _push(self, entry: List[Any]) -> None:
+        with self._lock:
+            self._entries[entry[2]] = entry
+            heapq.heappush(self._heap, entry)
+
+    def _requeue(self, entries: List[List[Any]]) -> None:
+        """
+        Возвращает отложенные отчёты, если их не обновил или не убрал refresh
+        """
+        with self._lock:
+            for entry in entries:
+                if entry[2] not in self._entries:
+                    self._entries[entry[2]] = entry
+                    heapq.heappush(self._heap, entry)
+
+    def pop(self) -> Optional[Tuple[float, Any]]:
+        """
+        Самый срочный отчёт: (срок, отчёт) или None
+        """
+        entry = self._pop()
+        return None if entry is None else (entry[0], entry[4])
+
+    def dispatch(self, limit: int = None) -> List[Tuple[int, Decision, Any]]:
+        """
+        Отправляет решения по отчётам в порядке срочности
+
+        Выходные данные
+            список (report_id, решение, ответ API или исключение)
+
+        Отчёт с сетевой ошибкой возвращается в очередь, и отправка
+        прекращается до следующего вызова. Отчёты, по которым decide
+        вернула None, остаются в очереди и снова попадут в decide
+        при следующем вызове.
+        """
+        done: List[Tuple[int, Decision, Any]] = []
+        undecided: List[List[Any]] = []
+        try:
+            self._dispatch(done, undecided, limit)
+        finally:
+            self._requeue(undecided)
+        return done
+
+    def _dispatch(
+        self,
+        done: List[Tuple[int, Decision, Any]],
+        undecided: List[List[Any]],
+        limit: Optional[int],
+    ) -> None:
+        while limit is None or len(done) < limit:
+            entry = self._pop()
+            if entry is None:
+                break
+            due, report_id, report = entry[0], entry[2], entry[4]
+            decision = self.decide(report)
+            if decision is None:
+                undecided.append(entry)
+                continue
+            delay = self.bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+            if self.clock() > due:
+                self.expired += 1
+            try:
+                if decision[0] == "approve":
+                    outcome = self.api.approve_report(report_id)
+                else:
+                    outcome = self.api.reject_report(report_id, *decision[1:])
+                self.dispatched += 1
+            except TransportError as error:
+                self.errors += 1
+                self._push(entry)
+                done.append((report_id, decision, error))
+                break
+            except ApiError as error:
+                self.errors += 1
+                outcome = error
+            done.append((report_id, decision, outcome))
+
+    @property
+    def depth(self) -> int:
+        return len(self._entries)
+
+    def lag(self) -> float:
+        """
+        Сколько секунд ждёт самый старый отчёт в очереди
+        """
+        with self._lock:
+            oldest = min((entry[3] for entry in self._entries.values()), default=None)
+        return 0.0 if oldest is None else max(0.0, self.clock() - oldest)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Глубина очереди, задержка, просроченные и отправленные решения
+        """
+        now = self.clock()
+        with self._lock:
+            overdue = sum(1 for entry in self._entries.values() if entry[0] < now)
+        return {
+            "depth": self.depth,
+            "lag": self.lag(),
+            "overdue": overdue,
+            "dispatched": self.dispatched,
+            "expired": self.expired,
+            "errors": self.errors,
+        }
+
+    def run(self, interval: float = 30.0) -> None:
+        """
+        Опрашивает отчёты и отправляет решения, пока не вызван stop()
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except ApiError as error:
+                logger.warning("Опрос отчётов не удался: %s", error)
+            self.dispatch()
+            self._stop.wait(interval)
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,292 @@
+"""
+Массовое создание задач: add_task -> task_limit_add -> move_task
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .exceptions import ReviewRequiredError
+from .sync import _field
+
+__all__ = ["ProvisionJournal", "ProvisionOutcome", "spec_key"]
+
+# Служебные поля спецификации, которые не передаются в add_task
+SPEC_FIELDS = ("key", "add_to_limit", "move_to")
+
+# Поля спецификации, которые в ответе get_tasks называются иначе
+TASK_FIELDS = {"price": "price_rub"}
+
+# Стадии в порядке выполнения. *ing - запрос отправлен, ответ не записан.
+PENDING, CREATED, FUNDING, FUNDED, MOVING, DONE = (
+    "pending",
+    "created",
+    "funding",
+    "funded",
+    "moving",
+    "done",
+)
+# Оплата прервана, а задача не найдена: нужна ручная проверка
+REVIEW = "review"
+
+
+def spec_key(spec: Dict[str, Any]) -> str:
+    """
+    Ключ идемпотентности спецификации: поле key или хэш её содержимого
+    """
+    if spec.get("key") is not None:
+        return str(spec["key"])
+    body = json.dumps(spec, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(body.encode()).hexdigest()
+
+
+class ProvisionJournal:
+    """
+    Журнал стадий по ключам идемпотентности
+
+    Запись о стадии делается до и после каждого запроса, поэтому
+    повторный запуск той же партии продолжает с места остановки и не
+    создаёт и не оплачивает задачу второй раз. С параметром path журнал
+    дописывается в файл (JSON lines) и переживает перезапуск процесса;
+    журнал без path годится только для повторов внутри одного процесса.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            try:
+                with open(path, encoding="utf-8") as journal:
+                    for line in journal:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self.entries[entry["key"]] = entry
+            except FileNotFoundError:
+                pass
+            self._file = open(path, "a", encoding="utf-8")
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.entries.get(key) or {"key": key, "stage": None})
+
+    def record(self, key: str, stage: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            return self._record(key, stage, fields)
+
+    def _record(self, key: str, stage: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        entry = dict(self.entries.get(key) or {"key": key})
+        entry.update(fields, stage=stage)
+        self.entries[key] = entry
+        if self._file is not None:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+        return dict(entry)
+
+    def claim(self, key: str, task_ids: Iterable[int]) -> Optional[Dict[str, Any]]:
+        """
+        Записывает за key первую задачу из task_ids, которая ещё не записана
+        за другим ключом, со стадией created. None - свободных задач нет.
+        """
+        with self._lock:
+            taken = {
+                entry.get("task_id")
+                for other, entry in self.entries.items()
+                if other != key
+            }
+            for task_id in task_ids:
+                if task_id not in taken:
+                    return self._record(key, CREATED, {"task_id": task_id})
+        return None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ProvisionOutcome:
+    """
+    Итог по одной спецификации
+
+    task_id - идентификатор задачи, created/funded/moved - какие шаги
+    выполнены в этом запуске (False, если шаг был сделан ранее или не нужен)
+    """
+
+    __slots__ = ("key", "task_id", "created", "funded", "moved")
+
+    def __init__(self, key: str, task_id: Optional[int] = None):
+        self.key = key
+        self.task_id = task_id
+        self.created = False
+        self.funded = False
+        self.moved = False
+
+    def __repr__(self) -> str:
+        return "<ProvisionOutcome %s task_id=%s created=%s funded=%s moved=%s>" % (
+            self.key,
+            self.task_id,
+            self.created,
+            self.funded,
+            self.moved,
+        )
+
+
+def prepare(specs: Iterable[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Пары (ключ, спецификация); одинаковые ключи в одной партии - ошибка
+    """
+    prepared = []
+    seen = set()
+    for spec in specs:
+        key = spec_key(spec)
+        if key in seen:
+            raise ValueError("Повторяющаяся спецификация %s: задайте разные key" % key)
+        seen.add(key)
+        prepared.append((key, spec))
+    return prepared
+
+
+def task_fields(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in spec.items() if name not in SPEC_FIELDS}
+
+
+def _same(expected: Any, actual: Any) -> bool:
+    try:
+        return float(expected) == float(actual)
+    except (TypeError, ValueError):
+        return str(expected) == str(actual)
+
+
+def _matches(task: Any, fields: Dict[str, Any]) -> bool:
+    for name, expected in fields.items():
+        try:
+            actual = _field(task, TASK_FIELDS.get(name, name))
+        except AttributeError:
+            continue
+        if expected is not None and actual is not None and not _same(expected, actual):
+            return False
+    return True
+
+
+def _find_new_tasks(tasks: Iterable[Any], spec: Dict[str, Any]) -> List[int]:
+    """
+    Задачи, которые мог создать прерванный запуск: ещё не оплачены и все
+    поля спецификации, которые есть в ответе get_tasks, совпадают. Новые -
+    первыми.
+    """
+    fields = task_fields(spec)
+    found = [
+        int(_field(task, "id"))
+        for task in tasks
+        if int(_field(task, "status")) == 1 and _matches(task, fields)
+    ]
+    return sorted(found, reverse=True)
+
+
+def _task_status(tasks: Iterable[Any], task_id: int) -> Optional[int]:
+    for task in tasks:
+        if int(_field(task, "id")) == task_id:
+            return int(_field(task, "status"))
+    return None
+
+
+def _funding_status(
+    journal: ProvisionJournal, key: str, task_id: int, status: Optional[int]
+) -> str:
+    """
+    Стадия после прерванной оплаты: задача ещё не оплачена (1) - оплатить
+    снова, оплачена - funded. Если задачи нет в списке папки (перемещена
+    или список устарел), повторная оплата могла бы списать деньги дважды,
+    поэтому запись помечается для ручной проверки.
+    """
+    if status == 1:
+        return FUNDING
+    if status is None:
+        journal.record(key, REVIEW)
+        raise ReviewRequiredError(key, task_id)
+    return journal.record(key, FUNDED)["stage"]
+
+
+def provision_task(
+    api: Any, key: str, spec: Dict[str, Any], journal: ProvisionJournal
+) -> ProvisionOutcome:
+    """
+    Проводит одну спецификацию через все стадии, пропуская выполненные
+    """
+    entry = journal.get(key)
+    outcome = ProvisionOutcome(key, entry.get("task_id"))
+    stage = entry["stage"]
+    if stage == DONE:
+        return outcome
+    if stage == REVIEW:
+        raise ReviewRequiredError(key, outcome.task_id)
+    if stage == PENDING:
+        candidates = _find_new_tasks(api.iter_tasks(folder_id=spec["folder_id"]), spec)
+        claimed = journal.claim(key, candidates)
+        if claimed is not None:
+            outcome.task_id, stage = claimed["task_id"], claimed["stage"]
+    if stage in (None, PENDING):
+        journal.record(key, PENDING)
+        outcome.task_id = int(api.add_task(**task_fields(spec))["task_id"])
+        outcome.created = True
+        stage = journal.record(key, CREATED, task_id=outcome.task_id)["stage"]
+    if stage == FUNDING:
+        status = _task_status(
+            api.iter_tasks(folder_id=spec["folder_id"]), outcome.task_id
+        )
+        stage = _funding_status(journal, key, outcome.task_id, status)
+    if stage in (CREATED, FUNDING):
+        journal.record(key, FUNDING)
+        api.task_limit_add(outcome.task_id, spec["add_to_limit"])
+        outcome.funded = True
+        stage = journal.record(key, FUNDED)["stage"]
+    if stage in (FUNDED, MOVING) and spec.get("move_to") is not None:
+        journal.record(key, MOVING)
+        api.move_task(outcome.task_id, spec["move_to"])
+        outcome.moved = True
+    journal.record(key, DONE)
+    return outcome
+
+
+async def provision_task_async(
+    api: Any, key: str, spec: Dict[str, Any], journal: ProvisionJournal
+) -> ProvisionOutcome:
+    """
+    Асинхронный вариант provision_task
+    """
+
+    async def tasks() -> List[Any]:
+        return [task async for task in api.iter_tasks(folder_id=spec["folder_id"])]
+
+    entry = journal.get(key)
+    outcome = ProvisionOutcome(key, entry.get("task_id"))
+    stage = entry["stage"]
+    if stage == DONE:
+        return outcome
+    if stage == REVIEW:
+        raise ReviewRequiredError(key, outcome.task_id)
+    if stage == PENDING:
+        claimed = journal.claim(key, _find_new_tasks(await tasks(), spec))
+        if claimed is not None:
+            outcome.task_id, stage = claimed["task_id"], claimed["stage"]
+    if stage in (None, PENDING):
+        journal.record(key, PENDING)
+        outcome.task_id = int((await api.add_task(**task_fields(spec)))["task_id"])
+        outcome.created = True
+        stage = journal.record(key, CREATED, task_id=outcome.task_id)["stage"]
+    if stage == FUNDING:
+        status = _task_status(await tasks(), outcome.task_id)
+        stage = _funding_status(journal, key, outcome.task_id, status)
+    if stage in (CREATED, FUNDING):
+        journal.record(key, FUNDING)
+        await api.task_limit_add(outcome.task_id, spec["add_to_limit"])
+        outcome.funded = True
+        stage = journal.record(key, FUNDED)["stage"]
+    if stage in (FUNDED, MOVING) and spec.get("move_to") is not None:
+        journal.record(key, MOVING)
+        await api.move_task(outcome.task_id, spec["move_to"])
+        outcome.moved = True
+    journal.record(key, DONE)
+    return outcome
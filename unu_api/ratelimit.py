@@ -0,0 +1,187 @@
+"""
+Ограничение частоты запросов и повторы при временных ошибках
+"""
+import random
+import threading
+import time
+from typing import Dict, Iterable
+
+from .exceptions import TransportError
+
+__all__ = [
+    "IDEMPOTENT_ACTIONS",
+    "MONEY_ACTIONS",
+    "TokenBucket",
+    "RateLimiter",
+    "RetryPolicy",
+]
+
+# Методы только для чтения: повтор не меняет состояние аккаунта
+IDEMPOTENT_ACTIONS = frozenset(
+    {
+        "get_balance",
+        "get_folders",
+        "get_tasks",
+        "get_reports",
+        "get_expenses",
+        "get_tariffs",
+        "get_minter_wallet",
+    }
+)
+
+# Методы, списывающие деньги: никогда не повторяются автоматически
+MONEY_ACTIONS = frozenset({"approve_report", "task_limit_add"})
+
+
+class TokenBucket:
+    """
+    Потокобезопасное ведро токенов: rate токенов в секунду, не более burst
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Забирает токен и возвращает, сколько секунд нужно подождать перед
+        запросом. Токен можно взять в долг: ожидающие выстраиваются в очередь.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self.rate = float(rate)
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов: общий и для отдельных action
+
+    Частота подстраивается под ответы API (AIMD): при ограничении со стороны
+    API, сетевых ошибках или задержке выше latency_target она уменьшается
+    в decrease раз, после каждого успешного запроса растёт на increase,
+    но не выше начальной.
+
+    Входные данные
+        rate (float) - запросов в секунду для всех action
+        burst (float) - сколько запросов можно выполнить разом
+        per_action (dict) - action -> запросов в секунду
+        min_rate (float) - нижняя граница при адаптации
+        latency_target (float) - задержка в секундах, выше которой \
+            частота снижается (необязательный параметр)
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: float = None,
+        per_action: Dict[str, float] = None,
+        min_rate: float = 0.5,
+        latency_target: float = None,
+        decrease: float = 0.5,
+        increase: float = 0.1,
+        cooldown: float = 1.0,
+    ):
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.increase = increase
+        self.cooldown = cooldown
+        self.bucket = TokenBucket(rate, burst)
+        self.actions = {
+            action: TokenBucket(action_rate)
+            for action, action_rate in (per_action or {}).items()
+        }
+        self._slowed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def reserve(self, action: str) -> float:
+        """
+        Возвращает задержку в секундах перед запросом action
+        """
+        delay = self.bucket.reserve()
+        bucket = self.actions.get(action)
+        if bucket is not None:
+            delay = max(delay, bucket.reserve())
+        return delay
+
+    def acquire(self, action: str) -> None:
+        """
+        Блокирует поток до разрешения на запрос action
+        """
+        delay = self.reserve(action)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, action: str, elapsed: float, error: Exception = None) -> None:
+        """
+        Подстраивает частоту по результату запроса
+        """
+        slow = self.latency_target is not None and elapsed > self.latency_target
+        with self._lock:
+            rate = self.bucket.rate
+            if isinstance(error, TransportError) or slow:
+                now = time.monotonic()
+                # одна пачка одновременных ошибок снижает частоту один раз
+                if now - self._slowed < self.cooldown:
+                    return
+                self._slowed = now
+                rate = max(self.min_rate, rate * self.decrease)
+            elif error is None:
+                rate = min(self.max_rate, rate + self.increase)
+            else:
+                return
+            self.bucket.set_rate(rate)
+
+
+class RetryPolicy:
+    """
+    Повторы запросов с экспоненциальной задержкой и случайным разбросом
+
+    Повторяются только сетевые ошибки и ограничение частоты (TransportError)
+    для action из actions. Методы из MONEY_ACTIONS не повторяются никогда:
+    при ошибке неизвестно, списались ли деньги.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        actions: Iterable[str] = IDEMPOTENT_ACTIONS,
+    ):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.actions = frozenset(actions) - MONEY_ACTIONS
+
+    def should_retry(self, action: str, error: Exception, attempt: int) -> bool:
+        """
+        attempt - номер неудачной попытки, начиная с 0
+        """
+        return (
+            attempt + 1 < self.attempts
+            and action in self.actions
+            and isinstance(error, TransportError)
+        )
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
@@ -0,0 +1,301 @@
+"""
+Предохранитель (circuit breaker) и дублирующие запросы на чтение
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures import wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from .exceptions import CircuitOpenError, JsonParsingError, TransportError
+from .hooks import CallInfo
+
+__all__ = ["CircuitBreaker", "HedgePolicy", "HEDGED_ACTIONS"]
+
+# Методы чтения, которые по умолчанию можно дублировать
+HEDGED_ACTIONS = frozenset({"get_balance", "get_tasks", "get_reports", "get_tariffs"})
+
+
+class Circuit:
+    """
+    Состояние предохранителя одного action
+    """
+
+    __slots__ = ("state", "failures", "opened_at", "probes")
+
+    def __init__(self):
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для каждого action
+
+    После failures ошибок подряд (сетевые ошибки, таймауты, HTML вместо
+    JSON, а также ответы дольше slow_call секунд) предохранитель
+    размыкается, и запросы этого action сразу завершаются
+    CircuitOpenError, не дожидаясь сокета. Через reset_timeout секунд
+    пропускается half_open_calls пробных запросов: успех замыкает
+    предохранитель, ошибка снова размыкает его.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failures: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        slow_call: float = None,
+        errors: Tuple[type, ...] = (TransportError, JsonParsingError),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.slow_call = slow_call
+        self.errors = errors
+        self.clock = clock
+        self.circuits: Dict[str, Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, action: str) -> Circuit:
+        circuit = self.circuits.get(action)
+        if circuit is None:
+            circuit = self.circuits[action] = Circuit()
+        return circuit
+
+    def allow(self, action: str) -> None:
+        """
+        Бросает CircuitOpenError, если запрос сейчас отправлять нельзя
+        """
+        with self._lock:
+            circuit = self._circuit(action)
+            if circuit.state == self.OPEN:
+                waited = self.clock() - circuit.opened_at
+                if waited < self.reset_timeout:
+                    raise CircuitOpenError(action, self.reset_timeout - waited)
+                circuit.state = self.HALF_OPEN
+                circuit.probes = 0
+            if circuit.state == self.HALF_OPEN:
+                if circuit.probes >= self.half_open_calls:
+                    raise CircuitOpenError(action, 0.0)
+                circuit.probes += 1
+
+    def release(self, action: str) -> None:
+        """
+        Возвращает пробный запрос, завершившийся без результата (отмена
+        или ошибка вне API): следующий запрос снова может стать пробным
+        """
+        with self._lock:
+            circuit = self._circuit(action)
+            if circuit.state == self.HALF_OPEN and circuit.probes > 0:
+                circuit.probes -= 1
+
+    def record(self, action: str, error: Exception = None, elapsed: float = 0.0):
+        """
+        Учитывает результат запроса
+        """
+        failed = isinstance(error, self.errors) or (
+            error is None and self.slow_call is not None and elapsed > self.slow_call
+        )
+        with self._lock:
+            circuit = self._circuit(action)
+            if not failed:
+                circuit.state = self.CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if circuit.state == self.HALF_OPEN or circuit.failures >= self.failures:
+                circuit.state = self.OPEN
+                circuit.opened_at = self.clock()
+
+    def state(self, action: str) -> str:
+        with self._lock:
+            return self._circuit(action).state
+
+    def stats(self) -> Dict[str, str]:
+        with self._lock:
+            return {action: circuit.state for action, circuit in self.circuits.items()}
+
+
+class HedgePolicy:
+    """
+    Дублирующие запросы на чтение
+
+    Если ответ на запрос из actions не пришёл за время, которое обычно
+    укладывается в quantile (p95) последних window ответов этого action,
+    отправляется второй такой же запрос, и используется тот ответ, который
+    придёт первым. Пока ответов меньше min_samples, запросы не дублируются.
+    """
+
+    def __init__(
+        self,
+        actions: Iterable[str] = HEDGED_ACTIONS,
+        quantile: float = 0.95,
+        min_delay: float = 0.01,
+        max_delay: float = 5.0,
+        window: int = 200,
+        min_samples: int = 20,
+        workers: int = 32,
+    ):
+        self.actions = frozenset(actions)
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.workers = workers
+        self.fired = 0
+        self.wins = 0
+        self.latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def record(self, action: str, elapsed: float) -> None:
+        with self._lock:
+            samples = self.latencies.get(action)
+            if samples is None:
+                samples = self.latencies[action] = deque(maxlen=self.window)
+            samples.append(elapsed)
+
+    def delay(self, action: str) -> Optional[float]:
+        """
+        Через сколько секунд дублировать запрос или None, если не нужно
+        """
+        if action not in self.actions:
+            return None
+        with self._lock:
+            samples = sorted(self.latencies.get(action) or ())
+        if len(samples) < self.min_samples:
+            return None
+        value = samples[min(len(samples) - 1, int(len(samples) * self.quantile))]
+        return min(self.max_delay, max(self.min_delay, value))
+
+    def stats(self) -> Dict[str, int]:
+        return {"fired": self.fired, "wins": self.wins}
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="unu-hedge"
+                )
+            return self._pool
+
+    @staticmethod
+    def _result(outcome: Tuple[Any, CallInfo], info: CallInfo) -> Any:
+        response, attempt_info = outcome
+        if info is not None:
+            info.status = attempt_info.status
+            info.request_bytes = attempt_info.request_bytes
+            info.response_bytes = attempt_info.response_bytes
+        return response
+
+    def run(
+        self,
+        action: str,
+        call: Callable[[CallInfo], Any],
+        info: CallInfo = None,
+    ) -> Any:
+        """
+        Выполняет call(info) с дублированием по задержке delay(action)
+
+        Задержка отсчитывается с момента, когда первый запрос начал
+        выполняться. Если все workers потоков заняты и первый запрос
+        не начался за delay, он выполняется в вызывающем потоке без дубля.
+        """
+        delay = self.delay(action)
+
+        def attempt(running: threading.Event = None) -> Tuple[Any, CallInfo]:
+            if running is not None:
+                running.set()
+            attempt_info = CallInfo(0.0) if info is not None else None
+            started = time.perf_counter()
+            response = call(attempt_info)
+            self.record(action, time.perf_counter() - started)
+            return response, attempt_info
+
+        if delay is None:
+            return self._result(attempt(), info)
+        pool = self._executor()
+        running = threading.Event()
+        first = pool.submit(attempt, running)
+        if not running.wait(timeout=delay) and first.cancel():
+            return self._result(attempt(), info)
+        try:
+            return self._result(first.result(timeout=delay), info)
+        except FutureTimeout:
+            pass
+        with self._lock:
+            self.fired += 1
+        second = pool.submit(attempt)
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is second:
+                            with self._lock:
+                                self.wins += 1
+                        return self._result(future.result(), info)
+                    error = error or future.exception()
+        finally:
+            for future in pending:
+                future.cancel()
+        raise error
+
+    async def run_async(
+        self,
+        action: str,
+        call: Callable[[CallInfo], Awaitable[Any]],
+        info: CallInfo = None,
+    ) -> Any:
+        """
+        Асинхронный вариант run: проигравший запрос отменяется
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        delay = self.delay(action)
+
+        async def attempt() -> Tuple[Any, CallInfo]:
+            attempt_info = CallInfo(0.0) if info is not None else None
+            started = time.perf_counter()
+            response = await call(attempt_info)
+            self.record(action, time.perf_counter() - started)
+            return response, attempt_info
+
+        if delay is None:
+            return self._result(await attempt(), info)
+        first = asyncio.ensure_future(attempt())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return self._result(first.result(), info)
+        self.fired += 1
+        second = asyncio.ensure_future(attempt())
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.wins += 1
+                        return self._result(task.result(), info)
+                    error = error or task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
@@ -0,0 +1,82 @@
+"""
+Объединение одновременных одинаковых запросов
+"""
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable
+
+if TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+
+__all__ = ["SingleFlight"]
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Пока запрос с ключом key выполняется, остальные вызовы с тем же ключом
+    не идут в сеть, а дожидаются его результата (или исключения)
+
+    Работает и с потоками (do), и с корутинами (do_async). Счётчики calls
+    и coalesced показывают, сколько запросов выполнено и сколько объединено.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._threads: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._threads.get(key)
+            leader = call is None
+            if leader:
+                call = self._threads[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._threads[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        future = self._tasks.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: отмена одного ожидающего не отменяет общий запрос
+            return await asyncio.shield(future)
+        self.calls += 1
+        future = self._tasks[key] = asyncio.ensure_future(func())
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._tasks.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced}
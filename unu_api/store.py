@@ -0,0 +1,317 @@
+"""
+Локальное зеркало папок, задач и отчётов в SQLite
+"""
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+__all__ = ["LocalStore", "RefreshStats"]
+
+# Таблица -> столбцы (первый - первичный ключ)
+COLUMNS = {
+    "folders": ("id", "name"),
+    "tasks": ("id", "name", "price_unu", "price_rub", "status", "folder_id"),
+    "reports": (
+        "id",
+        "task_id",
+        "worker_id",
+        "price_unu",
+        "price_rub",
+        "status",
+        "folder_id",
+    ),
+}
+
+INDEXES = {
+    "tasks": ("status", "folder_id"),
+    "reports": ("status", "task_id", "worker_id", "folder_id"),
+}
+
+TYPES = {"name": "TEXT", "price_unu": "REAL", "price_rub": "REAL"}
+
+# Таблица -> столбец, которым ограничивается частичное обновление
+SCOPES = {"tasks": "folder_id", "reports": "task_id"}
+
+
+class RefreshStats:
+    """
+    Результат обновления одной таблицы
+    """
+
+    __slots__ = ("table", "inserted", "updated", "deleted", "unchanged")
+
+    def __init__(self, table: str):
+        self.table = table
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+
+    def __repr__(self) -> str:
+        return "<RefreshStats %s +%d ~%d -%d =%d>" % (
+            self.table,
+            self.inserted,
+            self.updated,
+            self.deleted,
+            self.unchanged,
+        )
+
+
+def _value(column: str, value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    if TYPES.get(column) == "TEXT":
+        return str(value)
+    if TYPES.get(column) == "REAL":
+        return float(value)
+    return int(value)
+
+
+def _row(table: str, item: Any) -> Tuple[Any, ...]:
+    if not isinstance(item, dict):
+        item = item.to_dict()
+    return tuple(_value(column, item.get(column)) for column in COLUMNS[table])
+
+
+class LocalStore:
+    """
+    Зеркало get_folders, get_tasks и get_reports в SQLite с индексами
+    по status, task_id, worker_id и folder_id
+
+    Обновление инкрементальное: ответ API читается потоково, в базу
+    записываются только новые, изменившиеся и пропавшие строки.
+    Запросы (tasks, reports, count) выполняются по локальной базе без сети.
+
+    Входные данные
+        path (str) - путь к файлу базы, по умолчанию база в памяти
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._create()
+
+    def _create(self) -> None:
+        with self._lock, self._conn:
+            for table, columns in COLUMNS.items():
+                fields = ", ".join(
+                    "%s %s" % (column, TYPES.get(column, "INTEGER"))
+                    for column in columns[1:]
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS %s (id INTEGER PRIMARY KEY, %s)"
+                    % (table, fields)
+                )
+                for column in INDEXES.get(table, ()):
+                    self._conn.execute(
+                        "CREATE INDEX IF NOT EXISTS %s_%s ON %s (%s)"
+                        % (table, column, table, column)
+                    )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS refreshes "
+                "(name TEXT PRIMARY KEY, refreshed_at REAL)"
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "LocalStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _merge(
+        self,
+        table: str,
+        items: Iterable[Any],
+        scope: Optional[int] = None,
+    ) -> RefreshStats:
+        """
+        Сравнивает строки из API с базой и записывает только отличия
+        """
+        columns = COLUMNS[table]
+        where, params = "", ()
+        if scope is not None:
+            where, params = " WHERE %s = ?" % SCOPES[table], (scope,)
+        stats = RefreshStats(table)
+        inserts: List[Tuple[Any, ...]] = []
+        updates: List[Tuple[Any, ...]] = []
+        with self._lock:
+            existing = {
+                row[0]: tuple(row)
+                for row in self._conn.execute(
+                    "SELECT %s FROM %s%s" % (", ".join(columns), table, where), params
+                )
+            }
+        for item in items:
+            row = _row(table, item)
+            old = existing.pop(row[0], None)
+            if old is None:
+                inserts.append(row)
+            elif old != row:
+                updates.append(row[1:] + row[:1])
+            else:
+                stats.unchanged += 1
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO %s (%s) VALUES (%s)"
+                % (table, ", ".join(columns), ", ".join("?" * len(columns))),
+                inserts,
+            )
+            self._conn.executemany(
+                "UPDATE %s SET %s WHERE id = ?"
+                % (table, ", ".join("%s = ?" % column for column in columns[1:])),
+                updates,
+            )
+            self._conn.executemany(
+                "DELETE FROM %s WHERE id = ?" % table, ((key,) for key in existing)
+            )
+            name = table if scope is None else "%s:%s" % (table, scope)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refreshes VALUES (?, ?)", (name, time.time())
+            )
+        stats.inserted = len(inserts)
+        stats.updated = len(updates)
+        stats.deleted = len(existing)
+        return stats
+
+    def refresh(
+        self,
+        api: Any,
+        tables: Sequence[str] = ("folders", "tasks", "reports"),
+        folder_id: int = None,
+        task_id: int = None,
+    ) -> Dict[str, RefreshStats]:
+        """
+        Обновляет таблицы из API
+
+        Входные данные
+            api (Api) - клиент
+            tables (list) - какие таблицы обновить
+            folder_id (int) - обновить только задачи этой папки
+            task_id (int) - обновить только отчёты этой задачи
+        Выходные данные
+            словарь таблица -> RefreshStats
+        """
+        result = {}
+        for table in tables:
+            if table == "folders":
+                response = api.get_folders()
+                if isinstance(response, dict):
+                    response = _values(response["folders"])
+                result[table] = self._merge(table, response)
+            elif table == "tasks":
+                items = api.iter_tasks(folder_id=folder_id)
+                result[table] = self._merge(table, items, folder_id)
+            elif table == "reports":
+                items = api.iter_reports(task_id=task_id)
+                result[table] = self._merge(table, items, task_id)
+            else:
+                raise ValueError("Неизвестная таблица %r" % table)
+        return result
+
+    def refreshed_at(self, table: str) -> Optional[float]:
+        """
+        Время последнего полного обновления таблицы (unix time) или None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT refreshed_at FROM refreshes WHERE name = ?", (table,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def refresh_stale(
+        self, api: Any, max_age: float, tables: Sequence[str] = tuple(COLUMNS)
+    ) -> Dict[str, RefreshStats]:
+        """
+        Обновляет таблицы, обновлявшиеся более max_age секунд назад
+        """
+        now = time.time()
+        stale = [
+            table
+            for table in tables
+            if (self.refreshed_at(table) or 0.0) + max_age <= now
+        ]
+        return self.refresh(api, stale) if stale else {}
+
+    def _where(self, table: str, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column not in COLUMNS[table]:
+                raise ValueError("Неизвестный столбец %r" % column)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                clauses.append("%s IN (%s)" % (column, ", ".join("?" * len(value))))
+                params.extend(value)
+            else:
+                clauses.append("%s = ?" % column)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def select(self, table: str, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Строки таблицы, отфильтрованные по равенству столбцов \
+            (значение-список означает IN)
+        """
+        where, params = self._where(table, filters)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM %s%s ORDER BY id" % (table, where), params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def folders(self) -> List[Dict[str, Any]]:
+        return self.select("folders")
+
+    def tasks(self, status: Any = None, folder_id: Any = None) -> List[Dict[str, Any]]:
+        return self.select("tasks", status=status, folder_id=folder_id)
+
+    def reports(
+        self,
+        status: Any = None,
+        task_id: Any = None,
+        worker_id: Any = None,
+        folder_id: Any = None,
+    ) -> List[Dict[str, Any]]:
+        return self.select(
+            "reports",
+            status=status,
+            task_id=task_id,
+            worker_id=worker_id,
+            folder_id=folder_id,
+        )
+
+    def count(self, table: str, by: str, **filters: Any) -> Dict[Any, int]:
+        """
+        Число строк по значениям столбца by, например \
+            count("reports", "folder_id", status=2) - отчёты на проверке по папкам
+        """
+        if by not in COLUMNS[table]:
+            raise ValueError("Неизвестный столбец %r" % by)
+        where, params = self._where(table, filters)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT %s, COUNT(*) FROM %s%s GROUP BY %s" % (by, table, where, by),
+                params,
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """
+        Произвольный SQL-запрос к зеркалу
+        """
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+
+def _values(items: Any) -> Iterable[Any]:
+    """
+    PHP иногда отдаёт массив объектом {"id": {...}}
+    """
+    return items.values() if isinstance(items, dict) else items
@@ -0,0 +1,145 @@
+"""
+Потоковый разбор ответов API
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List
+
+from .exceptions import JsonParsingError, RequestError
+
+__all__ = ["StreamParser", "iter_json_array"]
+
+_SPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+# Состояния разбора объекта верхнего уровня
+_START, _KEY, _COLON, _VALUE, _ARRAY, _DONE = range(6)
+
+
+class StreamParser:
+    """
+    Инкрементальный разбор ответа вида {"success": "true", "<key>": [...]}
+
+    Элементы массива key возвращаются по одному по мере поступления байтов,
+    поэтому в памяти одновременно находится только один элемент. Остальные
+    поля ответа верхнего уровня сохраняются в атрибуте head.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.head: Dict[str, Any] = {}
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = _START
+        self._current = None
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Принимает очередную порцию байтов и возвращает готовые элементы
+        """
+        self._buffer += self._decoder.decode(chunk)
+        return self._parse(eof=False)
+
+    def close(self) -> List[Any]:
+        """
+        Завершает разбор и возвращает оставшиеся элементы
+        """
+        self._buffer += self._decoder.decode(b"", final=True)
+        items = self._parse(eof=True)
+        if self._state != _DONE or self._buffer.strip():
+            raise JsonParsingError
+        if self.head.get("success") != "true":
+            raise RequestError
+        return items
+
+    def _decode(self, pos: int, eof: bool):
+        """
+        Декодирует значение с позиции pos, возвращает (значение, конец)
+        или None, если данных пока недостаточно
+        """
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, pos)
+        except ValueError:
+            if eof:
+                raise JsonParsingError
+            return None
+        # Число в конце буфера может оказаться началом более длинного числа
+        if end == len(self._buffer) and not eof:
+            return None
+        return value, end
+
+    def _parse(self, eof: bool) -> List[Any]:
+        items: List[Any] = []
+        buffer = self._buffer
+        pos = 0
+        while self._state != _DONE:
+            pos = _SPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if self._state == _START:
+                if char != "{":
+                    raise JsonParsingError
+                self._state = _KEY
+                pos += 1
+            elif self._state == _KEY:
+                if char == ",":
+                    pos += 1
+                    continue
+                if char == "}":
+                    self._state = _DONE
+                    pos += 1
+                    continue
+                decoded = self._decode(pos, eof)
+                if decoded is None:
+                    break
+                self._current, pos = decoded
+                self._state = _COLON
+            elif self._state == _COLON:
+                if char != ":":
+                    raise JsonParsingError
+                self._state = _VALUE
+                pos += 1
+            elif self._state == _VALUE:
+                if self._current == self.key and char == "[":
+                    self._state = _ARRAY
+                    pos += 1
+                    continue
+                decoded = self._decode(pos, eof)
+                if decoded is None:
+                    break
+                value, pos = decoded
+                if self._current == self.key:
+                    # пустой массив PHP может отдать как объект
+                    items.extend(value.values() if isinstance(value, dict) else value)
+                else:
+                    self.head[self._current] = value
+                    if self._current == "success" and value != "true":
+                        raise RequestError
+                self._state = _KEY
+            elif self._state == _ARRAY:
+                if char == ",":
+                    pos += 1
+                    continue
+                if char == "]":
+                    self._state = _KEY
+                    pos += 1
+                    continue
+                decoded = self._decode(pos, eof)
+                if decoded is None:
+                    break
+                item, pos = decoded
+                items.append(item)
+        self._buffer = buffer[pos:]
+        return items
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Последовательно возвращает элементы массива key из потока байтов
+    """
+    parser = StreamParser(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
@@ -0,0 +1,404 @@
+"""
+Локальный сервер-заглушка, имитирующий API unu.im
+
+Используется для тестов и бенчмарков без обращения к настоящему API:
+
+    with StubServer(reports=10000, latency=0.01) as server:
+        api = Api(url=server.url, token="test")
+"""
+import gzip
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+__all__ = ["StubServer"]
+
+_CHUNK = 65536
+
+# Ответы короче этого размера не сжимаются
+_GZIP_MIN = 1024
+
+
+class StubState:
+    """
+    Состояние аккаунта: папки, задачи, отчёты и баланс
+    """
+
+    def __init__(
+        self, tasks: int, reports: int, balance: float, seed: int, rate: float = 1.0
+    ):
+        rnd = random.Random(seed)
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.version = 0
+        self.balance = balance
+        self.blocked_money = 0.0
+        self.expenses = 0.0
+        self.folders: Dict[int, Dict[str, Any]] = {
+            index: {"id": index, "name": "Папка %d" % index} for index in range(1, 21)
+        }
+        self.tariffs = [
+            {
+                "id": index,
+                "name": "Тариф %d" % index,
+                "min_price_rub": round(0.5 + index * 0.25, 2),
+                "group_id": 1 + index // 5,
+            }
+            for index in range(1, 31)
+        ]
+        self.tasks: Dict[int, Dict[str, Any]] = {}
+        for index in range(1, tasks + 1):
+            price = round(rnd.uniform(1.0, 30.0), 2)
+            self.tasks[index] = {
+                "id": index,
+                "name": "Задача %d" % index,
+                "price_unu": round(price * rate, 2),
+                "price_rub": price,
+                "status": rnd.choice((2, 3, 4, 4, 4)),
+                "folder_id": rnd.randint(1, len(self.folders)),
+            }
+        self.reports: Dict[int, Dict[str, Any]] = {}
+        task_ids = list(self.tasks) or [0]
+        for index in range(1, reports + 1):
+            task = self.tasks.get(rnd.choice(task_ids), {})
+            self.reports[index] = {
+                "id": index,
+                "task_id": task.get("id", 0),
+                "worker_id": rnd.randint(1, 50000),
+                "price_unu": task.get("price_unu", 1.0),
+                "price_rub": task.get("price_rub", 1.0),
+                "status": rnd.choice((1, 2, 2, 2, 3, 6)),
+                "folder_id": task.get("folder_id", 0),
+            }
+        self._bodies: Dict[Any, bytes] = {}
+        self._gzipped: Dict[bytes, bytes] = {}
+
+    def changed(self) -> None:
+        self.version += 1
+        self._bodies.clear()
+        self._gzipped.clear()
+
+    def gzipped(self, body: bytes) -> bytes:
+        """
+        Сжатое тело ответа; сжатие больших списков тоже выполняется один раз
+        """
+        with self.lock:
+            packed = self._gzipped.get(body)
+        if packed is None:
+            packed = gzip.compress(body, compresslevel=5)
+            with self.lock:
+                if len(self._gzipped) > 64:
+                    self._gzipped.clear()
+                self._gzipped[body] = packed
+        return packed
+
+    def cached_body(self, key: Any, build) -> bytes:
+        """
+        Большие списки сериализуются один раз до следующего изменения
+        """
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._bodies[key] = json.dumps(build()).encode()
+        return body
+
+
+def _int(form: Dict[str, str], name: str) -> Optional[int]:
+    value = form.get(name)
+    return int(value) if value not in (None, "") else None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов: по одному методу на каждый action API
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StubServer"
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers.get("Content-Length", 0))
+        form = {
+            key: values[-1]
+            for key, values in parse_qs(
+                self.rfile.read(length).decode(), keep_blank_values=True
+            ).items()
+        }
+        server = self.server
+        server.count(form.get("action", ""))
+        delay = server.latency + server.rnd.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if server.rnd.random() < server.throttle_rate:
+            self._send_json({"success": "false", "errors": "Too many requests"}, 429)
+            return
+        if server.rnd.random() < server.fault_rate:
+            self._send(500, b"<b>Fatal error</b>: Uncaught exception", "text/html")
+            return
+        if server.rnd.random() < server.error_rate:
+            self._send_json({"success": "false", "errors": "Injected error"})
+            return
+        if not form.get("api_key"):
+            self._send_json({"success": "false", "errors": "Неверный api_key"})
+            return
+        handler = getattr(self, "action_" + form.get("action", ""), None)
+        if handler is None:
+            self._send_json({"success": "false", "errors": "Неизвестный action"})
+            return
+        with server.state.lock:
+            result = handler(server.state, form)
+        if isinstance(result, bytes):
+            self._send(200, result)
+        elif "errors" in result:
+            self._send_json(dict(result, success="false"))
+        else:
+            self._send_json(dict(result, success="true"))
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        self._send(status, json.dumps(payload).encode())
+
+    def _send(self, status: int, body: bytes, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        accept = self.headers.get("Accept-Encoding", "")
+        if self.server.compress and len(body) >= _GZIP_MIN and "gzip" in accept:
+            body = self.server.state.gzipped(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        for pos in range(0, len(body), _CHUNK):
+            self.wfile.write(body[pos : pos + _CHUNK])
+
+    def log_message(self, *args):
+        pass
+
+    # Методы API
+
+    def action_get_balance(self, state: StubState, form):
+        return {"balance": state.balance, "blocked_money": state.blocked_money}
+
+    def action_get_folders(self, state: StubState, form):
+        return {"folders": list(state.folders.values())}
+
+    def action_create_folder(self, state: StubState, form):
+        folder_id = max(state.folders, default=0) + 1
+        state.folders[folder_id] = {"id": folder_id, "name": form.get("name", "")}
+        state.changed()
+        return {"folder_id": folder_id}
+
+    def action_move_task(self, state: StubState, form):
+        task = state.tasks.get(_int(form, "task_id"))
+        folder_id = _int(form, "folder_id")
+        if task is None or (folder_id and folder_id not in state.folders):
+            return {"errors": "Задача или папка не найдена"}
+        task["folder_id"] = folder_id
+        state.changed()
+        return {}
+
+    def action_get_tasks(self, state: StubState, form):
+        folder_id = _int(form, "folder_id")
+
+        def build():
+            tasks = [
+                task
+                for task in state.tasks.values()
+                if folder_id is None or task["folder_id"] == folder_id
+            ]
+            return {"success": "true", "tasks": tasks}
+
+        return state.cached_body(("get_tasks", folder_id), build)
+
+    def action_get_reports(self, state: StubState, form):
+        task_id = _int(form, "task_id")
+
+        def build():
+            reports = [
+                report
+                for report in state.reports.values()
+                if task_id is None or report["task_id"] == task_id
+            ]
+            return {"success": "true", "reports": reports}
+
+        return state.cached_body(("get_reports", task_id), build)
+
+    def action_approve_report(self, state: StubState, form):
+        report = state.reports.get(_int(form, "report_id"))
+        if report is None or report["status"] != 2:
+            return {"errors": "Отчёт не найден или не на проверке"}
+        report["status"] = 6
+        state.blocked_money = max(0.0, state.blocked_money - report["price_unu"])
+        state.expenses += report["price_unu"]
+        state.changed()
+        return {}
+
+    def action_reject_report(self, state: StubState, form):
+        report_id = _int(form, "report_id")
+        report = state.reports.get(report_id)
+        reject_type = _int(form, "reject_type")
+        if report is None or report["status"] != 2 or reject_type not in (1, 2):
+            return {"errors": "Отчёт не найден или неверный reject_type"}
+        if reject_type == 1:
+            report["status"] = 3
+        else:
+            del state.reports[report_id]
+        state.changed()
+        return {}
+
+    def action_get_expenses(self, state: StubState, form):
+        return {"expenses": state.expenses, "expenses_in_rub": state.expenses}
+
+    def _task_fields(self, state: StubState, form, task: Dict[str, Any]):
+        try:
+            price = float(form["price"])
+            tarif_id = int(form["tarif_id"])
+            folder_id = int(form["folder_id"])
+        except (KeyError, ValueError):
+            return {"errors": "Не заданы обязательные параметры"}
+        tariff = next((t for t in state.tariffs if t["id"] == tarif_id), None)
+        if tariff is None or price < tariff["min_price_rub"]:
+            return {"errors": "Цена ниже минимальной для тарифа"}
+        task.update(
+            name=form.get("name", ""),
+            price_unu=round(price * state.rate, 2),
+            price_rub=price,
+            folder_id=folder_id,
+        )
+        return None
+
+    def action_add_task(self, state: StubState, form):
+        task_id = max(state.tasks, default=0) + 1
+        task = {"id": task_id, "status": 1}
+        error = self._task_fields(state, form, task)
+        if error:
+            return error
+        state.tasks[task_id] = task
+        state.changed()
+        return {"task_id": task_id}
+
+    def action_edit_task(self, state: StubState, form):
+        task = state.tasks.get(_int(form, "task_id"))
+        if task is None:
+            return {"errors": "Задача не найдена"}
+        error = self._task_fields(state, form, dict(task))
+        if error:
+            return error
+        self._task_fields(state, form, task)
+        state.changed()
+        return {}
+
+    def action_task_limit_add(self, state: StubState, form):
+        task = state.tasks.get(_int(form, "task_id"))
+        add_to_limit = _int(form, "add_to_limit") or 0
+        if task is None or add_to_limit <= 0:
+            return {"errors": "Задача не найдена или неверный лимит"}
+        cost = task["price_unu"] * add_to_limit
+        if cost > state.balance:
+            return {"errors": "Недостаточно средств"}
+        state.balance -= cost
+        state.blocked_money += cost
+        task["status"] = 4
+        state.changed()
+        return {}
+
+    def action_get_tariffs(self, state: StubState, form):
+        return {"tariffs": state.tariffs}
+
+    def _set_status(self, state: StubState, form, status: int):
+        task = state.tasks.get(_int(form, "task_id"))
+        if task is None:
+            return {"errors": "Задача не найдена"}
+        task["status"] = status
+        state.changed()
+        return {}
+
+    def action_task_pause(self, state: StubState, form):
+        return self._set_status(state, form, 3)
+
+    def action_task_play(self, state: StubState, form):
+        return self._set_status(state, form, 4)
+
+    def action_get_minter_wallet(self, state: StubState, form):
+        email = (form.get("email") or "").encode()
+        return {"wallet": "Mx%040x" % zlib.crc32(email)}
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Сервер-заглушка API в фоновом потоке, адрес доступен в атрибуте url
+
+    Входные данные
+        tasks, reports (int) - размер сгенерированного аккаунта
+        balance (float) - начальный баланс в UNU
+        rate (float) - сколько UNU стоит рубль цены задачи
+        latency (float) - задержка каждого ответа в секундах
+        jitter (float) - случайная добавка к задержке, от 0 до jitter
+        error_rate (float) - доля ответов {"success": "false"}
+        fault_rate (float) - доля ответов 500 с HTML вместо JSON
+        throttle_rate (float) - доля ответов 429 (ограничение частоты)
+        compress (bool) - сжимать ответы от 1 КБ, если клиент принимает gzip
+        seed (int) - зерно генератора для воспроизводимости
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        tasks: int = 100,
+        reports: int = 1000,
+        balance: float = 100000.0,
+        rate: float = 1.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        fault_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        compress: bool = True,
+        seed: int = 0,
+    ):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.state = StubState(
+            tasks=tasks, reports=reports, balance=balance, seed=seed, rate=rate
+        )
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fault_rate = fault_rate
+        self.throttle_rate = throttle_rate
+        self.compress = compress
+        self.rnd = random.Random(seed)
+        self.requests: Dict[str, int] = {}
+        self.url = "http://127.0.0.1:%d/api" % self.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, action: str) -> None:
+        with self.state.lock:
+            self.requests[action] = self.requests.get(action, 0) + 1
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def actions(self) -> List[str]:
+        return sorted(
+            name[len("action_") :]
+            for name in dir(StubHandler)
+            if name.startswith("action_")
+        )
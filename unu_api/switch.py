@@ -0,0 +1,147 @@
+"""
+Массовая остановка и запуск задач со сверкой по одному чтению
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .bulk import BulkResult
+from .exceptions import RequestError
+from .sync import _field
+
+__all__ = ["SwitchResult"]
+
+# Статус задачи после действия и статусы, из которых его имеет смысл выполнять.
+# Задача на модерации (6) после проверки запускается сама, поэтому
+# остановка отправляется и ей.
+SWITCHES = {
+    "task_pause": (3, (4, 6)),
+    "task_play": (4, (3,)),
+}
+
+
+class SwitchResult(BulkResult):
+    """
+    Итог массовой остановки или запуска
+
+    results - итоговый статус каждой выбранной задачи, errors - задачи,
+    статус которых не удалось изменить. changed - задачи, изменённые в этом
+    вызове, skipped - задачи, которые уже были в нужном статусе или
+    находятся в статусе, из которого действие не выполняется.
+    """
+
+    def __init__(self, total: int = 0):
+        super().__init__(total)
+        self.changed: List[int] = []
+        self.skipped: List[int] = []
+
+    def __repr__(self) -> str:
+        return "<SwitchResult changed=%d skipped=%d failed=%d total=%d>" % (
+            len(self.changed),
+            len(self.skipped),
+            len(self.errors),
+            self.total,
+        )
+
+
+def plan(
+    tasks: Iterable[Any],
+    action: str,
+    statuses: Optional[Iterable[int]] = None,
+    task_ids: Optional[Iterable[int]] = None,
+) -> Tuple[SwitchResult, List[int]]:
+    """
+    Отбирает задачи по фильтрам: (результат с пропущенными задачами,
+    идентификаторы задач, которым нужно отправить action)
+    """
+    target, sources = SWITCHES[action]
+    statuses = None if statuses is None else {int(status) for status in statuses}
+    wanted = None if task_ids is None else {int(task_id) for task_id in task_ids}
+    result = SwitchResult()
+    pending = []
+    for task in tasks:
+        task_id, status = int(_field(task, "id")), int(_field(task, "status"))
+        if wanted is not None:
+            if task_id not in wanted:
+                continue
+            wanted.discard(task_id)
+        if statuses is not None and status not in statuses:
+            continue
+        if status in sources:
+            pending.append(task_id)
+        else:
+            result.results[task_id] = status
+            result.skipped.append(task_id)
+    # задачи из task_ids, которых нет в аккаунте
+    for task_id in wanted or ():
+        result.errors[task_id] = RequestError()
+    result.total = len(result.results) + len(result.errors) + len(pending)
+    return result, pending
+
+
+def reconcile(
+    result: SwitchResult, sent: BulkResult, tasks: Iterable[Any], action: str
+) -> SwitchResult:
+    """
+    Сверяет отправленные изменения с повторно прочитанными статусами
+
+    Задача, дошедшая до нужного статуса, считается изменённой, даже если
+    запрос завершился ошибкой (например, ответ потерялся по таймауту).
+    """
+    target = SWITCHES[action][0]
+    statuses: Dict[int, int] = {}
+    for task in tasks:
+        statuses[int(_field(task, "id"))] = int(_field(task, "status"))
+    for task_id in list(sent.results) + list(sent.errors):
+        status = statuses.get(task_id)
+        if status == target:
+            result.results[task_id] = status
+            result.changed.append(task_id)
+        else:
+            result.errors[task_id] = sent.errors.get(task_id) or RequestError()
+    return result
+
+
+def switch_tasks(
+    api: Any,
+    action: str,
+    folder_id: int = None,
+    statuses: Iterable[int] = None,
+    task_ids: Iterable[int] = None,
+    workers: int = 16,
+    progress: Callable[[int, int], Any] = None,
+) -> SwitchResult:
+    """
+    Одно чтение задач, параллельные action по задачам, которым нужно
+    изменение, и одно чтение для сверки
+    """
+    result, pending = plan(
+        api.iter_tasks(folder_id=folder_id), action, statuses, task_ids
+    )
+    if not pending:
+        return result
+    calls = ((task_id, (task_id,)) for task_id in pending)
+    sent = api.bulk(getattr(api, action), calls, workers, progress)
+    return reconcile(result, sent, api.iter_tasks(folder_id=folder_id), action)
+
+
+async def switch_tasks_async(
+    api: Any,
+    action: str,
+    folder_id: int = None,
+    statuses: Iterable[int] = None,
+    task_ids: Iterable[int] = None,
+    workers: int = 16,
+    progress: Callable[[int, int], Any] = None,
+) -> SwitchResult:
+    """
+    Асинхронный вариант switch_tasks
+    """
+
+    async def tasks() -> List[Any]:
+        return [task async for task in api.iter_tasks(folder_id=folder_id)]
+
+    result, pending = plan(await tasks(), action, statuses, task_ids)
+    if not pending:
+        return result
+    calls = ((task_id, (task_id,)) for task_id in pending)
+    sent = await api.bulk(getattr(api, action), calls, workers, progress)
+    return reconcile(result, sent, await tasks(), action)
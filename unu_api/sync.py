@@ -0,0 +1,179 @@
+"""
+Инкрементальная синхронизация отчётов
+"""
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .exceptions import ApiError
+
+__all__ = ["ReportEvent", "ReportSync"]
+
+logger = logging.getLogger(__name__)
+
+
+def _field(record: Any, name: str) -> Any:
+    """
+    Поле отчёта: словарь из JSON или модель Report
+    """
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name)
+
+
+class ReportEvent:
+    """
+    Изменение отчёта между двумя опросами
+
+    kind - NEW (новый отчёт), STATUS (сменился статус) или REMOVED
+    (отчёт пропал из ответа API). Для REMOVED report равен None.
+    """
+
+    NEW = "new"
+    STATUS = "status"
+    REMOVED = "removed"
+
+    __slots__ = ("kind", "report_id", "report", "status", "old_status")
+
+    def __init__(
+        self,
+        kind: str,
+        report_id: int,
+        report: Any = None,
+        status: Optional[int] = None,
+        old_status: Optional[int] = None,
+    ):
+        self.kind = kind
+        self.report_id = report_id
+        self.report = report
+        self.status = status
+        self.old_status = old_status
+
+    def __repr__(self) -> str:
+        return "<ReportEvent %s id=%s %s->%s>" % (
+            self.kind,
+            self.report_id,
+            self.old_status,
+            self.status,
+        )
+
+
+class ReportSync:
+    """
+    Опрашивает get_reports и возвращает только новые отчёты и смены статуса
+
+    Между опросами хранится лишь словарь id -> статус, ответ читается
+    потоково (iter_reports). Интервал опроса адаптивный: при изменениях
+    уменьшается вдвое (не ниже min_interval), без изменений растёт
+    в backoff раз (не выше max_interval).
+
+    Входные данные
+        api (Api) - клиент
+        task_id (int) - опрашивать отчёты одной задачи (необязательный параметр)
+        statuses (list) - сообщать только о переходах в эти статусы, \
+            например [2] - "на проверке" (необязательный параметр)
+        emit_initial (bool) - считать новыми отчёты первого опроса
+        on_event (callable) - функция, вызываемая для каждого события
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        task_id: int = None,
+        statuses: Iterable[int] = None,
+        interval: float = 60.0,
+        min_interval: float = 5.0,
+        max_interval: float = 300.0,
+        backoff: float = 1.5,
+        emit_initial: bool = True,
+        on_event: Callable[[ReportEvent], Any] = None,
+    ):
+        self.api = api
+        self.task_id = task_id
+        self.statuses = frozenset(statuses) if statuses is not None else None
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.emit_initial = emit_initial
+        self.on_event = on_event
+        self.snapshot: Dict[int, int] = {}
+        self.polls = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _wanted(self, status: Optional[int]) -> bool:
+        return self.statuses is None or status in self.statuses
+
+    def poll(self) -> List[ReportEvent]:
+        """
+        Выполняет один опрос и возвращает события с прошлого опроса
+        """
+        emit = self.emit_initial or self.polls > 0
+        previous = self.snapshot
+        current: Dict[int, int] = {}
+        events: List[ReportEvent] = []
+        for report in self.api.iter_reports(task_id=self.task_id):
+            report_id = int(_field(report, "id"))
+            status = int(_field(report, "status"))
+            current[report_id] = status
+            old = previous.get(report_id)
+            if not emit or old == status or not self._wanted(status):
+                continue
+            kind = ReportEvent.NEW if old is None else ReportEvent.STATUS
+            events.append(ReportEvent(kind, report_id, report, status, old))
+        if emit and self.statuses is None:
+            events.extend(
+                ReportEvent(ReportEvent.REMOVED, report_id, old_status=status)
+                for report_id, status in previous.items()
+                if report_id not in current
+            )
+        self.snapshot = current
+        self.polls += 1
+        self._adapt(bool(events))
+        if self.on_event is not None:
+            for event in events:
+                self.on_event(event)
+        return events
+
+    def _adapt(self, changed: bool) -> None:
+        if changed:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def events(self) -> Iterator[ReportEvent]:
+        """
+        Бесконечный генератор событий с опросом по адаптивному расписанию,
+        останавливается методом stop()
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                yield from self.poll()
+            except ApiError as error:
+                logger.warning("Опрос отчётов не удался: %s", error)
+                self._adapt(False)
+            self._stop.wait(self.interval)
+
+    def start(self, events: "queue.Queue[ReportEvent]" = None) -> threading.Thread:
+        """
+        Запускает опрос в фоновом потоке. События передаются в on_event
+        и, если указана, в очередь events.
+        """
+
+        def run() -> None:
+            for event in self.events():
+                if events is not None:
+                    events.put(event)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,224 @@
+"""
+Локальный справочник тарифов и проверка параметров задач до отправки
+"""
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .exceptions import ValidationError
+from .hooks import CallInfo, Hook
+from .sync import _field
+
+__all__ = ["TariffIndex"]
+
+# Методы, параметры которых проверяются перед отправкой
+CHECKED_ACTIONS = ("add_task", "edit_task")
+
+# Обязательные параметры add_task; edit_task требует ещё task_id
+REQUIRED = ("name", "descr", "need_for_report", "price", "tarif_id", "folder_id")
+
+# Допустимые значения из документации API
+RANGES = {"time_for_work": (2, 168)}
+CHOICES = {"targeting_gender": (1, 2)}
+# Пары "от" и "до": первое значение не больше второго
+PAIRS = (("delay_from", "delay_to"), ("targeting_age_from", "targeting_age_to"))
+
+
+def _number(value: Any, convert: Callable[[Any], Any]) -> Any:
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TariffIndex(Hook):
+    """
+    Справочник тарифов (id -> минимальная цена, группа) из get_tariffs
+
+    Подключается к клиенту как хук: add_task и edit_task с ценой ниже
+    минимальной для тарифа, неизвестным тарифом или параметрами вне
+    допустимых значений (time_for_work от 2 до 168, targeting_gender 1
+    или 2, "от" не больше "до") отклоняются ValidationError до отправки
+    запроса. validate проверяет партию спецификаций за один проход.
+
+    Справочник загружается при первой проверке и обновляется раз в ttl
+    секунд; если тариф не найден, справочник один раз обновляется перед
+    отказом. Для запросов клиента это делает prepare до начала запроса,
+    а не before_request, чтобы get_tariffs не выполнялся внутри цепочки
+    хуков. AsyncApi не позволяет запрашивать тарифы внутри хука, поэтому
+    для него справочник загружает await index.refresh_async(), а до
+    загрузки проверяются только диапазоны значений.
+
+    Входные данные
+        api (Api) - клиент, к которому подключается хук
+        ttl (float) - как часто обновлять справочник, в секундах
+    """
+
+    def __init__(
+        self, api: Any, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic
+    ):
+        self.api = api
+        self.ttl = ttl
+        self.clock = clock
+        self.tariffs: Dict[int, Tuple[float, int]] = {}
+        self.loaded_at: Optional[float] = None
+        # тарифы, которых не оказалось и в обновлённом справочнике
+        self.missing: Set[int] = set()
+        self.refreshes = 0
+        self.rejected = 0
+        self._async = inspect.iscoroutinefunction(getattr(api, "_send", None))
+        self._lock = threading.Lock()
+        api.add_hook(self)
+
+    def load(self, response: Any) -> None:
+        """
+        Принимает ответ get_tariffs: словарь с tariffs или список моделей Tariff
+        """
+        tariffs = response.get("tariffs") if isinstance(response, dict) else response
+        index = {}
+        for tariff in tariffs or ():
+            index[int(_field(tariff, "id"))] = (
+                float(_field(tariff, "min_price_rub")),
+                int(_field(tariff, "group_id")),
+            )
+        with self._lock:
+            self.tariffs = index
+            self.missing = set()
+            self.loaded_at = self.clock()
+
+    def refresh(self) -> None:
+        """
+        Загружает справочник заново (ответ из кэша клиента тоже подходит)
+        """
+        self.refreshes += 1
+        self.load(self.api.get_tariffs())
+
+    async def refresh_async(self) -> None:
+        self.refreshes += 1
+        self.load(await self.api.get_tariffs())
+
+    def _due(self) -> bool:
+        return self.loaded_at is None or self.clock() - self.loaded_at >= self.ttl
+
+    def min_price(self, tarif_id: int) -> Optional[float]:
+        tariff = self.tariffs.get(int(tarif_id))
+        return None if tariff is None else tariff[0]
+
+    def group(self, tarif_id: int) -> Optional[int]:
+        tariff = self.tariffs.get(int(tarif_id))
+        return None if tariff is None else tariff[1]
+
+    def _ensure(self, spec: Dict[str, Any]) -> None:
+        """
+        Загружает устаревший справочник и обновляет его один раз,
+        если в нём нет тарифа из spec
+        """
+        price = _number(spec.get("price"), float)
+        tarif_id = _number(spec.get("tarif_id"), int)
+        if self._async or price is None or price <= 0 or tarif_id is None:
+            return
+        if self._due():
+            self.refresh()
+        if tarif_id not in self.tariffs and tarif_id not in self.missing:
+            # тариф мог появиться после загрузки справочника
+            self.refresh()
+            self.missing.add(tarif_id)
+
+    def problems(self, spec: Dict[str, Any], action: str = "add_task") -> List[str]:
+        """
+        Список нарушений в параметрах задачи; пустой список - параметры
+        можно отправлять. К API обращается только обновление справочника.
+        """
+        self._ensure(spec)
+        return self._problems(spec, action)
+
+    def _problems(self, spec: Dict[str, Any], action: str) -> List[str]:
+        found = []
+        required = REQUIRED + (("task_id",) if action == "edit_task" else ())
+        for name in required:
+            if spec.get(name) is None or spec.get(name) == "":
+                found.append("не задан %s" % name)
+        for name, (low, high) in RANGES.items():
+            value = spec.get(name)
+            if value is None:
+                continue
+            number = _number(value, int)
+            if number is None:
+                found.append("%s не число" % name)
+            elif not low <= number <= high:
+                found.append("%s должен быть от %d до %d" % (name, low, high))
+        for name, choices in CHOICES.items():
+            value = spec.get(name)
+            if value is not None and _number(value, int) not in choices:
+                found.append(
+                    "%s должен быть одним из %s" % (name, ", ".join(map(str, choices)))
+                )
+        for low, high in PAIRS:
+            start, end = _number(spec.get(low), int), _number(spec.get(high), int)
+            if start is not None and end is not None and start > end:
+                found.append("%s больше %s" % (low, high))
+        found.extend(self._price_problems(spec))
+        return found
+
+    def _price_problems(self, spec: Dict[str, Any]) -> List[str]:
+        price = _number(spec.get("price"), float)
+        tarif_id = _number(spec.get("tarif_id"), int)
+        if spec.get("price") is not None and (price is None or price <= 0):
+            return ["price должен быть положительным числом"]
+        if price is None or tarif_id is None or self.loaded_at is None:
+            return []
+        min_price = self.min_price(tarif_id)
+        if min_price is None:
+            return ["неизвестный тариф %d" % tarif_id]
+        if price < min_price:
+            return [
+                "цена %.2f ниже минимальной %.2f для тарифа %d"
+                % (price, min_price, tarif_id)
+            ]
+        return []
+
+    def check(self, spec: Dict[str, Any], action: str = "add_task") -> None:
+        """
+        Бросает ValidationError, если параметры задачи нарушают ограничения
+        """
+        self._reject(self.problems(spec, action))
+
+    def _reject(self, found: List[str]) -> None:
+        if found:
+            self.rejected += 1
+            raise ValidationError(found)
+
+    def validate(
+        self, specs: Iterable[Dict[str, Any]], action: str = "add_task"
+    ) -> Dict[int, ValidationError]:
+        """
+        Проверяет партию спецификаций за один проход, до отправки
+        первого запроса. Справочник обновляется, только если он устарел
+        или в партии встретился неизвестный тариф.
+
+        Выходные данные
+            dict - номер спецификации в партии -> ValidationError
+        """
+        errors = {}
+        for index, spec in enumerate(specs):
+            try:
+                self.check(spec, action)
+            except ValidationError as error:
+                errors[index] = error
+        return errors
+
+    def prepare(self, action: str, data: Dict[str, Any]) -> None:
+        if action in CHECKED_ACTIONS:
+            self._ensure(data)
+
+    def before_request(self, action: str, data: Dict[str, Any]) -> Any:
+        if action in CHECKED_ACTIONS:
+            self._reject(self._problems(data, action))
+        return None
+
+    def after_response(
+        self, action: str, data: Dict[str, Any], token: Any, info: CallInfo
+    ) -> None:
+        if action == "get_tariffs" and info.error is None:
+            self.load(info.response)
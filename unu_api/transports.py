@@ -0,0 +1,320 @@
+"""
+HTTP-транспорты клиента: requests, urllib3 и httpx (HTTP/2)
+"""
+import importlib.util
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple, Union
+
+import urllib3
+
+from .exceptions import TransportError
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+    import requests
+
+__all__ = [
+    "HttpxTransport",
+    "RequestsTransport",
+    "Transport",
+    "TransportResponse",
+    "TRANSPORTS",
+    "Urllib3Transport",
+    "get_transport",
+]
+
+# Таймауты (подключение, чтение) в секундах
+Timeout = Tuple[float, float]
+
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+# requests и httpx импортируются при создании транспорта: вместе они
+# добавляют к запуску процесса около 150 мс, а urllib3 нужен всегда
+def _requests() -> Any:
+    import requests  # pylint: disable=import-outside-toplevel
+    import requests.adapters  # pylint: disable=import-outside-toplevel
+
+    return requests
+
+
+def _httpx() -> Any:
+    try:
+        import httpx  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise ImportError(
+            "Для HttpxTransport нужен httpx: pip install unu_api[http2]"
+        ) from None
+    return httpx
+
+
+class TransportResponse:
+    """
+    Ответ транспорта: статус, распакованное тело и объём тела на проводе
+    """
+
+    __slots__ = ("status", "body", "wire_bytes")
+
+    def __init__(self, status: int, body: bytes, wire_bytes: int):
+        self.status = status
+        self.body = body
+        self.wire_bytes = wire_bytes
+
+
+class Transport:
+    """
+    Базовый транспорт: отправляет форму POST-запросом
+
+    post возвращает TransportResponse, stream - контекстный менеджер,
+    отдающий (статус, итератор распакованных фрагментов тела). Сетевые
+    ошибки транспорт преобразует в TransportError.
+
+    Входные данные
+        pool_size (int) - размер пула соединений
+        keep_alive (bool) - держать соединения открытыми
+        compress (bool) - запрашивать сжатие ответа (gzip, deflate)
+    """
+
+    name = "base"
+
+    def __init__(
+        self, pool_size: int = 10, keep_alive: bool = True, compress: bool = True
+    ):
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.compress = compress
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"Accept-Encoding": ACCEPT_ENCODING if self.compress else "identity"}
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        return headers
+
+    def post(
+        self, url: str, form: Dict[str, str], timeout: Timeout
+    ) -> TransportResponse:
+        raise NotImplementedError
+
+    def stream(
+        self, url: str, form: Dict[str, str], timeout: Timeout, chunk_size: int
+    ) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Транспорт на requests. По умолчанию потоки делят одну сессию,
+    при per_thread_session=True каждый поток получает собственную.
+    """
+
+    name = "requests"
+
+    def __init__(self, per_thread_session: bool = False, **options):
+        super().__init__(**options)
+        self.per_thread_session = per_thread_session
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.requests = _requests()
+        self.sessions: List["requests.Session"] = []
+
+    def _new_session(self) -> "requests.Session":
+        session = self.requests.Session()
+        adapter = self.requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        self.sessions.append(session)
+        return session
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        Сессия requests для текущего потока (или общая для транспорта)
+        """
+        if self.per_thread_session:
+            session = getattr(self._local, "session", None)
+            if session is None:
+                with self._lock:
+                    session = self._local.session = self._new_session()
+            return session
+        with self._lock:
+            if not self.sessions:
+                self._new_session()
+            return self.sessions[0]
+
+    def post(
+        self, url: str, form: Dict[str, str], timeout: Timeout
+    ) -> TransportResponse:
+        try:
+            response = self.session.post(url=url, data=form, timeout=timeout)
+        except self.requests.RequestException as error:
+            raise TransportError from error
+        return TransportResponse(
+            response.status_code, response.content, response.raw.tell()
+        )
+
+    @contextmanager
+    def stream(
+        self, url: str, form: Dict[str, str], timeout: Timeout, chunk_size: int
+    ) -> Iterator[Tuple[int, Iterator[bytes]]]:
+        try:
+            response = self.session.post(
+                url=url, data=form, timeout=timeout, stream=True
+            )
+        except self.requests.RequestException as error:
+            raise TransportError from error
+        with response:
+            yield response.status_code, _guard(
+                response.iter_content(chunk_size), self.requests.RequestException
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self.sessions = self.sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+
+class Urllib3Transport(Transport):
+    """
+    Транспорт на пуле urllib3 без надстроек requests: меньше работы
+    на каждый вызов
+    """
+
+    name = "urllib3"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.pool = urllib3.PoolManager(
+            num_pools=4, maxsize=self.pool_size, headers=self.headers, retries=False
+        )
+
+    def _request(self, url, form, timeout, preload):
+        try:
+            return self.pool.request(
+                "POST",
+                url,
+                fields=form,
+                encode_multipart=False,
+                timeout=urllib3.Timeout(connect=timeout[0], read=timeout[1]),
+                preload_content=preload,
+            )
+        except urllib3.exceptions.HTTPError as error:
+            raise TransportError from error
+
+    def post(
+        self, url: str, form: Dict[str, str], timeout: Timeout
+    ) -> TransportResponse:
+        response = self._request(url, form, timeout, preload=True)
+        return TransportResponse(response.status, response.data, response.tell())
+
+    @contextmanager
+    def stream(
+        self, url: str, form: Dict[str, str], timeout: Timeout, chunk_size: int
+    ) -> Iterator[Tuple[int, Iterator[bytes]]]:
+        response = self._request(url, form, timeout, preload=False)
+        try:
+            yield response.status, _guard(
+                response.stream(chunk_size), urllib3.exceptions.HTTPError
+            )
+        finally:
+            response.release_conn()
+
+    def close(self) -> None:
+        self.pool.clear()
+
+
+class HttpxTransport(Transport):
+    """
+    Транспорт на httpx. Если установлен h2 (pip install unu_api[http2]),
+    HTTPS-соединения используют HTTP/2 и мультиплексируют запросы потоков
+    в одном соединении.
+    """
+
+    name = "httpx"
+
+    def __init__(self, http2: bool = True, **options):
+        httpx = self.httpx = _httpx()
+        super().__init__(**options)
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.client = httpx.Client(
+            http2=self.http2,
+            headers=self.headers,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size if self.keep_alive else 0,
+            ),
+        )
+
+    def _timeout(self, timeout: Timeout) -> "httpx.Timeout":
+        return self.httpx.Timeout(timeout[1], connect=timeout[0])
+
+    def post(
+        self, url: str, form: Dict[str, str], timeout: Timeout
+    ) -> TransportResponse:
+        try:
+            response = self.client.post(url, data=form, timeout=self._timeout(timeout))
+        except self.httpx.HTTPError as error:
+            raise TransportError from error
+        return TransportResponse(
+            response.status_code, response.content, response.num_bytes_downloaded
+        )
+
+    @contextmanager
+    def stream(
+        self, url: str, form: Dict[str, str], timeout: Timeout, chunk_size: int
+    ) -> Iterator[Tuple[int, Iterator[bytes]]]:
+        try:
+            with self.client.stream(
+                "POST", url, data=form, timeout=self._timeout(timeout)
+            ) as response:
+                yield response.status_code, _guard(
+                    response.iter_bytes(chunk_size), self.httpx.HTTPError
+                )
+        except self.httpx.HTTPError as error:
+            raise TransportError from error
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def _guard(chunks: Iterator[bytes], errors: Any) -> Iterator[bytes]:
+    """
+    Преобразует сетевые ошибки при чтении тела в TransportError
+    """
+    try:
+        yield from chunks
+    except errors as error:
+        raise TransportError from error
+
+
+TRANSPORTS: Dict[str, Callable[..., Transport]] = {
+    "requests": RequestsTransport,
+    "urllib3": Urllib3Transport,
+    "httpx": HttpxTransport,
+}
+
+
+def get_transport(transport: Union[str, Transport], **options) -> Transport:
+    """
+    Транспорт по имени ("requests", "urllib3", "httpx") или готовый экземпляр
+
+    Параметр per_thread_session понимает только транспорт requests.
+    """
+    if isinstance(transport, Transport):
+        return transport
+    try:
+        factory = TRANSPORTS[transport]
+    except KeyError:
+        raise ValueError("Неизвестный транспорт %r" % transport) from None
+    if factory is not RequestsTransport:
+        options.pop("per_thread_session", None)
+    return factory(**options)